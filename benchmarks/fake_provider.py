@@ -0,0 +1,296 @@
+"""
+A local stand-in for the SlideShare and Speaker Deck services, serving the
+recorded payloads in ``slidescraper/tests/data`` so that whole scrapes and
+feed crawls can be run offline. It answers:
+
+=================================== ==========================================
+Path                                Response
+=================================== ==========================================
+``/api/oembed/2``                   SlideShare oEmbed JSON
+``/api/2/get_slideshow``            a SlideShare API ``Slideshow`` for the
+                                    requested ``slideshow_url``
+``/api/2/get_slideshows_by_user``   a SlideShare API user feed of
+                                    ``feed_size`` slideshows, honouring
+                                    ``limit`` and ``offset``
+``/oembed.json``                    Speaker Deck oEmbed JSON
+``/u/<user>/p/<slug>``              a Speaker Deck presentation page
+``/u/<user>.atom``                  a Speaker Deck Atom feed of ``feed_size``
+                                    entries
+=================================== ==========================================
+
+Each request waits ``latency`` seconds plus up to ``jitter`` more. Then a
+fraction ``error_rate`` of requests fails with ``500 Internal Server Error``,
+and a fraction ``throttle_rate`` is refused with ``429 Too Many Requests``
+(with a ``Retry-After`` header if ``retry_after`` is set). Bodies are padded
+with whitespace to at least ``payload_bytes``.
+
+Point the library at the server with::
+
+    from slidescraper.utils import http, transport
+    http.set_transport(transport.HostOverrideTransport(
+                                server.host_overrides(), http.get_transport()))
+
+or run it on its own::
+
+    python benchmarks/fake_provider.py [--port PORT] [--latency SECONDS] ...
+
+"""
+import BaseHTTPServer
+import collections
+import optparse
+import os
+import random
+import re
+import SocketServer
+import sys
+import threading
+import time
+import urlparse
+from xml.sax.saxutils import escape
+
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                    'slidescraper', 'tests', 'data')
+
+#: The hosts whose requests the server can answer.
+HOSTS = ('www.slideshare.net', 'slideshare.net', 'speakerdeck.com')
+
+
+def read_data(name):
+    with open(os.path.join(DATA, name)) as f:
+        return f.read()
+
+
+class Payloads(object):
+    """Builds response bodies from the recorded fixtures."""
+
+    def __init__(self):
+        self.slideshare_oembed = read_data('slideshare_oembed.json')
+        self.speakerdeck_oembed = read_data('speakerdeck_oembed.json')
+        self.speakerdeck_page = read_data('speakerdeck_page.html')
+
+        user_feed = read_data('slideshare_user_feed.xml')
+        self.slideshows = re.findall(r'<Slideshow>.*?</Slideshow>',
+                                     user_feed, re.S)
+
+        atom = read_data('speakerdeck_user_feed.atom')
+        self.entries = re.findall(r'<entry>.*?</entry>', atom, re.S)
+        self.atom_head = atom[:atom.index('<entry>')]
+
+    def slideshow(self, index, url=None):
+        """
+        Returns the ``index``-th slideshow, with a unique ID and url unless
+        ``url`` is given.
+
+        """
+        slideshow = self.slideshows[index % len(self.slideshows)]
+        slideshow = re.sub(r'<ID>\d+</ID>', '<ID>%d</ID>' % (7000000 + index),
+                           slideshow)
+        if url is None:
+            return re.sub(r'<URL>(.*?)</URL>', r'<URL>\1-%d</URL>' % index,
+                          slideshow)
+        return re.sub(r'<URL>.*?</URL>', '<URL>%s</URL>' % escape(url),
+                      slideshow)
+
+    def get_slideshow(self, url):
+        return ('<?xml version="1.0" encoding="UTF-8"?>\n%s\n' %
+                self.slideshow(abs(hash(url)) % 1000, url))
+
+    def user_feed(self, username, count, offset, limit):
+        slideshows = [self.slideshow(i)
+                      for i in xrange(offset, min(count, offset + limit))]
+        return ('<?xml version="1.0" encoding="UTF-8"?>\n<User>\n'
+                '  <Name>%s</Name>\n  <Count>%d</Count>\n  %s\n</User>\n' % (
+                    escape(username), count, '\n  '.join(slideshows)))
+
+    def atom_feed(self, username, count):
+        entries = []
+        for i in xrange(count):
+            entry = self.entries[i % len(self.entries)]
+            entry = re.sub(r'Talk/(\w+)', r'Talk/\g<1>%d' % i, entry)
+            entry = re.sub(r'/p/(\w+)"', r'/p/\g<1>_%d"' % i, entry)
+            entries.append(entry)
+        head = self.atom_head.replace('/u/holman', '/u/%s' % username)
+        return '%s%s\n</feed>\n' % (head, '\n  '.join(entries))
+
+
+class FakeProviderHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        parts = urlparse.urlsplit(self.path)
+        query = dict(urlparse.parse_qsl(parts.query))
+        route, status, content_type, body = self.route(parts.path, query)
+
+        delay = server.latency
+        if server.jitter:
+            delay += random.uniform(0, server.jitter)
+        if delay:
+            time.sleep(delay)
+
+        headers = {}
+        if status == 200:
+            roll = random.random()
+            if roll < server.error_rate:
+                status, body = 500, 'Internal Server Error\n'
+            elif roll < server.error_rate + server.throttle_rate:
+                status, body = 429, 'Too Many Requests\n'
+                if server.retry_after is not None:
+                    headers['Retry-After'] = str(server.retry_after)
+        if status != 200:
+            content_type = 'text/plain'
+        elif len(body) < server.payload_bytes:
+            body += ' ' * (server.payload_bytes - len(body))
+
+        server.record(route, status)
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.iteritems():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def route(self, path, query):
+        """
+        Returns ``(route, status, content type, body)`` for a request for
+        ``path`` with ``query``.
+
+        """
+        payloads = self.server.payloads
+        if path == '/api/oembed/2':
+            return ('slideshare_oembed', 200, 'application/json',
+                    payloads.slideshare_oembed)
+        if path == '/api/2/get_slideshow':
+            return ('slideshare_api', 200, 'application/xml',
+                    payloads.get_slideshow(query.get('slideshow_url', '')))
+        if path == '/api/2/get_slideshows_by_user':
+            count = self.server.feed_size
+            offset = int(query.get('offset', 0))
+            limit = int(query.get('limit', count))
+            return ('slideshare_user_feed', 200, 'application/xml',
+                    payloads.user_feed(query.get('username_for', ''), count,
+                                       offset, limit))
+        if path == '/oembed.json':
+            return ('speakerdeck_oembed', 200, 'application/json',
+                    payloads.speakerdeck_oembed)
+        match = re.match(r'^/u/(\w+)\.atom$', path)
+        if match:
+            return ('speakerdeck_atom', 200, 'application/atom+xml',
+                    payloads.atom_feed(match.group(1),
+                                       self.server.feed_size))
+        if re.match(r'^/u/\w+/p/\w+$', path):
+            return ('speakerdeck_page', 200, 'text/html; charset=utf-8',
+                    payloads.speakerdeck_page)
+        return 'unknown', 404, 'text/plain', 'Not Found\n'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPServer.BaseHTTPRequestHandler.log_message(self, format,
+                                                              *args)
+
+
+class FakeProviderServer(SocketServer.ThreadingMixIn,
+                         BaseHTTPServer.HTTPServer):
+    """
+    The fake provider server. Its settings are attributes which may be
+    changed while it runs; see the module documentation.
+
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, address=('127.0.0.1', 0), latency=0, jitter=0,
+                 error_rate=0, throttle_rate=0, retry_after=None,
+                 payload_bytes=0, feed_size=100, verbose=False):
+        BaseHTTPServer.HTTPServer.__init__(self, address, FakeProviderHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.payload_bytes = payload_bytes
+        self.feed_size = feed_size
+        self.verbose = verbose
+        self.payloads = Payloads()
+        self.requests = collections.Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return 'http://%s:%d' % self.server_address[:2]
+
+    def host_overrides(self):
+        """
+        Returns the host overrides which send the provider requests to
+        this server; see
+        :class:`slidescraper.utils.transport.HostOverrideTransport`.
+
+        """
+        return dict((host, self.url) for host in HOSTS)
+
+    def record(self, route, status):
+        with self._lock:
+            self.requests[(route, status)] += 1
+
+    def start(self):
+        """Serves requests on a daemon thread and returns :attr:`url`."""
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self.url
+
+
+def add_server_options(parser):
+    """Adds the options for a :class:`FakeProviderServer` to ``parser``."""
+    group = optparse.OptionGroup(parser, 'Fake provider')
+    group.add_option('--latency', type='float', default=0.05,
+                     help='seconds to wait before every response')
+    group.add_option('--jitter', type='float', default=0.0,
+                     help='up to this many more seconds of random latency')
+    group.add_option('--error-rate', type='float', default=0.0,
+                     help='fraction of requests answered with 500')
+    group.add_option('--throttle-rate', type='float', default=0.0,
+                     help='fraction of requests answered with 429')
+    group.add_option('--retry-after', type='int',
+                     help='Retry-After seconds sent with each 429')
+    group.add_option('--payload-bytes', type='int', default=0,
+                     help='pad response bodies to at least this size')
+    group.add_option('--feed-size', type='int', default=100,
+                     help='number of entries in each feed')
+    parser.add_option_group(group)
+
+
+def server_from_options(options, address=('127.0.0.1', 0)):
+    return FakeProviderServer(address, latency=options.latency,
+                              jitter=options.jitter,
+                              error_rate=options.error_rate,
+                              throttle_rate=options.throttle_rate,
+                              retry_after=options.retry_after,
+                              payload_bytes=options.payload_bytes,
+                              feed_size=options.feed_size)
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [--port PORT] [options]')
+    parser.add_option('--host', default='127.0.0.1')
+    parser.add_option('--port', type='int', default=8000)
+    parser.add_option('--verbose', action='store_true', default=False,
+                      help='log every request')
+    add_server_options(parser)
+    options, args = parser.parse_args()
+
+    server = server_from_options(options, (options.host, options.port))
+    server.verbose = options.verbose
+    print 'Serving %s for %s' % (server.url, ', '.join(HOSTS))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
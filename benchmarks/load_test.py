@@ -0,0 +1,251 @@
+"""
+Runs whole scrapes or feed crawls against a fake provider server (see
+``fake_provider.py``) at a target concurrency, and reports the throughput
+and latency of the operations.
+
+Usage::
+
+    python benchmarks/load_test.py [--mode scrape|feed]
+                                   [--provider speakerdeck|slideshare|all]
+                                   [--concurrency N] [--count N]
+                                   [--server URL] [fake provider options]
+
+Each operation is an :func:`slidescraper.auto_scrape` of a distinct deck or,
+with ``--mode feed``, reading a distinct user's :func:`slidescraper.auto_feed`
+to the end (which also loads every entry's missing fields). ``--concurrency``
+operations run at once, each on its own thread. Unless ``--server`` gives the
+url of a running ``fake_provider.py``, a server is started in this process
+with the fake provider options given.
+
+The method cache stays disabled and no rate limits are configured, so every
+operation makes all of its requests. ``--metrics`` also prints the
+:mod:`slidescraper.utils.metrics` histograms collected during the run.
+
+"""
+import collections
+import itertools
+import json
+import optparse
+import Queue
+import sys
+import threading
+import time
+import warnings
+
+import fake_provider
+
+
+API_KEYS = {
+    'slideshare_api_key': 'load-test',
+    'slideshare_api_secret': 'load-test',
+}
+
+SCRAPE_URLS = {
+    'speakerdeck': 'https://speakerdeck.com/u/holman/p/deck_%d',
+    'slideshare': 'http://www.slideshare.net/haraldf/deck-%d',
+}
+
+FEED_URLS = {
+    'speakerdeck': 'https://speakerdeck.com/u/user%d.atom',
+    'slideshare': 'http://www.slideshare.net/rss/user/user%d',
+}
+
+
+def scrape(url, options):
+    from slidescraper import auto_scrape
+    slides = auto_scrape(url, fields=options.fields, api_keys=API_KEYS)
+    return 1, slides.errors
+
+
+def feed(url, options):
+    from slidescraper import auto_feed
+    count = 0
+    errors = None
+    for slides in auto_feed(url, fields=options.fields, crawl=options.crawl,
+                            max_results=options.max_results,
+                            api_keys=API_KEYS):
+        count += 1
+        errors = errors or slides.errors
+    return count, errors
+
+
+def percentile(values, percent):
+    """Returns the nearest-rank ``percent``-th percentile of sorted values."""
+    if not values:
+        return None
+    rank = int(round(percent / 100.0 * len(values) + 0.5)) - 1
+    return values[min(len(values) - 1, max(0, rank))]
+
+
+class LoadTest(object):
+    """Runs ``count`` operations with ``concurrency`` worker threads."""
+
+    def __init__(self, operation, urls, options):
+        self.operation = operation
+        self.urls = urls
+        self.options = options
+        self.latencies = []
+        self.items = 0
+        self.errors = collections.Counter()
+        self.partial = 0
+        self._lock = threading.Lock()
+
+    def worker(self, queue):
+        while True:
+            try:
+                url = queue.get_nowait()
+            except Queue.Empty:
+                return
+            start = time.time()
+            try:
+                items, errors = self.operation(url, self.options)
+            except Exception, e:
+                with self._lock:
+                    self.errors[type(e).__name__] += 1
+                continue
+            elapsed = time.time() - start
+            with self._lock:
+                self.latencies.append(elapsed)
+                self.items += items
+                if errors:
+                    self.partial += 1
+
+    def run(self):
+        queue = Queue.Queue()
+        for url in itertools.islice(self.urls, self.options.count):
+            queue.put(url)
+        threads = [threading.Thread(target=self.worker, args=(queue,))
+                   for i in xrange(self.options.concurrency)]
+        start = time.time()
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.time() - start
+
+    def report(self):
+        latencies = sorted(self.latencies)
+        return {
+            'operations': len(latencies),
+            'items': self.items,
+            'failed': sum(self.errors.values()),
+            'errors': dict(self.errors),
+            'partial': self.partial,
+            'seconds': self.elapsed,
+            'ops_per_sec': len(latencies) / self.elapsed,
+            'items_per_sec': self.items / self.elapsed,
+            'p50': percentile(latencies, 50),
+            'p90': percentile(latencies, 90),
+            'p99': percentile(latencies, 99),
+            'max': latencies[-1] if latencies else None,
+        }
+
+
+def urls_for(mode, providers):
+    templates = SCRAPE_URLS if mode == 'scrape' else FEED_URLS
+    templates = [templates[provider] for provider in providers]
+    for i in itertools.count():
+        yield templates[i % len(templates)] % i
+
+
+def format_seconds(value):
+    if value is None:
+        return 'n/a'
+    return '%.1f ms' % (value * 1000)
+
+
+def main():
+    parser = optparse.OptionParser(
+                usage='%prog [--mode scrape|feed] [--concurrency N] '
+                      '[--count N] [options]')
+    parser.add_option('--mode', choices=('scrape', 'feed'), default='scrape')
+    parser.add_option('--provider',
+                      choices=('speakerdeck', 'slideshare', 'all'),
+                      default='all')
+    parser.add_option('--concurrency', type='int', default=8,
+                      help='operations in flight at once')
+    parser.add_option('--count', type='int', default=200,
+                      help='total number of operations')
+    parser.add_option('--fields', help='comma-separated fields to request')
+    parser.add_option('--crawl', action='store_true', default=False,
+                      help='crawl every page of each feed')
+    parser.add_option('--max-results', type='int',
+                      help='stop reading each feed after this many entries')
+    parser.add_option('--server',
+                      help='url of a running fake_provider.py to use')
+    parser.add_option('--metrics', action='store_true', default=False,
+                      help='collect and print slidescraper metrics')
+    parser.add_option('--output', help='write the results as JSON to FILE')
+    fake_provider.add_server_options(parser)
+    options, args = parser.parse_args()
+    if options.fields:
+        options.fields = options.fields.split(',')
+
+    from slidescraper.utils import concurrency, http, metrics, transport
+    # BeautifulSoup warns when no parser is named.
+    warnings.simplefilter('ignore')
+
+    server = None
+    if options.server:
+        base_url = options.server.rstrip('/')
+    else:
+        server = fake_provider.server_from_options(options)
+        base_url = server.start()
+    http.configure(pool_size=max(http.POOL_SIZE, options.concurrency * 2))
+    http.set_transport(transport.HostOverrideTransport(
+                        dict((host, base_url) for host in fake_provider.HOSTS),
+                        http.get_transport()))
+    concurrency.set_pool_size('fetch', max(8, options.concurrency * 2))
+    sink = metrics.enable() if options.metrics else None
+
+    providers = (['speakerdeck', 'slideshare'] if options.provider == 'all'
+                 else [options.provider])
+    operation = scrape if options.mode == 'scrape' else feed
+    test = LoadTest(operation, urls_for(options.mode, providers), options)
+    test.run()
+    report = test.report()
+    # Close our keep-alive connections so that the server's handler threads
+    # finish before the interpreter exits.
+    http.close_sessions()
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+
+    print '%s of %s: %d operations, concurrency %d, %.2f s' % (
+        options.mode, ', '.join(providers), report['operations'],
+        options.concurrency, report['seconds'])
+    print 'throughput: %.1f ops/s, %.1f decks/s' % (report['ops_per_sec'],
+                                                   report['items_per_sec'])
+    print 'latency: p50 %s, p90 %s, p99 %s, max %s' % (
+        format_seconds(report['p50']), format_seconds(report['p90']),
+        format_seconds(report['p99']), format_seconds(report['max']))
+    print 'failed: %d %s, partial: %d' % (report['failed'],
+                                          report['errors'] or '',
+                                          report['partial'])
+    if server is not None:
+        report['server_requests'] = dict(
+            ('%s %d' % key, count) for key, count in server.requests.items())
+        print 'server requests:'
+        for key, count in sorted(report['server_requests'].items()):
+            print '  %-28s %d' % (key, count)
+    if sink is not None:
+        report['metrics'] = sink.snapshot()
+        print 'metrics:'
+        for histogram in report['metrics']['histograms']:
+            labels = ','.join('%s=%s' % item
+                              for item in sorted(histogram['labels'].items()))
+            print '  %-16s %-44s n=%-6d mean %s p99 <= %s' % (
+                histogram['name'], labels, histogram['count'],
+                format_seconds(histogram['sum'] / histogram['count']),
+                format_seconds(histogram['p99']))
+
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
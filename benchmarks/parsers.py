@@ -0,0 +1,336 @@
+"""
+Micro-benchmarks for the parsers which turn provider responses into field
+data, run against the recorded payloads in ``slidescraper/tests/data``:
+
+========================== ===============================================
+Benchmark                  What is measured
+========================== ===============================================
+``speakerdeck_scrape``     :meth:`.SpeakerDeckScrapeMethod.process` on the
+                           recorded presentation page
+``speakerdeck_oembed``     :meth:`.SpeakerDeckOEmbedMethod.process`
+``slideshare_oembed``      :meth:`.SlideShareOEmbedMethod.process`
+``slideshare_api``         :meth:`.SlideShareApiMethod.parse_api_data` for
+                           every slideshow in the recorded user feed
+``slideshare_api_partial`` the same, asking only for ``view_count``
+``slideshare_api_xml``     parsing the recorded user feed with
+                           :mod:`xmltodict`
+``speakerdeck_feed_entry`` :meth:`.SpeakerDeckSuite.parse_feed_entry` for
+                           every entry in the recorded Atom feed
+``convert_entities``       :func:`.convert_entities` on the recorded page
+``find_best_methods``      :meth:`.BaseSuite.find_best_methods` for every
+                           single missing field, with the plan cache
+                           cleared before each call
+``find_best_methods_hit``  the same, with plans cached
+========================== ===============================================
+
+Usage::
+
+    python benchmarks/parsers.py [--time SECONDS] [--output FILE]
+                                 [--compare FILE] [NAME ...]
+
+For each benchmark, the number of operations per second (the best of three
+timed runs) and the memory a single operation leaves behind are reported.
+Neither counts the memory an operation allocates and frees again. If
+:mod:`tracemalloc` is available, the memory is given as the bytes still
+allocated after one operation while its result is referenced, and the peak
+during the operation. Otherwise (as on CPython 2) it is given as the number
+of objects tracked by the cycle collector which one operation left behind,
+with collection disabled: its result, anything it caches and any reference
+cycles it created, such as parse trees. Objects which are not tracked, such
+as strings and numbers, are not counted.
+
+``--output`` saves the results as JSON and ``--compare`` prints the change in
+operations per second against results saved by an earlier run.
+
+"""
+import datetime
+import gc
+import json
+import optparse
+import os
+import platform
+import sys
+import time
+import warnings
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                    'slidescraper', 'tests', 'data')
+
+
+def read_data(name):
+    with open(os.path.join(DATA, name)) as f:
+        return f.read().decode('utf-8')
+
+
+class RecordedResponse(object):
+    def __init__(self, url, text):
+        self.url = url
+        self.text = text
+        self.content = text.encode('utf-8')
+
+
+def speakerdeck_scrape():
+    from slidescraper.suites.speakerdeck import SpeakerDeckScrapeMethod
+    method = SpeakerDeckScrapeMethod()
+    response = RecordedResponse(
+                            u'https://speakerdeck.com/u/holman/p/scaling_github',
+                            read_data('speakerdeck_page.html'))
+    return lambda: method.process(response)
+
+
+def speakerdeck_oembed():
+    from slidescraper.suites.speakerdeck import SpeakerDeckOEmbedMethod
+    method = SpeakerDeckOEmbedMethod(u'https://speakerdeck.com/oembed.json')
+    response = RecordedResponse(u'https://speakerdeck.com/oembed.json',
+                                read_data('speakerdeck_oembed.json'))
+    return lambda: method.process(response)
+
+
+def slideshare_oembed():
+    from slidescraper.suites.slideshare import SlideShareOEmbedMethod
+    method = SlideShareOEmbedMethod(u'http://www.slideshare.net/api/oembed/2')
+    response = RecordedResponse(u'http://www.slideshare.net/api/oembed/2',
+                                read_data('slideshare_oembed.json'))
+    return lambda: method.process(response)
+
+
+def _slideshows():
+    import xmltodict
+    parsed = xmltodict.parse(read_data('slideshare_user_feed.xml')
+                             .encode('utf-8'))
+    return parsed['User']['Slideshow']
+
+
+def slideshare_api():
+    from slidescraper.suites.slideshare import SlideShareApiMethod
+    slideshows = _slideshows()
+
+    def run():
+        return [SlideShareApiMethod.parse_api_data(slideshow)
+                for slideshow in slideshows]
+    return run
+
+
+def slideshare_api_partial():
+    from slidescraper.suites.slideshare import SlideShareApiMethod
+    slideshows = _slideshows()
+    fields = set(['view_count'])
+
+    def run():
+        return [SlideShareApiMethod.parse_api_data(slideshow, fields)
+                for slideshow in slideshows]
+    return run
+
+
+def slideshare_api_xml():
+    import xmltodict
+    content = read_data('slideshare_user_feed.xml').encode('utf-8')
+    return lambda: xmltodict.parse(content)
+
+
+def speakerdeck_feed_entry():
+    import feedparser
+    from slidescraper.suites.speakerdeck import SpeakerDeckSuite
+    suite = SpeakerDeckSuite()
+    entries = feedparser.parse(
+                read_data('speakerdeck_user_feed.atom').encode('utf-8')).entries
+
+    def run():
+        return [suite.parse_feed_entry(entry) for entry in entries]
+    return run
+
+
+def convert_entities():
+    from slidescraper.utils.html import convert_entities
+    text = read_data('speakerdeck_page.html')
+    return lambda: convert_entities(text)
+
+
+def _all_fields_missing():
+    from slidescraper.slides import Slides
+    from slidescraper.suites.slideshare import SlideShareSuite
+    suite = SlideShareSuite()
+    return suite, [set([field]) for field in Slides._all_fields]
+
+
+def find_best_methods():
+    suite, missing = _all_fields_missing()
+    suite.find_best_methods(missing[0])
+    plans = suite._planner[3]
+
+    def run():
+        plans_made = []
+        for fields in missing:
+            plans.clear()
+            plans_made.append(suite.find_best_methods(fields))
+        return plans_made
+    return run
+
+
+def find_best_methods_hit():
+    suite, missing = _all_fields_missing()
+
+    def run():
+        return [suite.find_best_methods(fields) for fields in missing]
+    return run
+
+
+BENCHMARKS = (
+    ('speakerdeck_scrape', speakerdeck_scrape),
+    ('speakerdeck_oembed', speakerdeck_oembed),
+    ('slideshare_oembed', slideshare_oembed),
+    ('slideshare_api', slideshare_api),
+    ('slideshare_api_partial', slideshare_api_partial),
+    ('slideshare_api_xml', slideshare_api_xml),
+    ('speakerdeck_feed_entry', speakerdeck_feed_entry),
+    ('convert_entities', convert_entities),
+    ('find_best_methods', find_best_methods),
+    ('find_best_methods_hit', find_best_methods_hit),
+)
+
+
+def time_ops(func, min_time):
+    """
+    Returns the best operations per second over three runs of ``func``,
+    each repeated for at least ``min_time`` seconds.
+
+    """
+    # Find a number of calls which takes long enough to time reliably.
+    count = 1
+    while True:
+        start = time.time()
+        for i in xrange(count):
+            func()
+        elapsed = time.time() - start
+        if elapsed >= min_time / 10:
+            break
+        count *= 10
+    count = max(1, int(count * min_time / max(elapsed, 1e-6)))
+
+    best = None
+    for run in xrange(3):
+        start = time.time()
+        for i in xrange(count):
+            func()
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return count / max(best, 1e-9)
+
+
+def measure_memory(func):
+    """
+    Returns the memory which one call of ``func`` leaves behind while its
+    result is still referenced (see the module documentation).
+
+    """
+    func()  # Let caches and lazy imports settle first.
+    if tracemalloc is not None:
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            result = func()
+            after, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del result
+        return {
+            'retained_bytes': after - before,
+            'peak_bytes': peak - before,
+        }
+
+    gc.collect()
+    gc.disable()
+    try:
+        before = len(gc.get_objects())
+        result = func()
+        after = len(gc.get_objects())
+        del result
+    finally:
+        gc.enable()
+    return {'retained_gc_objects': after - before}
+
+
+def run_benchmarks(names, min_time):
+    results = {}
+    for name, setup in BENCHMARKS:
+        if names and name not in names:
+            continue
+        func = setup()
+        result = {'ops_per_sec': time_ops(func, min_time)}
+        result['usec_per_op'] = 1e6 / result['ops_per_sec']
+        result.update(measure_memory(func))
+        results[name] = result
+    return results
+
+
+def format_memory(result):
+    if 'retained_bytes' in result:
+        return '%d bytes retained, %d peak' % (result['retained_bytes'],
+                                               result['peak_bytes'])
+    return '%d gc objects retained' % result['retained_gc_objects']
+
+
+def main():
+    parser = optparse.OptionParser(
+                usage='%prog [--time SECONDS] [--output FILE] '
+                      '[--compare FILE] [NAME ...]')
+    parser.add_option('--time', type='float', default=0.5,
+                      help='seconds to spend on each timed run')
+    parser.add_option('--output', help='write the results as JSON to FILE')
+    parser.add_option('--compare',
+                      help='compare with results saved by --output')
+    options, names = parser.parse_args()
+
+    known = set(name for name, setup in BENCHMARKS)
+    unknown = set(names) - known
+    if unknown:
+        parser.error('unknown benchmarks: %s' % ', '.join(sorted(unknown)))
+
+    # BeautifulSoup warns when no parser is named; the parsers deliberately
+    # use the best one installed.
+    warnings.simplefilter('ignore')
+
+    previous = None
+    if options.compare:
+        with open(options.compare) as f:
+            previous = json.load(f)['results']
+
+    results = run_benchmarks(names, options.time)
+
+    print '%-24s %12s %12s  %s' % ('benchmark', 'ops/sec', 'usec/op',
+                                   'memory per op')
+    for name, setup in BENCHMARKS:
+        if name not in results:
+            continue
+        result = results[name]
+        line = '%-24s %12.1f %12.1f  %s' % (name, result['ops_per_sec'],
+                                            result['usec_per_op'],
+                                            format_memory(result))
+        if previous and name in previous:
+            change = result['ops_per_sec'] / previous[name]['ops_per_sec']
+            line += '  (%.2fx)' % change
+        print line
+
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump({
+                'date': datetime.datetime.utcnow().isoformat(),
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'memory': ('tracemalloc' if tracemalloc is not None
+                           else 'gc'),
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+            f.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Compares the memory used by :class:`slidescraper.slides.Slides` records with
+the dict-based representation it replaced.
+
+Usage::
+
+    python benchmarks/slides_memory.py [--count N]
+
+Each representation is measured in a fresh interpreter: the change in peak
+RSS after building ``N`` records with realistic SlideShare API data, and an
+estimate of the bytes per record that are not shared with other records.
+
+"""
+import datetime
+import gc
+import optparse
+import resource
+import subprocess
+import sys
+
+
+SLIDESHARE_ID = 5000000
+
+
+def api_data(i):
+    """Returns the field data a SlideShare API scrape produces for deck i."""
+    from slidescraper.suites.slideshare import SlideShareSuite
+    return {
+        'guid': u'slideshare:%d' % (SLIDESHARE_ID + i),
+        'title': u'Business Quotes for %d' % i,
+        'link': u'http://www.slideshare.net/haraldf/business-quotes-%d' % i,
+        'description': u'A collection of quotes, number %d.' % i,
+        'embed_code': SlideShareSuite.iframe_embed_code(SLIDESHARE_ID + i,
+                                                        u'425', u'355'),
+        'publish_datetime': datetime.datetime(2011, 1, 3, 7, 31, 49),
+        'thumbnail_url': u'http://cdn.slidesharecdn.com/quotes-%d-thumbnail' % i,
+        'user': u'Harald Felgner',
+        'user_url': u'http://www.slideshare.net/haraldf',
+        'view_count': 1000 + i,
+        'slide_count': 75,
+        'language': u'en',
+        'tags': [u'business', u'quotes'],
+    }
+
+
+class LegacySlides(object):
+    """The per-instance state of Slides before it used slots."""
+    _all_fields = ('title', 'description', 'publish_datetime', 'link',
+                   'embed_code', 'thumbnail_url', 'language', 'view_count',
+                   'slide_count', 'license_url', 'file_url', 'file_format',
+                   'user', 'user_url', 'tags', 'guid', 'index', 'provider')
+
+    def __init__(self, url, suite):
+        self.fields = list(self._all_fields)
+        self.url = url
+        self._suite = suite
+        self.api_keys = {}
+        self.provider = suite.provider_name
+        self._loaded = False
+
+    def _apply(self, data):
+        for field in set(data) & set(self.fields):
+            value = data[field]
+            if field == 'embed_code':
+                value = value.render()
+            setattr(self, field, value)
+
+
+def build(variant, count):
+    from slidescraper.slides import Slides
+    from slidescraper.suites.slideshare import SlideShareSuite
+    suite = SlideShareSuite()
+    records = []
+    for i in xrange(count):
+        data = api_data(i)
+        if variant == 'legacy':
+            slides = LegacySlides(data['link'], suite)
+        else:
+            slides = Slides(data['link'], suite=suite)
+        slides._apply(data)
+        # Copy the strings which in a real crawl come from separate
+        # responses, so that no record shares them by accident.
+        for field in ('user', 'language'):
+            value = data[field]
+            data[field] = (value + u' ')[:-1]
+        slides._apply(dict((f, data[f]) for f in ('user', 'language')))
+        records.append(slides)
+    return records
+
+
+def unshared_size(records):
+    """Estimates the bytes per record of objects which only it refers to."""
+    seen = set()
+    total = 0
+    for record in records:
+        stack = [record]
+        while stack:
+            obj = stack.pop()
+            if id(obj) in seen:
+                continue
+            seen.add(id(obj))
+            total += sys.getsizeof(obj)
+            if isinstance(obj, (list, tuple, set, frozenset)):
+                stack.extend(obj)
+            elif isinstance(obj, dict):
+                stack.extend(obj.keys())
+                stack.extend(obj.values())
+            elif isinstance(obj, (basestring, int, long, float,
+                                  datetime.datetime)) or obj is None:
+                continue
+            else:
+                if hasattr(obj, '__dict__'):
+                    stack.append(obj.__dict__)
+                for cls in type(obj).__mro__:
+                    for slot in getattr(cls, '__slots__', ()):
+                        if slot not in ('_suite',) and hasattr(obj, slot):
+                            stack.append(getattr(obj, slot))
+    # Objects shared between records (field tuples, interned strings) are
+    # only counted once.
+    return float(total) / len(records)
+
+
+def measure(variant, count):
+    gc.collect()
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    records = build(variant, count)
+    gc.collect()
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print '%s %d %f' % (variant, after - before, unshared_size(records))
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [--count N]')
+    parser.add_option('--count', type='int', default=100000)
+    parser.add_option('--variant', help=optparse.SUPPRESS_HELP)
+    options, args = parser.parse_args()
+
+    if options.variant:
+        measure(options.variant, options.count)
+        return 0
+
+    print 'records: %d' % options.count
+    print '%-8s %14s %16s' % ('variant', 'peak RSS (KiB)', 'bytes per record')
+    results = {}
+    for variant in ('legacy', 'slots'):
+        output = subprocess.check_output([sys.executable, __file__,
+                                          '--variant', variant,
+                                          '--count', str(options.count)])
+        name, rss, size = output.split()
+        results[name] = (int(rss), float(size))
+        print '%-8s %14d %16.0f' % (name, int(rss), float(size))
+    print 'RSS saving: %.0f%%' % (
+        100.0 * (1 - float(results['slots'][0]) / max(results['legacy'][0], 1)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
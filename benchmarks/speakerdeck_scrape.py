@@ -0,0 +1,71 @@
+"""
+Compares the time :class:`slidescraper.suites.speakerdeck.SpeakerDeckScrapeMethod`
+takes to process a presentation page by parsing only the extracted elements
+with the time taken by parsing the whole page through a strainer.
+
+Usage::
+
+    python benchmarks/speakerdeck_scrape.py [--count N] [--page FILE]
+
+By default the recorded page in ``slidescraper/tests/data`` is used.
+
+"""
+import optparse
+import os
+import sys
+import time
+import warnings
+
+
+PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                    'slidescraper', 'tests', 'data', 'speakerdeck_page.html')
+URL = u'https://speakerdeck.com/u/holman/p/scaling-github'
+
+
+class RecordedResponse(object):
+    def __init__(self, url, text):
+        self.url = url
+        self.text = text
+
+
+def measure(method, response, count):
+    start = time.time()
+    for i in xrange(count):
+        method.process(response)
+    return (time.time() - start) / count
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [--count N] [--page FILE]')
+    parser.add_option('--count', type='int', default=500)
+    parser.add_option('--page', default=PAGE)
+    options, args = parser.parse_args()
+
+    from slidescraper.suites.speakerdeck import SpeakerDeckScrapeMethod
+    # BeautifulSoup warns when no parser is named; the method deliberately
+    # uses the best one installed.
+    warnings.simplefilter('ignore')
+
+    with open(options.page) as f:
+        response = RecordedResponse(URL, f.read().decode('utf-8'))
+
+    full = SpeakerDeckScrapeMethod()
+    full.fast_extract = False
+    fast = SpeakerDeckScrapeMethod()
+    if full.process(response) != fast.process(response):
+        print 'results differ!'
+        return 1
+
+    print 'page: %s (%d bytes), %d runs' % (options.page,
+                                            len(response.text), options.count)
+    print '%-8s %12s' % ('variant', 'ms per page')
+    results = {}
+    for name, method in (('full', full), ('extract', fast)):
+        results[name] = measure(method, response, options.count)
+        print '%-8s %12.3f' % (name, results[name] * 1000)
+    print 'speedup: %.1fx' % (results['full'] / results['extract'])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
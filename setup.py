@@ -9,11 +9,12 @@ setup(
     maintainer_email='tim.church+slidescraper@gmail.com',
     url='https://github.com/timchurch/slidescraper',
     packages=find_packages(),
+    test_suite='slidescraper.tests',
     install_requires=[
         'oauth2>=1.5.211',
         'feedparser>=5.1.1',
         'beautifulsoup4>=4.0.2',
-        'requests>=0.10.8',
+        'requests>=1.2',
         'python-dateutil==1.5',
 #        'xmltodict>=0.1',
     ],
@@ -25,10 +25,16 @@
 # THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import sys
+import time
 from optparse import OptionParser
 
+from dateutil import parser as date_parser
+
 from slidescraper.suites import registry
 from slidescraper.slides import Slides, SlideFeed
+from slidescraper.bulk import BulkScrape
+from slidescraper.utils.http import format_http_date, parse_http_date
+from slidescraper.utils.ndjson import NDJSONWriter, write_ndjson
 #, SlideSearch
 
 
@@ -39,30 +45,69 @@ def handles_slide_url(url):
     """
     Returns True if slidescraper can scrape this url.
     """
-    return any((suite.handles_slide_url(url) for suite in registry.suites))
+    return registry.handles_slide_url(url)
 
 
 def handles_feed_url(url):
     """
     Returns True if slidescraper can treat this url as a feed.
     """
-    return any((suite.handles_feed_url(url) for suite in registry.suites))
+    return registry.handles_feed_url(url)
 
 
-def auto_scrape(url, fields=None, api_keys=None):
+def auto_scrape(url, fields=None, api_keys=None, lazy=False):
     """
     Automatically determines which suite to use and scrapes ``url`` with that suite.
+    If ``lazy`` is ``True``, nothing is fetched until fields are read; see
+    :class:`.Slides`.
 
     :returns: :class:`.Slides` instance.
     :raises UnhandledURL: if no registered suites know how to handle this url.
     """
-    slides = Slides(url, fields=fields, api_keys=api_keys)
-    slides.load()
+    slides = Slides(url, fields=fields, api_keys=api_keys, lazy=lazy)
+    if not lazy:
+        slides.load()
     return slides
 
 
+def auto_scrape_async(url, fields=None, api_keys=None, callback=None,
+                      pool=None):
+    """
+    Like :func:`auto_scrape`, but returns immediately with an
+    :class:`~multiprocessing.pool.AsyncResult` while the scrape runs on a
+    worker thread of ``pool`` (by default the shared ``scrape`` pool).
+    ``result.get()`` returns the loaded :class:`.Slides` instance;
+    ``callback``, if given, is called with it on completion.
+
+    :raises UnhandledURL: if no registered suites know how to handle this url.
+    """
+    slides = Slides(url, fields=fields, api_keys=api_keys)
+    return slides.load_async(callback=callback, pool=pool)
+
+
+def auto_scrape_many(urls, fields=None, api_keys=None, max_workers=16,
+                     per_provider=4, ordered=False):
+    """
+    Scrapes every url in ``urls`` concurrently, resolving the suite for each
+    one through the registry. At most ``max_workers`` scrapes run at once,
+    and at most ``per_provider`` for any single provider (an integer, or a
+    dictionary keyed by ``provider_name``).
+
+    :returns: A :class:`.BulkScrape` which yields a :class:`.ScrapeResult`
+              per url, as the scrapes complete or, if ``ordered`` is
+              ``True``, in input order. Errors such as
+              :exc:`.UnhandledURL` and :exc:`.SlidesDeleted` are reported on
+              the result for that url instead of being raised.
+
+    """
+    return BulkScrape(urls, fields=fields, api_keys=api_keys,
+                      max_workers=max_workers, per_provider=per_provider,
+                      ordered=ordered)
+
+
 def auto_feed(url, fields=None, crawl=False, max_results=None, api_keys=None,
-              last_modified=None, etag=None):
+              last_modified=None, etag=None, lookahead=1, prefetch_pages=0,
+              http_last_modified=None):
     """
     Automatically determines which suite to use and scrapes ``feed_url`` with
     that suite. This will return a :class:`VideoFeed` instance instantiated
@@ -73,7 +118,14 @@ def auto_feed(url, fields=None, crawl=False, max_results=None, api_keys=None,
     the feed, if the suite supports it.
 
     .. note:: Crawling will only initiate a new HTTP request after it has
-              exhausted the results on the current page.
+              exhausted the results on the current page, unless
+              ``prefetch_pages`` is given; then up to that many following
+              pages are fetched in the background.
+
+    If ``lookahead`` is greater than 1, that many entries are filled in
+    concurrently ahead of the one being yielded. ``etag`` and
+    ``http_last_modified`` are the validators of a previous response, which
+    are sent with the request for the first page.
 
     :returns: A :class:`SlidesFeed` instance which yields
               :class:`.Slides` instances for the items in the feed.
@@ -83,7 +135,30 @@ def auto_feed(url, fields=None, crawl=False, max_results=None, api_keys=None,
     """
     return SlideFeed(url, fields=fields, crawl=crawl, max_results=max_results,
                       api_keys=api_keys, last_modified=last_modified,
-                      etag=etag)
+                      etag=etag, lookahead=lookahead,
+                      prefetch_pages=prefetch_pages,
+                      http_last_modified=http_last_modified)
+
+
+def auto_feed_async(url, fields=None, crawl=False, max_results=None,
+                    api_keys=None, last_modified=None, etag=None,
+                    lookahead=1, prefetch_pages=0, callback=None,
+                    pool=None, http_last_modified=None):
+    """
+    Like :func:`auto_feed`, but fetches the feed's first response on a worker
+    thread of ``pool`` (by default the shared ``feed`` pool). Returns an
+    :class:`~multiprocessing.pool.AsyncResult` whose ``get()`` returns the
+    loaded :class:`SlideFeed`; use :meth:`SlideFeed.iter_async` to receive
+    its items without blocking.
+
+    :raises UnhandledURL: if no registered suites know how to handle this url.
+    """
+    feed = auto_feed(url, fields=fields, crawl=crawl, max_results=max_results,
+                     api_keys=api_keys, last_modified=last_modified,
+                     etag=etag, lookahead=lookahead,
+                     prefetch_pages=prefetch_pages,
+                     http_last_modified=http_last_modified)
+    return feed.load_async(callback=callback, pool=pool)
 
 
 #def auto_search(query, fields=None, order_by=None, crawl=False,
@@ -113,14 +188,17 @@ class SlidescraperCommandHandler(object):
     """Command line handler for slidescraper.
 
     This exposes functions in this module to the command line giving
-    vidscraper command line utility.
+    slidescraper command line utility.
 
     Subcommands are implemented in ``handle_SUBCOMMAND`` methods.  See
-    ``handle_video`` and ``handle_help`` for examples.
+    ``handle_scrape`` and ``handle_help`` for examples.
     """
 
     usage = "%prog [command] [options]"
 
+    #: Old subcommand names which are still accepted.
+    aliases = {'video': 'scrape'}
+
     def get_commands(self):
         """Returns a list of subcommands implemented."""
         return [mem.replace("handle_", "")
@@ -132,38 +210,159 @@ class SlidescraperCommandHandler(object):
         parser = OptionParser(usage=usage, version=__version__)
         return parser
 
-    def handle_video(self):
-        """Handler for auto_scrape."""
-        parser = self.build_parser("%prog video [options] URL")
+    def add_scrape_options(self, parser):
+        """Adds the options shared by subcommands which scrape."""
         parser.add_option("--fields", dest="fields",
                           help="comma-separated list of fields to retrieve. "
                           "e.g. --fields=a,b,c")
         parser.add_option("--apikeys", dest="api_keys",
                           help="api keys comma separated. "
                           "e.g. --apikeys=key:val,key2:val")
+
+    def get_fields(self, options):
+        if options.fields:
+            return options.fields.split(",")
+        return None
+
+    def get_api_keys(self, options):
+        if options.api_keys:
+            return dict(mem.split(":", 1)
+                        for mem in options.api_keys.split(","))
+        return None
+
+    def handle_scrape(self):
+        """Handler for auto_scrape."""
+        parser = self.build_parser("%prog scrape [options] URL")
+        self.add_scrape_options(parser)
         (options, args) = parser.parse_args()
 
         if len(args) == 0:
             parser.error("URL needed.")
 
-        if options.fields:
-            fields = options.fields.split(",")
-        else:
-            fields = None
-
-        if options.api_keys:
-            api_keys = dict(mem.split(":", 1)
-                            for mem in options.api_keys.split(","))
-        else:
-            api_keys = None
+        fields = self.get_fields(options)
+        api_keys = self.get_api_keys(options)
 
         for arg in args:
             print "Scraping %s" % arg
-            video = auto_scrape(arg, fields=fields, api_keys=api_keys)
-            print video.to_json(indent=2, sort_keys=True)
+            slides = auto_scrape(arg, fields=fields, api_keys=api_keys)
+            print slides.to_json(indent=2, sort_keys=True)
 
         return 0
 
+    def handle_batch(self):
+        """Handler for auto_scrape_many."""
+        parser = self.build_parser("%prog batch [options] [FILE]\n\n"
+                                   "Scrapes the urls in FILE (one per line) or "
+                                   "on stdin and writes one JSON object per "
+                                   "line to stdout.")
+        self.add_scrape_options(parser)
+        parser.add_option("--workers", dest="workers", type="int", default=16,
+                          help="number of urls to scrape at once. "
+                          "Default: %default")
+        parser.add_option("--per-provider", dest="per_provider", type="int",
+                          default=4,
+                          help="number of urls to scrape at once from any "
+                          "one provider. Default: %default")
+        parser.add_option("--ordered", dest="ordered", action="store_true",
+                          default=False,
+                          help="write results in input order instead of as "
+                          "they complete.")
+        (options, args) = parser.parse_args()
+
+        if len(args) > 1:
+            parser.error("Only one FILE can be given.")
+        if options.workers < 1 or options.per_provider < 1:
+            parser.error("--workers and --per-provider must be at least 1.")
+        if args and args[0] != '-':
+            with open(args[0]) as url_file:
+                stats = self._scrape_batch(url_file, options)
+        else:
+            stats = self._scrape_batch(sys.stdin, options)
+        stats.report(sys.stderr)
+        return 0
+
+    def _scrape_batch(self, url_file, options):
+        """
+        Scrapes the urls in ``url_file``, skipping blank lines and comments,
+        and writes the results to stdout. Returns their :class:`_BatchStats`.
+
+        """
+        urls = (line for line in (line.strip() for line in url_file)
+                if line and not line.startswith('#'))
+        results = auto_scrape_many(urls, fields=self.get_fields(options),
+                                   api_keys=self.get_api_keys(options),
+                                   max_workers=options.workers,
+                                   per_provider=options.per_provider,
+                                   ordered=options.ordered)
+        stats = _BatchStats()
+        writer = NDJSONWriter(sys.stdout, fields=self.get_fields(options),
+                              chunk_size=0)
+        for result in results:
+            stats.add(result)
+            writer.write(result)
+        writer.flush()
+        return stats
+
+    def handle_feed(self):
+        """Handler for auto_feed."""
+        parser = self.build_parser("%prog feed [options] URL\n\n"
+                                   "Writes one JSON object per line to stdout "
+                                   "for each item in the feed, then the "
+                                   "validators to pass to --etag and "
+                                   "--last-modified next time to stderr.")
+        self.add_scrape_options(parser)
+        parser.add_option("--crawl", dest="crawl", action="store_true",
+                          default=False,
+                          help="continue onto subsequent pages of the feed.")
+        parser.add_option("--max-results", dest="max_results", type="int",
+                          help="maximum number of items to return.")
+        parser.add_option("--etag", dest="etag",
+                          help="etag from a previous run; nothing is "
+                          "returned if the feed is unchanged.")
+        parser.add_option("--last-modified", dest="last_modified",
+                          help="last-modified date from a previous run, "
+                          "sent as If-Modified-Since; nothing is returned "
+                          "if the feed is unchanged.")
+        parser.add_option("--lookahead", dest="lookahead", type="int",
+                          default=1,
+                          help="number of items to fill in at once. "
+                          "Default: %default")
+        parser.add_option("--prefetch-pages", dest="prefetch_pages",
+                          type="int", default=0,
+                          help="number of pages to fetch ahead when "
+                          "crawling. Default: %default")
+        (options, args) = parser.parse_args()
+
+        if len(args) != 1:
+            parser.error("One URL needed.")
+
+        http_last_modified = None
+        if options.last_modified:
+            if parse_http_date(options.last_modified) is not None:
+                http_last_modified = options.last_modified
+            else:
+                http_last_modified = format_http_date(
+                                    date_parser.parse(options.last_modified))
+
+        feed = auto_feed(args[0], fields=self.get_fields(options),
+                         crawl=options.crawl,
+                         max_results=options.max_results,
+                         api_keys=self.get_api_keys(options),
+                         etag=options.etag,
+                         lookahead=options.lookahead,
+                         prefetch_pages=options.prefetch_pages,
+                         http_last_modified=http_last_modified)
+        write_ndjson(feed, sys.stdout, fields=self.get_fields(options),
+                     chunk_size=0)
+
+        if feed.not_modified:
+            print >> sys.stderr, "not-modified: true"
+        if feed.etag:
+            print >> sys.stderr, "etag: %s" % feed.etag
+        if feed.http_last_modified:
+            print >> sys.stderr, "last-modified: %s" % feed.http_last_modified
+        return 0
+
     def handle_help(self, error=None):
         """Handles help."""
         parser = self.build_parser("%prog [command]")
@@ -184,11 +383,54 @@ class SlidescraperCommandHandler(object):
         try:
             cmd = sys.argv.pop(1)
             cmd = "".join(c for c in cmd if c.isalpha())
+            cmd = self.aliases.get(cmd, cmd)
             handler = getattr(self, "handle_%s" % cmd)
         except AttributeError:
             return self.handle_help(error='%s is not a valid command.' % cmd)
 
         return handler()
 
+
+class _BatchStats(object):
+    """Collects the numbers reported at the end of a ``batch`` run."""
+
+    def __init__(self):
+        self.start = time.time()
+        self.count = 0
+        self.errors = {}
+        self.latencies = {}
+
+    def add(self, result):
+        self.count += 1
+        if not result.ok:
+            name = type(result.error).__name__
+            self.errors[name] = self.errors.get(name, 0) + 1
+        if result.elapsed is not None:
+            self.latencies.setdefault(result.slides.provider, []).append(
+                                                                result.elapsed)
+
+    def report(self, out):
+        elapsed = time.time() - self.start
+        error_count = sum(self.errors.values())
+        print >> out, "Scraped %d urls in %.2fs (%.1f urls/s), %d errors" % (
+            self.count, elapsed, self.count / elapsed if elapsed else 0.0,
+            error_count)
+        for name, count in sorted(self.errors.items()):
+            print >> out, "    %s: %d" % (name, count)
+        if self.latencies:
+            print >> out, "%-16s %8s %8s %8s %8s" % ("provider", "count",
+                                                     "mean", "p50", "p95")
+        for provider, latencies in sorted(self.latencies.items()):
+            latencies.sort()
+            print >> out, "%-16s %8d %7.3fs %7.3fs %7.3fs" % (
+                provider, len(latencies), sum(latencies) / len(latencies),
+                _percentile(latencies, 50), _percentile(latencies, 95))
+
+
+def _percentile(values, percent):
+    """Returns the ``percent`` percentile of the sorted list ``values``."""
+    index = int(round(percent / 100.0 * (len(values) - 1)))
+    return values[index]
+
 if __name__ == "__main__":
     sys.exit(SlidescraperCommandHandler().main())
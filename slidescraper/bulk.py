@@ -0,0 +1,212 @@
+import collections
+import Queue
+import time
+from multiprocessing.pool import ThreadPool
+
+from slidescraper.exceptions import UnhandledURL
+from slidescraper.slides import Slides
+
+
+class ScrapeResult(object):
+    """
+    The outcome of scraping a single url as part of a :class:`BulkScrape`.
+
+    .. attribute:: index
+
+       The position of :attr:`url` in the input.
+
+    .. attribute:: url
+
+       The url which was scraped.
+
+    .. attribute:: slides
+
+       The loaded :class:`.Slides` instance, or ``None`` if no suite could
+       handle the url.
+
+    .. attribute:: error
+
+       The exception raised while resolving or loading the url, or ``None``
+       if the scrape succeeded.
+
+    .. attribute:: elapsed
+
+       The number of seconds spent loading the slides, or ``None`` if they
+       were never loaded.
+
+    """
+
+    def __init__(self, index, url, slides=None, error=None):
+        self.index = index
+        self.url = url
+        self.slides = slides
+        self.error = error
+        self.elapsed = None
+
+    @property
+    def ok(self):
+        """``True`` if the url was scraped without an error."""
+        return self.error is None
+
+    def __repr__(self):
+        if self.ok:
+            return '<ScrapeResult %s>' % self.url
+        return '<ScrapeResult %s: %r>' % (self.url, self.error)
+
+
+def _scrape(result, done):
+    start = time.time()
+    try:
+        result.slides.load()
+    except Exception, e:
+        result.error = e
+    result.elapsed = time.time() - start
+    done.put(result)
+
+
+class BulkScrape(object):
+    """
+    Scrapes many urls at once. Iterating over a :class:`BulkScrape` yields a
+    :class:`ScrapeResult` for every input url. A failure to scrape one url
+    (for example :exc:`.UnhandledURL` or :exc:`.SlidesDeleted`) is reported
+    on its result and does not stop the others.
+
+    :param urls: An iterable of slide urls. It is consumed lazily, so it may
+                 be a generator over a very large input.
+    :param fields: Passed on to each :class:`.Slides` instance.
+    :param api_keys: Passed on to each :class:`.Slides` instance.
+    :param max_workers: The maximum number of scrapes in flight at once.
+                        Each iteration runs its scrapes on a pool of this
+                        many threads of its own, which is closed when the
+                        iteration ends.
+    :param per_provider: The maximum number of scrapes in flight for any one
+                         provider. May be an integer applying to every
+                         provider or a dictionary mapping a suite's
+                         ``provider_name`` to its limit; providers missing
+                         from the dictionary are only bound by
+                         ``max_workers``. Limits must be at least 1.
+    :param ordered: If ``True``, results are yielded in input order, and no
+                    url is read more than ``max_workers`` places ahead of the
+                    next result to be yielded, so at most that many results
+                    are held back. Otherwise (the default) they are yielded
+                    as soon as they complete.
+
+    :raises ValueError: if ``max_workers`` or a provider limit is below 1.
+
+    """
+
+    def __init__(self, urls, fields=None, api_keys=None, max_workers=16,
+                 per_provider=4, ordered=False):
+        from slidescraper.suites import registry
+        if isinstance(per_provider, dict):
+            limits = per_provider.values()
+        else:
+            limits = [per_provider]
+        if max_workers < 1 or min(limits or [1]) < 1:
+            raise ValueError('max_workers and per_provider limits must be '
+                             'at least 1')
+        self._registry = registry
+        self.urls = urls
+        self.fields = fields
+        self.api_keys = api_keys
+        self.max_workers = max_workers
+        self.per_provider = per_provider
+        self.ordered = ordered
+
+    def provider_limit(self, provider):
+        """Returns the number of concurrent scrapes allowed for ``provider``."""
+        if isinstance(self.per_provider, dict):
+            return self.per_provider.get(provider, self.max_workers)
+        return self.per_provider
+
+    def _resolve(self, index, url):
+        try:
+            suite = self._registry.suite_for_slide_url(url)
+            slides = Slides(url, suite=suite, fields=self.fields,
+                            api_keys=self.api_keys)
+        except UnhandledURL, e:
+            return ScrapeResult(index, url, error=e)
+        return ScrapeResult(index, url, slides=slides)
+
+    def _results(self, pool, position=None):
+        """
+        Yields results in completion order, running the scrapes on ``pool``.
+        If ``position`` is given, it is a one-item list holding the index of
+        the next result the caller needs, and no url more than
+        ``max_workers`` places beyond it is read.
+
+        """
+        done = Queue.Queue()
+        urls = enumerate(self.urls)
+        read = 0
+        waiting = collections.defaultdict(collections.deque)
+        active = collections.defaultdict(int)
+        in_flight = 0
+        parked = 0
+        exhausted = False
+
+        def can_start(provider):
+            return (in_flight < self.max_workers and
+                    active[provider] < self.provider_limit(provider))
+
+        while True:
+            # Start parked scrapes whose provider has a free slot again.
+            for provider, queue in waiting.items():
+                while queue and can_start(provider):
+                    pool.apply_async(_scrape, (queue.popleft(), done))
+                    active[provider] += 1
+                    in_flight += 1
+                    parked -= 1
+
+            # Read more input while there is capacity. Parked urls count
+            # against the read-ahead so one saturated provider cannot make
+            # us buffer the whole input.
+            while (not exhausted and in_flight < self.max_workers and
+                   parked < self.max_workers and
+                   (position is None or
+                    read < position[0] + self.max_workers)):
+                try:
+                    index, url = urls.next()
+                except StopIteration:
+                    exhausted = True
+                    break
+                read += 1
+                result = self._resolve(index, url)
+                if not result.ok:
+                    yield result
+                    continue
+                provider = result.slides.provider
+                if can_start(provider):
+                    pool.apply_async(_scrape, (result, done))
+                    active[provider] += 1
+                    in_flight += 1
+                else:
+                    waiting[provider].append(result)
+                    parked += 1
+
+            if not in_flight:
+                break
+
+            result = done.get()
+            active[result.slides.provider] -= 1
+            in_flight -= 1
+            yield result
+
+    def __iter__(self):
+        pool = ThreadPool(self.max_workers)
+        try:
+            if not self.ordered:
+                for result in self._results(pool):
+                    yield result
+                return
+
+            pending = {}
+            position = [0]
+            for result in self._results(pool, position):
+                pending[result.index] = result
+                while position[0] in pending:
+                    yield pending.pop(position[0])
+                    position[0] += 1
+        finally:
+            # Scrapes which are still running finish in the background.
+            pool.close()
@@ -39,3 +39,26 @@ class UnhandledURL(SlidescraperError):
 class SlidesDeleted(SlidescraperError):
     """Raised if the remote server has deleted the slides being scraped."""
     pass
+
+class ProviderUnavailable(SlidescraperError):
+    """
+    Raised instead of making a request while the circuit breaker of a
+    provider is open because its recent requests have been failing.
+
+    """
+    pass
+
+class MethodsFailed(SlidescraperError):
+    """
+    Raised if every :class:`.SuiteMethod` used to scrape slides failed.
+
+    .. attribute:: errors
+
+       A dictionary mapping the name of each failed method to the exception
+       it raised.
+
+    """
+    def __init__(self, errors):
+        self.errors = errors
+        super(MethodsFailed, self).__init__(
+            '; '.join('%s: %r' % item for item in sorted(errors.items())))
@@ -23,14 +23,80 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF
 # THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import collections
 import json
-import datetime
-
-from slidescraper.exceptions import UnhandledURL, SlidesDeleted
+import Queue
+import sys
+import threading
+import time
+
+from slidescraper.exceptions import (UnhandledURL, SlidesDeleted,
+                                     MethodsFailed)
+from slidescraper.utils import metrics
+from slidescraper.utils.concurrency import get_pool, iterate_async
+from slidescraper.utils.html import EmbedCode
+from slidescraper.utils.ndjson import json_default
 #from slidescraper.utils.search import (search_string_from_terms,
 #                                       terms_from_search_string)
 
 
+#: The fields of :class:`Slides`, in storage order.
+SLIDES_FIELDS = (
+    'title', 'description', 'publish_datetime', 
+    'link', 'embed_code', 'thumbnail_url',
+    'language', 'view_count', 'slide_count', 'license_url',
+    'file_url', 'file_format',
+    'user', 'user_url', 'tags',  'guid',
+    'index', 'provider'
+)
+
+FIELD_INDEX = dict((name, i) for i, name in enumerate(SLIDES_FIELDS))
+
+#: Fields whose values come from a small set and repeat across many slides,
+#: so are shared between instances instead of being stored once per instance.
+INTERNED_FIELDS = frozenset(('provider', 'language', 'file_format'))
+
+#: The most distinct values which are interned. Values seen once the table
+#: is full are stored as they are.
+MAX_INTERNED = 1024
+
+_interned = {}
+
+
+class _Field(object):
+    """
+    Descriptor for a :class:`Slides` field. Values are stored in the
+    instance's ``_values`` list. Reading a field which has no value on a lazy
+    :class:`Slides` instance loads it on demand, and embed codes stored as an
+    :class:`~slidescraper.utils.html.EmbedCode` are rendered on access.
+
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.index = FIELD_INDEX[name]
+        self.interned = name in INTERNED_FIELDS
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return None
+        value = instance._values[self.index]
+        if value is None and instance.lazy:
+            value = instance._load_field(self.name)
+        if isinstance(value, EmbedCode):
+            return value.render()
+        return value
+
+    def __set__(self, instance, value):
+        if self.interned and isinstance(value, basestring):
+            shared = _interned.get(value)
+            if shared is not None:
+                value = shared
+            elif len(_interned) < MAX_INTERNED:
+                value = _interned.setdefault(value, value)
+        instance._values[self.index] = value
+
+
 class Slides(object):
     """
     This is the class which should be used to represent slides which are
@@ -42,34 +108,48 @@ class Slides(object):
                   If no suite is provided, one will be auto-selected based on the ``url``.
     :param fields: A list of fields which should be fetched for the slide show. 
                    This may be used to optimize the fetching process.
+    :param lazy: If ``True``, nothing is fetched until a requested field
+                 without a value is read. The cheapest method which provides
+                 that field is then run, and every other field it returns is
+                 filled in too, so fields which are never read never cost a
+                 request. If the method fails, reading the field gives
+                 ``None`` and the failure is recorded in :attr:`errors`.
+                 Default: ``False``.
+
+    In lazy mode, :attr:`missing_fields` never triggers a fetch; it lists the
+    requested fields which do not have a value yet. :meth:`is_loaded` becomes
+    ``True`` once every requested field has been attempted (or after
+    :meth:`load`), and :meth:`items` and :meth:`to_json` call :meth:`load`
+    first so that all remaining fields are fetched in one go.
+
+    .. attribute:: errors
+
+       ``None``, or a dictionary mapping the name of each suite method which
+       failed while loading the slides to the exception it raised.
 
     """
+    __slots__ = ('_values', 'fields', 'url', '_suite', 'api_keys', 'lazy',
+                 '_loaded', '_attempted', 'errors')
+
     # FIELDS
-    _all_fields = (
-        'title', 'description', 'publish_datetime', 
-        'link', 'embed_code', 'thumbnail_url',
-        'language', 'view_count', 'slide_count', 'license_url',
-        'file_url', 'file_format',
-        'user', 'user_url', 'tags',  'guid',
-        'index', 'provider'
-    )
+    _all_fields = SLIDES_FIELDS
     #: The canonical link to the slideshow. This may not be the same as the url
     #: used to initialize the slideshow.
-    link = None
+    link = _Field('link')
     #: A (supposedly) global identifier for the slideshow
-    guid = None
+    guid = _Field('guid')
     #: Where the slideshow was in the feed/search
-    index = None
+    index = _Field('index')
     #: The slideshow's title.
-    title = None
+    title = _Field('title')
     #: A text or html description of the slideshow.
-    description = None
+    description = _Field('description')
     #: A python datetime indicating when the slideshow was published.
-    publish_datetime = None
+    publish_datetime = _Field('publish_datetime')
     #: The url to the actual slideshow download file.
-    file_url = None
+    file_url = _Field('file_url')
     #: The format for the slideshow download file
-    file_format = None
+    file_format = _Field('file_format')
 #    #: The length of the actual video file
 #    file_url_length = None
 #    #: a datetime.datetime() representing when we think the file URL is no
@@ -77,47 +157,48 @@ class Slides(object):
 #    file_url_expires = None
     #: The actual embed code which can be used for displaying the video in a
     #: browser.
-    embed_code = None
+    embed_code = _Field('embed_code')
     #: The url for a thumbnail of the video.
-    thumbnail_url = None
+    thumbnail_url = _Field('thumbnail_url')
     #: The username associated with the video.
-    user = None
+    user = _Field('user')
     #: The url associated with the video's user.
-    user_url = None
+    user_url = _Field('user_url')
     #: A list of tag names associated with the video.
-    tags = None
+    tags = _Field('tags')
     #: A URL to a description of the license the Video is under (often Creative
     #: Commons)
-    license_url = None
+    license_url = _Field('license_url')
     #: Number of times the video has been viewed
-    view_count = None
+    view_count = _Field('view_count')
     #: The name of the video hosting provider
-    provider = None
+    provider = _Field('provider')
     
-    language = None
-    slide_count = None
+    language = _Field('language')
+    slide_count = _Field('slide_count')
 
     # These were pretty suite-specific and should perhaps be treated as such?
     #: Whether the video is embeddable? (Youtube, Vimeo)
     is_embeddable = None
 
     # OTHER ATTRS
-    #: The url for this video to scrape based on.
-    url = None
-    #: An iterable of fields to be fetched for this video. Other fields will
-    #: not populated during scraping.
-    fields = None
+    # These are slots: url (the url for this video to scrape based on),
+    # fields (a tuple of fields to be fetched for this video; other fields
+    # will not be populated during scraping), lazy (whether fields are
+    # loaded on first access, see above) and errors (see above).
 
-    def __init__(self, url, suite=None, fields=None, api_keys=None):
+    def __init__(self, url, suite=None, fields=None, api_keys=None,
+                 lazy=False):
         from slidescraper.suites import registry
         if suite is None:
             suite = registry.suite_for_slide_url(url)
         elif not suite.handles_slide_url(url):
             raise UnhandledURL
+        self._values = [None] * len(SLIDES_FIELDS)
         if fields is None:
-            self.fields = list(self._all_fields)
+            self.fields = self._all_fields
         else:
-            self.fields = [f for f in fields if f in self._all_fields]
+            self.fields = tuple(f for f in fields if f in self._all_fields)
         self.url = url
         self._suite = suite
         self.api_keys = api_keys if api_keys is not None else {}
@@ -128,6 +209,18 @@ class Slides(object):
         # from a feed or a search.
         self._loaded = False
 
+        self.lazy = lazy
+        # Fields which a lazy load has already tried to fill.
+        self._attempted = set() if lazy else None
+        self.errors = None
+
+    def __getstate__(self):
+        return dict((name, getattr(self, name)) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
     @property
     def missing_fields(self):
         """
@@ -135,7 +228,40 @@ class Slides(object):
         been filled with data.
 
         """
-        return [f for f in self.fields if getattr(self, f) is None]
+        values = self._values
+        return [f for f in self.fields if values[FIELD_INDEX[f]] is None]
+
+    def _load_field(self, name):
+        """
+        Runs the cheapest method which can provide ``name`` and fills in
+        every missing field it covers. Each field is only attempted once;
+        failures are recorded in :attr:`errors` rather than raised.
+
+        """
+        if (self._loaded or name in self._attempted or
+                name not in self.fields):
+            return None
+        methods = self.suite.find_best_methods(set([name]))
+        # Ask the chosen methods for every missing field they cover, so that
+        # the fields marked as attempted are really processed.
+        fields = set([name])
+        for method in methods:
+            fields.update(method.fields)
+        fields &= set(self.missing_fields) | set([name])
+        self._attempted.update(fields)
+        if methods:
+            errors = {}
+            try:
+                data = self.suite.run_methods(self, fields=fields,
+                                              errors=errors)
+            except MethodsFailed, e:
+                self._add_errors(e.errors)
+                return None
+            self._add_errors(errors)
+            missing = set(self.missing_fields)
+            self._apply(dict((field, value) for field, value in data.items()
+                             if field in missing))
+        return self._values[FIELD_INDEX[name]]
 
     @property
     def suite(self):
@@ -143,12 +269,52 @@ class Slides(object):
         return self._suite
 
     def load(self):
-        """Uses the slideshow's :attr:`suite` to fetch the fields for the slideshow."""
+        """
+        Uses the slideshow's :attr:`suite` to fetch the fields for the
+        slideshow. If some of the suite's methods fail, the fields from the
+        others are still filled in and the failures are recorded in
+        :attr:`errors`; if all of them fail, :exc:`.MethodsFailed` is raised.
+        """
         if not self._loaded:
-            data = self.suite.run_methods(self)
+            errors = {}
+            sink = metrics.sink
+            if sink.enabled:
+                start = time.time()
+            try:
+                data = self.suite.run_methods(self, errors=errors)
+            except MethodsFailed, e:
+                self._add_errors(e.errors)
+                raise
+            finally:
+                if sink.enabled:
+                    sink.observe('slides.load', time.time() - start,
+                                 provider=self.suite.provider_name)
+            self._add_errors(errors)
             self._apply(data)
             self._loaded = True
 
+    def _add_errors(self, errors):
+        if errors:
+            if self.errors is None:
+                self.errors = {}
+            self.errors.update(errors)
+
+    def load_async(self, callback=None, pool=None):
+        """
+        Runs :meth:`load` on a worker thread and returns immediately with a
+        :class:`multiprocessing.pool.AsyncResult`. Its ``get()`` method
+        returns this instance once loading has finished, or re-raises the
+        error which stopped it. If ``callback`` is given, it is called with
+        this instance from the worker thread when loading succeeds.
+
+        The work runs on ``pool`` if one is given, or else on the shared
+        ``scrape`` pool (see :mod:`slidescraper.utils.concurrency`).
+
+        """
+        if pool is None:
+            pool = get_pool('scrape')
+        return pool.apply_async(_load_slides, (self,), callback=callback)
+
     def _apply(self, data):
         """
         Stores values from a ``data`` dictionary in the corresponding fields
@@ -159,10 +325,18 @@ class Slides(object):
             setattr(self, field, data[field])
 
     def is_loaded(self):
+        if self.lazy and not self._loaded:
+            return self._attempted.issuperset(self.fields)
         return self._loaded
 
     def items(self):
-        """Iterator over (field, value) for requested fields."""
+        """
+        Iterator over (field, value) for requested fields. Lazy instances are
+        loaded first.
+
+        """
+        if self.lazy:
+            self.load()
         for mem in self.fields:
             yield (mem, getattr(self, mem))
 
@@ -175,15 +349,15 @@ class Slides(object):
 
         >>> v.to_json(indent=2, sort_keys=True)
         """
-        def json_dump_helper(obj):
-            if isinstance(obj, datetime.datetime):
-                return obj.isoformat()
-            raise TypeError("%r is not serializable" % (obj,))
-
-        kw['default'] = json_dump_helper
+        kw['default'] = json_default
         return json.dumps(dict(self.items()), **kw)
 
 
+def _load_slides(slides):
+    slides.load()
+    return slides
+
+
 class BaseSlideIterator(object):
     """
     Generic base class for url-based iterators which rely on suites to yield
@@ -193,6 +367,20 @@ class BaseSlideIterator(object):
     _first_response = None
     _max_results = None
 
+    #: The number of items which are loaded ahead of the one being yielded.
+    #: Values above 1 load items concurrently on the shared scrape pool.
+    lookahead = 1
+
+    #: When crawling, the number of pages which may be fetched ahead of the
+    #: page being consumed. ``0`` fetches each page only once the previous
+    #: one is exhausted.
+    prefetch_pages = 0
+
+    #: ``True`` if the server reported that the first response has not
+    #: changed since the validators the iterator was created with. Iteration
+    #: then yields nothing.
+    not_modified = False
+
     @property
     def max_results(self):
         """
@@ -212,7 +400,9 @@ class BaseSlideIterator(object):
         raise NotImplementedError
 
     def handle_first_response(self, response):
-        self._first_response = response 
+        self._first_response = response
+        if response is None:
+            self.not_modified = True
 
     def get_response_items(self, response):
         raise NotImplementedError
@@ -223,60 +413,268 @@ class BaseSlideIterator(object):
     def get_next_url(self, response):
         raise NotImplementedError
 
+    def close_response(self, response):
+        """
+        Releases what a ``response`` which will not be read holds, such as
+        the connection of a streamed response. By default, does nothing.
+
+        """
+
     def load(self):
-        if self._first_response:
+        if self._first_response or self.not_modified:
             return self._first_response
         url = self.get_first_url()
         response = self.get_url_response(url)
         self.handle_first_response(response)
         return response
 
+    def load_async(self, callback=None, pool=None):
+        """
+        Runs :meth:`load` on a worker thread and returns an
+        :class:`~multiprocessing.pool.AsyncResult` whose ``get()`` returns
+        this iterator once its first response has been fetched. The work
+        runs on ``pool`` if one is given, or else on the shared ``feed``
+        pool.
+
+        """
+        if pool is None:
+            pool = get_pool('feed')
+        return pool.apply_async(_load_iterator, (self,), callback=callback)
+
+    def iter_async(self, callback, pool=None):
+        """
+        Iterates over this instance on worker threads, calling ``callback``
+        with each :class:`Slides` as it is yielded. Each item is a separate
+        task on ``pool`` (by default the shared ``feed`` pool), so the
+        iteration does not hold a worker while it waits for its callback to
+        be scheduled again; see
+        :func:`~slidescraper.utils.concurrency.iterate_async`. Returns an
+        :class:`~slidescraper.utils.concurrency.AsyncIteration` whose
+        ``get()`` returns the number of items delivered, or re-raises the
+        error which stopped the iteration.
+
+        """
+        if pool is None:
+            pool = get_pool('feed')
+        return iterate_async(self, callback, pool)
+
     def _data_from_item(self, item):
         """
         Returns a :class:`Slides` given some data from a feed.
         """
-        data = self.get_item_data(item)
+        sink = metrics.sink
+        if sink.enabled:
+            start = time.time()
+            data = self.get_item_data(item)
+            sink.observe('feed.parse', time.time() - start,
+                         provider=self.suite.provider_name)
+        else:
+            data = self.get_item_data(item)
         slides = self.suite.get_slides(data['link'],
                                      fields=self.fields,
                                      api_keys=self.api_keys)
         slides._apply(data)
-        slides.load()  # Fill in missing data from alternate methods
+        try:
+            slides.load()  # Fill in missing data from alternate methods
+        except MethodsFailed:
+            # Keep what the feed provided; the failures are in slides.errors.
+            pass
+        if sink.enabled:
+            sink.observe('feed.entry', time.time() - start,
+                         provider=self.suite.provider_name)
         return slides
 
-    def __iter__(self):
+    def _iter_items(self):
+        """
+        Yields the raw items of the first response and, if crawling, of each
+        following page. The next page is only requested once the current
+        page has been exhausted.
+
+        """
+        response = self.load()
+        if self.not_modified:
+            return
+        while True:
+            item_count = 0
+            for item in self.get_response_items(response):
+                item_count += 1
+                yield item
+
+            # Continue to the next page if:
+            # - crawl is enabled
+            # - the current page was not empty
+            # - a url can be calculated for the next page.
+            url = None
+            if self.crawl and item_count:
+                url = self.get_next_url(response)
+            if url is None:
+                break
+            response = self.get_url_response(url)
+
+    def _iter_items_prefetched(self):
+        """
+        Like :meth:`_iter_items`, but as soon as the first response has been
+        fetched, the following pages are fetched on a background thread,
+        keeping up to :attr:`prefetch_pages` pages fetched or in flight ahead
+        of the page being consumed. Pages are handed over as responses, so
+        streamed pages are still parsed as their items are consumed.
+        Iteration stops when a page comes back empty or there is no next
+        page; abandoning it (for example because :attr:`max_results` was
+        reached) stops the prefetching too, and pages which were fetched
+        but not read are closed with :meth:`close_response`.
+
+        """
+        response = self.load()
+        if self.not_modified:
+            return
+
+        pages = Queue.Queue()
+        slots = Queue.Queue()
+        for i in xrange(self.prefetch_pages):
+            slots.put(True)
+        stop = threading.Event()
+        thread = threading.Thread(target=self._prefetch_pages,
+                                  args=(response, pages, slots, stop))
+        thread.daemon = True
+        thread.start()
         try:
-            response = self.load()
-            item_count = 1
-            # decrease the index as we count down through the entries.  doesn't
-            # quite work for feeds where we don't know the /total/ number of
-            # items; then it'll just index the slides within the one feed
-            while self._max_results is None or item_count < self._max_results:
-                items = self.get_response_items(response)
-                for item in items:
-                    try:
-                        slides = self._data_from_item(item)
-                    except SlidesDeleted:
-                        continue
-                    slides.index = item_count
-                    yield slides
-                    if self._max_results is not None:
-                        if item_count >= self._max_results:
-                            raise StopIteration
+            while True:
+                item_count = 0
+                for item in self.get_response_items(response):
                     item_count += 1
+                    yield item
+                if not item_count:
+                    break
+                kind, value = pages.get()
+                if kind is None:
+                    break
+                if kind == 'error':
+                    raise value[0], value[1], value[2]
+                slots.put(True)
+                response = value
+        finally:
+            # Stop the thread, waking it if it is waiting for a slot, and
+            # close the pages it has queued. A page it queues from now on
+            # is closed by the thread itself.
+            stop.set()
+            slots.put(False)
+            self._close_queued_pages(pages)
+
+    def _prefetch_pages(self, response, pages, slots, stop):
+        """
+        Runs on a background thread for :meth:`_iter_items_prefetched`: puts
+        ``('page', response)`` onto ``pages`` for each page following
+        ``response``, then ``(None, None)``. Each page waits for a ``True``
+        token from ``slots``; a ``False`` token or setting ``stop`` ends
+        the thread. An exception is put as ``('error', sys.exc_info())``.
 
-                # We haven't hit the limit yet. Continue to the next page if:
-                # - crawl is enabled
-                # - the current page was not empty
-                # - a url can be calculated for the next page.
-                url = None
-                if self.crawl and items:
-                    url = self.get_next_url(response)
+        """
+        try:
+            while slots.get() and not stop.is_set():
+                url = self.get_next_url(response)
                 if url is None:
                     break
                 response = self.get_url_response(url)
+                pages.put(('page', response))
+                if stop.is_set():
+                    # The consumer may already have closed the queued pages.
+                    self._close_queued_pages(pages)
+                    break
+        except Exception:
+            pages.put(('error', sys.exc_info()))
+        pages.put((None, None))
+
+    def _close_queued_pages(self, pages):
+        """
+        Takes everything queued on ``pages`` by :meth:`_prefetch_pages` and
+        closes the pages found.
+
+        """
+        while True:
+            try:
+                kind, value = pages.get_nowait()
+            except Queue.Empty:
+                return
+            if kind == 'page':
+                self.close_response(value)
+
+    def _iter_slides(self, items):
+        """
+        Yields a loaded :class:`Slides` for each of ``items``, skipping items
+        whose slides have been deleted.
+
+        """
+        for item in items:
+            try:
+                yield self._data_from_item(item)
+            except SlidesDeleted:
+                pass
+
+    def _iter_slides_concurrently(self, items):
+        """
+        Like :meth:`_iter_slides`, but loads up to :attr:`lookahead` items at
+        once on the shared scrape pool while still yielding them in order.
+        No more items are read than are needed to reach :attr:`max_results`.
+
+        """
+        pool = get_pool('scrape')
+        items = iter(items)
+        pending = collections.deque()
+        yielded = 0
+        exhausted = False
+        while True:
+            while (not exhausted and len(pending) < self.lookahead and
+                   (self._max_results is None or
+                    yielded + len(pending) < self._max_results)):
+                try:
+                    item = items.next()
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.append(pool.apply_async(self._data_from_item,
+                                                (item,)))
+            if not pending:
+                break
+            try:
+                slides = pending.popleft().get()
+            except SlidesDeleted:
+                continue
+            yielded += 1
+            yield slides
+
+    def __iter__(self):
+        if self._max_results is not None and self._max_results <= 0:
+            return
+        if self.crawl and self.prefetch_pages > 0:
+            items = self._iter_items_prefetched()
+        else:
+            items = self._iter_items()
+        try:
+            if self.lookahead > 1:
+                results = self._iter_slides_concurrently(items)
+            else:
+                results = self._iter_slides(items)
+            # Doesn't quite work for feeds where we don't know the /total/
+            # number of items; then it'll just index the slides within the
+            # one feed.
+            item_count = 1
+            for slides in results:
+                slides.index = item_count
+                yield slides
+                if (self._max_results is not None and
+                        item_count >= self._max_results):
+                    break
+                item_count += 1
         except NotImplementedError:
             pass
-        raise StopIteration
+        finally:
+            # Stops any page prefetching right away.
+            items.close()
+
+
+def _load_iterator(iterator):
+    iterator.load()
+    return iterator
 
 
 class SlideFeed(BaseSlideIterator):
@@ -294,17 +692,39 @@ class SlideFeed(BaseSlideIterator):
     :param crawl: If ``True``, then the scrape will continue onto subsequent
                   pages of the feed if that is supported by the suite. The
                   request for the next page will only be executed once the
-                  current page is exhausted. Default: ``False``.
+                  current page is exhausted, unless ``prefetch_pages`` is
+                  set or the suite fetches pages concurrently (see
+                  :attr:`.SlideShareSuite.feed_page_concurrency`). Default:
+                  ``False``.
     :param max_results: The maximum number of results to return from iteration.
                         Default: ``None`` (as many as possible.)
     :param api_keys: A dictionary of any API keys which may be required for the
                      suite used by this feed.
-    :param last_modified: A last-modified date which may be sent to the service
-                          provider to try to short-circuit fetching a feed
-                          whose contents are already known.
+    :param last_modified: The date the feed was last changed, as known from
+                          a previous fetch. This is the initial value of
+                          :attr:`last_modified`; it is not sent to the
+                          service provider.
     :param etag: An etag which may be sent to the service provider to try to
                  short-circuit fetching a feed whose contents are already
                  known.
+    :param http_last_modified: The ``Last-Modified`` header of a previous
+                               response for the feed, which may be sent to
+                               the service provider as
+                               ``If-Modified-Since`` to try to short-circuit
+                               fetching a feed whose contents are already
+                               known.
+    :param lookahead: The number of entries to fill in (see
+                      :meth:`Slides.load`) concurrently ahead of the one being
+                      yielded. Entries are still yielded in feed order.
+                      Default: ``1`` (one at a time).
+    :param prefetch_pages: When crawling, the number of pages to fetch in the
+                           background ahead of the page being consumed.
+                           Default: ``0`` (no prefetching).
+
+    If the provider answers the conditional request for the first page with
+    ``304 Not Modified``, :attr:`not_modified` is set, ``last_modified``,
+    ``etag`` and ``http_last_modified`` keep the values given, and iteration
+    yields nothing.
 
     Additionally, :class:`SlideFeed` populates the following attributes after
     fetching its first response. Attributes which are not supported by the
@@ -346,11 +766,26 @@ class SlideFeed(BaseSlideIterator):
 
        A unique identifier for the feed.
 
+    .. attribute:: http_last_modified
+
+       The ``Last-Modified`` header of the first response, if the suite
+       fetched it over HTTP: the validator to send back with a later
+       conditional request. This is the server's date for the response and
+       may differ from :attr:`last_modified`. Before fetching the first
+       response, this will be equal to the ``http_last_modified`` the
+       :class:`SlideFeed` was instantiated with.
+
+    .. attribute:: http_headers
+
+       The HTTP headers of the first response, if the suite fetched it over
+       HTTP.
+
     """
 
     def __init__(self, url, suite=None, fields=None, crawl=False,
                  max_results=None, api_keys=None, last_modified=None,
-                 etag=None):
+                 etag=None, lookahead=1, prefetch_pages=0,
+                 http_last_modified=None):
         from slidescraper.suites import registry
         self.original_url = url
         if suite is None:
@@ -365,6 +800,10 @@ class SlideFeed(BaseSlideIterator):
         self.url = suite.get_feed_url(url, feed=self)
         self.last_modified = last_modified
         self.etag = etag
+        self.lookahead = lookahead
+        self.prefetch_pages = prefetch_pages
+        self.http_last_modified = http_last_modified
+        self.http_headers = None
 
         self.entry_count = None
         self.description = None
@@ -375,9 +814,7 @@ class SlideFeed(BaseSlideIterator):
 
     @property
     def parsed_feed(self):
-        if not self._first_response:
-            self.load()
-        return self._first_response
+        return self.load()
 
     def get_first_url(self):
         return self.url
@@ -387,6 +824,8 @@ class SlideFeed(BaseSlideIterator):
 
     def handle_first_response(self, response):
         super(SlideFeed, self).handle_first_response(response)
+        if self.not_modified:
+            return
         response = self.suite.get_feed_info_response(self, response)
         self.title = self.suite.get_feed_title(self, response)
         self.entry_count = self.suite.get_feed_entry_count(self, response)
@@ -401,11 +840,14 @@ class SlideFeed(BaseSlideIterator):
         return self.suite.get_feed_entries(self, response)
 
     def get_item_data(self, item):
-        return self.suite.parse_feed_entry(item)
+        return self.suite.parse_feed_entry(item, self.fields)
 
     def get_next_url(self, response):
         return self.suite.get_next_feed_page_url(self, response)
 
+    def close_response(self, response):
+        self.suite.close_feed_response(self, response)
+
 
 #class SlideSearch(BaseSlideIterator):
 #    """
@@ -23,19 +23,22 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF
 # THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import copy
 import itertools
 import json
 import operator
 import re
+import time
 import urllib
-import urllib2
+import urlparse
 
 import feedparser
 import requests
-# TODO: can't get this to work with Django (need to remove gevent..)
-#import grequests
 
-from slidescraper.exceptions import UnhandledURL
+from slidescraper.exceptions import (UnhandledURL, SlidesDeleted,
+                                     ProviderUnavailable, MethodsFailed)
+from slidescraper.utils import cache, http, metrics, ratelimit, retry
+from slidescraper.utils.concurrency import get_pool, map_concurrently
 from slidescraper.utils.feedparser import (struct_time_to_datetime,
                                            get_item_thumbnail_url)
 from slidescraper.slides import Slides
@@ -50,12 +53,20 @@ class SuiteRegistry(object):
     A registry of suites. Suites may be registered, unregistered, and iterated
     over.
 
+    Lookups are indexed by host: only suites which declare the url's host in
+    :attr:`BaseSuite.hosts` (or which declare no hosts at all) are asked
+    whether they handle a url, in registration order. Results are memoized
+    per url until the set of registered suites changes.
+
     """
+    #: The number of urls remembered per lookup kind before the memo is reset.
+    memo_size = 10000
 
     def __init__(self):
         self._suites = []
         self._suite_dict = {}
         self._fallback = None
+        self._rebuild_index()
 
     @property
     def suites(self):
@@ -67,6 +78,11 @@ class SuiteRegistry(object):
         if suite not in self._suite_dict:
             self._suite_dict[suite] = suite()
             self._suites.append(self._suite_dict[suite])
+            self._rebuild_index()
+            if suite.rate_limit is not None or suite.api_key_rate_limit is not None:
+                for host in suite.hosts:
+                    ratelimit.configure(host, rate=suite.rate_limit,
+                                        key_rate=suite.api_key_rate_limit)
 
     def register_fallback(self, suite):
         """
@@ -76,28 +92,112 @@ class SuiteRegistry(object):
 
         """
         self._fallback = suite()
+        self._rebuild_index()
 
     def unregister(self, suite):
         """Unregisters a suite if it is registered."""
-        if suite in self._suites:
+        if suite in self._suite_dict:
             self._suites.remove(self._suite_dict[suite])
             del self._suite_dict[suite]
+            self._rebuild_index()
 
-    def suite_for_slide_url(self, url):
+    def _rebuild_index(self):
+        host_index = {}
+        hostless = []
+        for position, suite in enumerate(self._suites):
+            if suite.hosts:
+                for host in suite.hosts:
+                    host_index.setdefault(host.lower(), []).append(
+                                                            (position, suite))
+            else:
+                hostless.append((position, suite))
+        self._host_index = host_index
+        self._hostless = hostless
+        self._host_candidates = {}
+        self._memo = {'slide': {}, 'feed': {}}
+
+    def _candidates(self, url):
         """
-        Returns the first registered suite which can handle the ``url`` as a
-        slide deck or raises :exc:`.UnhandledURL` if no such suite is found.
+        Returns the registered suites which might handle ``url``, in
+        registration order.
+
+        """
+        try:
+            host = (urlparse.urlsplit(url).hostname or '').lower()
+        except ValueError:
+            host = ''
+        try:
+            return self._host_candidates[host]
+        except KeyError:
+            pass
+        matches = dict(self._hostless)
+        labels = host.split('.')
+        for i in xrange(len(labels)):
+            matches.update(self._host_index.get('.'.join(labels[i:]), ()))
+        candidates = [matches[position] for position in sorted(matches)]
+        if len(self._host_candidates) >= self.memo_size:
+            self._host_candidates.clear()
+        self._host_candidates[host] = candidates
+        return candidates
+
+    def _find(self, kind, url):
+        """
+        Returns the first registered suite which handles ``url`` as a
+        ``kind`` ('slide' or 'feed'), or ``None``. Does not consider the
+        fallback suite.
 
         """
-        for suite in self._suites:
+        memo = self._memo[kind]
+        try:
+            return memo[url]
+        except KeyError:
+            pass
+        found = None
+        for suite in self._candidates(url):
             try:
-                if suite.handles_slide_url(url):
-                    return suite
+                if getattr(suite, 'handles_%s_url' % kind)(url):
+                    found = suite
+                    break
             except NotImplementedError:
                 pass
-        if self._fallback and self._fallback.handles_slide_url(url):
-            return self._fallback
-        raise UnhandledURL
+        if len(memo) >= self.memo_size:
+            memo.clear()
+        memo[url] = found
+        return found
+
+    def _find_with_fallback(self, kind, url):
+        suite = self._find(kind, url)
+        if suite is None and self._fallback is not None and \
+                getattr(self._fallback, 'handles_%s_url' % kind)(url):
+            suite = self._fallback
+        return suite
+
+    def handles_slide_url(self, url):
+        """
+        Returns ``True`` if any registered suite (not counting the fallback)
+        can handle the ``url`` as a slide deck.
+
+        """
+        return self._find('slide', url) is not None
+
+    def handles_feed_url(self, url):
+        """
+        Returns ``True`` if any registered suite (not counting the fallback)
+        can handle the ``url`` as a feed.
+
+        """
+        return self._find('feed', url) is not None
+
+    def suite_for_slide_url(self, url):
+        """
+        Returns the first registered suite which can handle the ``url`` as a
+        slide deck or raises :exc:`.UnhandledURL` if no such suite is found.
+
+        """
+        suite = self._find_with_fallback('slide', url)
+        if suite is None:
+            raise UnhandledURL
+        return suite
 
     def suite_for_feed_url(self, url):
         """
@@ -105,15 +205,19 @@ class SuiteRegistry(object):
         feed or raises :exc:`.UnhandledURL` if no such suite is found.
 
         """
-        for suite in self._suites:
-            try:
-                if suite.handles_feed_url(url):
-                    return suite
-            except NotImplementedError:
-                pass
-        if self._fallback and self._fallback.handles_feed_url(url):
-            return self._fallback
-        raise UnhandledURL
+        suite = self._find_with_fallback('feed', url)
+        if suite is None:
+            raise UnhandledURL
+        return suite
+
+    def classify(self, urls, kind='slide'):
+        """
+        Returns a list with the suite which would be used for each of
+        ``urls`` (as slide decks, or as feeds if ``kind`` is ``'feed'``), or
+        ``None`` for urls which no suite can handle.
+
+        """
+        return [self._find_with_fallback(kind, url) for url in urls]
 
 
 #: An instance of :class:`.SuiteRegistry` which is used by :mod:`vidscraper` to
@@ -132,6 +236,15 @@ class SuiteMethod(object):
     #: A set of fields provided by this method.
     fields = set()
 
+    #: How long (in seconds) processed results of this method may be served
+    #: from the method cache. ``None`` uses the suite's
+    #: :attr:`~BaseSuite.cache_ttl`; ``0`` disables caching for this method.
+    cache_ttl = None
+
+    #: The :class:`~slidescraper.utils.retry.RetryPolicy` for this method's
+    #: requests. ``None`` uses the suite's :attr:`~BaseSuite.retry_policy`.
+    retry_policy = None
+
     def get_url(self, slides):
         """
         Returns the url to fetch for this method. Must be implemented by
@@ -140,12 +253,25 @@ class SuiteMethod(object):
         """
         raise NotImplementedError
 
-    def process(self, response):
+    def get_cache_key(self, url):
+        """
+        Returns the key under which the processed result for ``url`` (as
+        returned by :meth:`get_url`) is cached. By default, this is the url
+        itself; methods whose urls contain per-request values should
+        override this to strip them.
+
+        """
+        return url
+
+    def process(self, response, fields=None):
         """
         Parse the :mod:`requests` response into a dictionary mapping
         :class:`.Slides` field names to values. Must be implemented by
         subclasses.
 
+        If ``fields`` is given, only those fields are needed; methods may
+        leave out the others, and should skip any work done only for them.
+
         """
         raise NotImplementedError
 
@@ -165,7 +291,7 @@ class OEmbedMethod(SuiteMethod):
     def get_url(self, slides):
         return u"%s?url=%s&maxwidth=%d" % (self.endpoint, urllib.quote_plus(slides.url), 620)
 
-    def process(self, response):
+    def process(self, response, fields=None):
         parsed = json.loads(response.text)
         data = {
             'title': parsed['title'],
@@ -187,6 +313,12 @@ class BaseSuite(object):
     #: An identifier string for the suite
     provider_name = None
 
+    #: A tuple of host names which this suite's slide and feed urls live on.
+    #: Subdomains of these hosts are included. The registry only asks a suite
+    #: about urls on its hosts; suites which leave this empty are asked about
+    #: every url.
+    hosts = ()
+
     #: A string or precompiled regular expression which will be matched against
     #: slide urls to check if they can be handled by this suite.
     slide_regex = None
@@ -204,14 +336,48 @@ class BaseSuite(object):
     #: .. seealso:: :meth:`BaseSuite.run_methods`
     methods = ()
 
+    #: If ``True``, the methods selected by :meth:`run_methods` are fetched
+    #: at the same time from a shared thread pool instead of one after the
+    #: other. Results are still merged in method order.
+    fetch_concurrently = True
+
+    #: The default time to live (in seconds) of this suite's entries in the
+    #: method cache. ``None`` uses the cache's default; ``0`` disables caching
+    #: for this suite. See :mod:`slidescraper.utils.cache`.
+    cache_ttl = None
+
+    #: The maximum number of requests per second made to this suite's
+    #: :attr:`hosts`, or ``None`` for no fixed limit. Registering the suite
+    #: configures :mod:`slidescraper.utils.ratelimit` with it; requests are
+    #: slowed down whenever the provider answers ``429`` or ``503`` either
+    #: way.
+    rate_limit = None
+
+    #: Like :attr:`rate_limit`, but for the requests made with each API key.
+    api_key_rate_limit = None
+
+    #: The :class:`~slidescraper.utils.retry.RetryPolicy` for requests made by
+    #: methods which don't set their own.
+    retry_policy = retry.RetryPolicy()
+
+    #: The number of consecutive failed method requests after which
+    #: requests to this suite's provider fail with
+    #: :exc:`.ProviderUnavailable` without being made, for
+    #: :attr:`circuit_breaker_timeout` seconds. ``None`` disables the circuit
+    #: breaker.
+    circuit_breaker_threshold = 5
+    circuit_breaker_timeout = 30
+
     def __init__(self):
         if isinstance(self.slide_regex, basestring):
             self.slide_regex = re.compile(self.slide_regex)
         if isinstance(self.feed_regex, basestring):
             self.feed_regex = re.compile(self.feed_regex)
+        self._compile_methods()
 
     def __getstate__(self):
         state = self.__dict__.copy()
+        state.pop('_planner', None)
         regexes = {}
         for key, value in state.items():
             if isinstance(value, RegexpPattern):
@@ -226,6 +392,7 @@ class BaseSuite(object):
         for key, value in regexes.items():
             state[key] = re.compile(value)
         self.__dict__ = state
+        self._compile_methods()
 
     @property
     def available_fields(self):
@@ -279,41 +446,93 @@ class BaseSuite(object):
         """Returns a slide deck using this suite."""
         return Slides(url, self, **kwargs)
 
+    def _compile_methods(self):
+        """
+        Precompiles :attr:`methods` for :meth:`find_best_methods`: every field
+        gets a bit, every combination of methods (in preference order) gets
+        the bitmask of the fields it provides, and an empty plan cache is
+        created.
+
+        """
+        field_bits = {}
+        masks = []
+        for method in self.methods:
+            mask = 0
+            for field in method.fields:
+                if field not in field_bits:
+                    field_bits[field] = 1 << len(field_bits)
+                mask |= field_bits[field]
+            masks.append(mask)
+
+        combinations = []
+        indices = range(len(self.methods))
+        for size in xrange(1, len(self.methods) + 1):
+            for combination in itertools.combinations(indices, size):
+                mask = 0
+                for i in combination:
+                    mask |= masks[i]
+                combinations.append((tuple(self.methods[i]
+                                           for i in combination), mask))
+
+        self._planner = (self.methods, field_bits, combinations, {})
+
     def find_best_methods(self, missing_fields):
         """
-        Generates a dictionary where the keys are numbers of remaining fields
-        and the values are combinations of methods that promise to yield that
-        number of remaining fields, in the order that they are encountered.
+        Returns the combination of methods which fills the most of the
+        ``missing_fields``. The smallest combination which fills all of them
+        is preferred, with ties going to the methods listed first; if no
+        combination fills all of them, the first combination which leaves the
+        fewest unfilled is returned.
+
+        Plans are cached per set of missing fields.
 
         """
+        if self._planner[0] is not self.methods:
+            self._compile_methods()
+        methods, field_bits, combinations, plans = self._planner
+
+        missing_fields = frozenset(missing_fields)
+        try:
+            return plans[missing_fields]
+        except KeyError:
+            pass
+
+        # Fields which no method provides can never be filled; they count
+        # against every combination equally.
+        missing_mask = 0
+        unfillable = 0
+        for field in missing_fields:
+            if field in field_bits:
+                missing_mask |= field_bits[field]
+            else:
+                unfillable += 1
+
         # Our initial state is that we cover none of the missing fields, and
         # that we use none of the available methods.
         min_remaining = len(missing_fields)
         best_methods = []
-
-        # Loop through all combinations of any size that can be made with the
-        # available methods.
-        for size in xrange(1, len(self.methods) + 1):
-            for methods in itertools.combinations(self.methods, size):
-                # First, build a set of the fields that are provided by the
-                # methods.
-                field_set = reduce(operator.or_, (m.fields for m in methods))
-                remaining = len(missing_fields - field_set)
-
-                # If these methods fill all the missing fields, take them
-                # immediately.
-                if not remaining:
-                    return methods
-
-                # Otherwise, note the methods iff they would decrease the 
-                # number of missing fields.
-                if remaining < min_remaining:
-                    best_methods = methods
-                    min_remaining = remaining
+        for methods, mask in combinations:
+            remaining = bin(missing_mask & ~mask).count('1') + unfillable
+
+            # If these methods fill all the missing fields, take them
+            # immediately.
+            if not remaining:
+                best_methods = methods
+                break
+
+            # Otherwise, note the methods iff they would decrease the number
+            # of missing fields. Once everything fillable is filled, no later
+            # combination can do better.
+            if remaining < min_remaining:
+                best_methods = methods
+                min_remaining = remaining
+                if remaining == unfillable:
+                    break
+
+        plans[missing_fields] = best_methods
         return best_methods
 
-
-    def run_methods(self, slides):
+    def run_methods(self, slides, fields=None, errors=None):
         """
         Selects methods from :attr:`methods` which can be used in combination
         to fill all missing fields on the ``slides`` - or as many of them as
@@ -323,37 +542,234 @@ class BaseSuite(object):
         combinations of methods, so that the smallest number of smallest
         possible responses will be fetched.
 
+        If :attr:`fetch_concurrently` is ``True``, the urls for the selected
+        methods are requested in parallel; the responses are still processed
+        in method order, so later methods override earlier ones exactly as
+        they would when fetched sequentially.
+
+        Each method is only asked to process the fields which are missing.
+        If the method cache is enabled (see :mod:`slidescraper.utils.cache`),
+        methods whose cached results include those fields are not fetched
+        again.
+
+        If ``fields`` is given, only those of the missing fields are
+        considered when choosing methods.
+
+        Requests are retried according to each method's retry policy and
+        are subject to the provider's circuit breaker (see
+        :mod:`slidescraper.utils.retry`). If some methods still fail and
+        ``errors`` is a dictionary, the failures are recorded in it by method
+        name and the data of the other methods is returned. Otherwise - or if
+        every method failed - :exc:`.MethodsFailed` is raised.
+
         """
         missing_fields = set(slides.missing_fields)
+        if fields is not None:
+            missing_fields &= set(fields)
         if not missing_fields:
-            return
-
-        best_methods = self.find_best_methods(missing_fields)
-
-#        responses = grequests.map([grequests.get(m.get_url(slides), timeout=3)
-#                                   for m in best_methods])
-        responses = [requests.get(m.get_url(slides), timeout=3)
-                     for m in best_methods]
+            return {}
+
+        sink = metrics.sink
+        if sink.enabled:
+            start = time.time()
+            best_methods = self.find_best_methods(missing_fields)
+            sink.observe('suite.plan', time.time() - start,
+                         provider=self.provider_name)
+        else:
+            best_methods = self.find_best_methods(missing_fields)
+        urls = [m.get_url(slides) for m in best_methods]
+
+        # Serve what we can from the method cache and only fetch the rest.
+        method_cache = cache.method_cache
+        results = [None] * len(best_methods)
+        cache_keys = [None] * len(best_methods)
+        to_fetch = []
+        for i, (method, url) in enumerate(itertools.izip(best_methods, urls)):
+            if method_cache is not None and self._get_cache_ttl(method) != 0:
+                cache_keys[i] = (self.provider_name, type(method).__name__,
+                                 method.get_cache_key(url))
+                # Entries remember which fields were processed, since a
+                # result cached for one field may lack the others.
+                cached = method_cache.get(cache_keys[i])
+                if (cached is not None and
+                        missing_fields & method.fields <= cached[0]):
+                    # Copy, so that changes to one slides' values (such as
+                    # its tags list) cannot leak into the cache or others.
+                    results[i] = copy.deepcopy(cached[1])
+            if results[i] is None:
+                to_fetch.append(i)
+
+        fetch_items = [(best_methods[i], urls[i]) for i in to_fetch]
+        if self.fetch_concurrently:
+            fetched = map_concurrently(self._fetch_method, fetch_items)
+        else:
+            fetched = [self._fetch_method(item) for item in fetch_items]
+
+        failed = {}
+        for i, (response, error) in itertools.izip(to_fetch, fetched):
+            method = best_methods[i]
+            method_name = type(method).__name__
+            if error is None:
+                if sink.enabled:
+                    start = time.time()
+                try:
+                    results[i] = method.process(response, missing_fields)
+                except SlidesDeleted:
+                    raise
+                except Exception, e:
+                    error = e
+                if sink.enabled:
+                    sink.observe('method.process', time.time() - start,
+                                 provider=self.provider_name,
+                                 method=method_name)
+            if error is not None:
+                if sink.enabled:
+                    sink.increment('method.errors',
+                                   provider=self.provider_name,
+                                   method=method_name)
+                failed[method_name] = error
+                continue
+            if cache_keys[i] is not None:
+                method_cache.set(cache_keys[i],
+                                 (frozenset(missing_fields & method.fields),
+                                  copy.deepcopy(results[i])),
+                                 self._get_cache_ttl(method))
+
+        if failed:
+            if errors is None or len(failed) == len(best_methods):
+                raise MethodsFailed(failed)
+            errors.update(failed)
 
         data = {}
-        for method, response in itertools.izip(best_methods, responses):
-            data.update(method.process(response))
+        for result in results:
+            if result is not None:
+                data.update(result)
 
         return data
 
-    def get_feed_response(self, feed, feed_url):
+    def _get_cache_ttl(self, method):
+        if method.cache_ttl is not None:
+            return method.cache_ttl
+        return self.cache_ttl
+
+    def run_methods_async(self, slides, callback=None, pool=None):
         """
-        Returns a parsed response for this ``feed``. By default, this uses
-        :mod:`feedparser` to get a response for the ``feed_url`` and returns
-        the resulting structure.
+        Runs :meth:`run_methods` for ``slides`` on a worker thread and returns
+        an :class:`~multiprocessing.pool.AsyncResult` whose ``get()`` returns
+        the resulting data dictionary. The work runs on ``pool`` if one is
+        given, or else on the shared ``scrape`` pool.
 
         """
-        response = feedparser.parse(feed_url)
-        # Don't let feedparser silence connection problems.
-        if isinstance(response.get('bozo_exception', None), urllib2.URLError):
-            raise response.bozo_exception
+        if pool is None:
+            pool = get_pool('scrape')
+        return pool.apply_async(self.run_methods, (slides,),
+                                callback=callback)
+
+    def _get_retry_policy(self, method):
+        if method.retry_policy is not None:
+            return method.retry_policy
+        return self.retry_policy
+
+    @property
+    def circuit_breaker(self):
+        """
+        The :class:`~slidescraper.utils.retry.CircuitBreaker` shared by all
+        suites for this suite's provider, or ``None`` if it is disabled.
+
+        """
+        if self.circuit_breaker_threshold is None:
+            return None
+        return retry.get_breaker(self.provider_name,
+                                 threshold=self.circuit_breaker_threshold,
+                                 reset_timeout=self.circuit_breaker_timeout)
+
+    def _fetch_method(self, item):
+        """
+        Fetches the url of a ``(method, url)`` pair under the method's retry
+        policy and returns ``(response, None)``, or ``(None, error)`` if the
+        request failed.
+
+        """
+        method, url = item
+        policy = self._get_retry_policy(method)
+        breaker = self.circuit_breaker
+        sink = metrics.sink
+        if sink.enabled:
+            start = time.time()
+        try:
+            if breaker is not None:
+                breaker.before_call()
+            response = policy.call(self._fetch_method_url, url,
+                                   timeout=policy.timeout)
+        except ProviderUnavailable, e:
+            return None, e
+        except requests.RequestException, e:
+            if breaker is not None:
+                breaker.record_failure()
+            return None, e
+        finally:
+            if sink.enabled:
+                sink.observe('method.fetch', time.time() - start,
+                             provider=self.provider_name,
+                             method=type(method).__name__)
+        if breaker is not None:
+            breaker.record_success()
+        return response, None
+
+    def _fetch_method_url(self, url, timeout=3):
+        return http.get(url, timeout=timeout)
+
+    def fetch_feed(self, feed, feed_url, timeout=None, stream=False):
+        """
+        Fetches ``feed_url`` over HTTP and returns the :mod:`requests`
+        response, or ``None`` if the server answered ``304 Not Modified``.
+
+        The first page of a feed is requested conditionally, using the
+        ``etag`` and ``http_last_modified`` validators the feed currently
+        holds. The response headers are stored as the feed's
+        ``http_headers`` so that :meth:`get_feed_etag` and
+        :meth:`get_feed_last_modified` can use them, and the
+        ``Last-Modified`` header as its ``http_last_modified``. The feed's
+        ``last_modified``, the date its contents last changed, is never
+        sent: servers compare ``If-Modified-Since`` with their own
+        ``Last-Modified``, which need not match it.
+
+        If ``stream`` is ``True``, the body is not read until the response's
+        content or ``raw`` stream is used.
+
+        """
+        headers = None
+        first_page = feed_url == getattr(feed, 'url', None)
+        if first_page:
+            headers = http.conditional_headers(
+                                    etag=getattr(feed, 'etag', None),
+                                    last_modified=getattr(feed,
+                                                'http_last_modified', None))
+        response = http.get(feed_url, timeout=timeout, headers=headers,
+                            stream=stream)
+        if response.status_code == 304:
+            response.close()
+            return None
+        if first_page:
+            feed.http_headers = response.headers
+            feed.http_last_modified = response.headers.get('Last-Modified')
         return response
 
+    def get_feed_response(self, feed, feed_url):
+        """
+        Returns a parsed response for this ``feed``, or ``None`` if the
+        feed has not been modified. By default, this fetches the ``feed_url``
+        with :meth:`fetch_feed` and returns the structure :mod:`feedparser`
+        builds from it.
+
+        """
+        response = self.fetch_feed(feed, feed_url)
+        if response is None:
+            return None
+        headers = dict(response.headers)
+        headers['content-location'] = response.url
+        return feedparser.parse(response.content, response_headers=headers)
+
     def get_feed_info_response(self, feed, response):
         """
         In case the response for the given ``feed`` needs to do other work on
@@ -434,6 +850,8 @@ class BaseSuite(object):
             return struct_time_to_datetime(feed_response.feed.updated_parsed)
         if 'published_parsed' in feed_response.feed:
             return struct_time_to_datetime(feed_response.feed.published_parsed)
+        if feed_response.get('modified_parsed'):
+            return struct_time_to_datetime(feed_response.modified_parsed)
         return None
 
     def get_feed_etag(self, feed, feed_response):
@@ -443,7 +861,7 @@ class BaseSuite(object):
         :mod:`feedparser` structure and returns a value based on that.
 
         """
-        return feed_response.feed.get('etag')
+        return feed_response.get('etag') or feed_response.feed.get('etag')
 
     def get_feed_entries(self, feed, feed_response):
         """
@@ -455,13 +873,17 @@ class BaseSuite(object):
         """
         return feed_response.entries
 
-    def parse_feed_entry(self, entry):
+    def parse_feed_entry(self, entry, fields=None):
         """
         Given a feed entry (as returned by :meth:`.get_feed_entries`), creates
         and returns a dictionary containing data from the feed entry, suitable
         for application via :meth:`apply_slides_data`. Must be implemented by
         subclasses.
 
+        If ``fields`` is given, only those fields (and ``link``, which is
+        always needed) must be returned, and work done only for other fields
+        may be skipped.
+
         """
         raise NotImplementedError
 
@@ -475,6 +897,15 @@ class BaseSuite(object):
         """
         return None
 
+    def close_feed_response(self, feed, feed_response):
+        """
+        Releases what a ``feed_response`` as returned from
+        :meth:`get_feed_response` holds when it will not be read, for
+        example because a prefetched page is no longer needed. By default,
+        does nothing, as the response has been read whole.
+
+        """
+
     def get_search_url(self, search):
         """
         Returns a url which this suite can use to fetch search results for the
@@ -2,10 +2,19 @@ from slidescraper.suites import BaseSuite, registry, SuiteMethod, OEmbedMethod
 import json
 import time
 import sha
-import urllib, urllib2
+import urllib
+import urlparse
 from dateutil import parser
+import collections
 import xmltodict
+try:
+    from xml.etree import cElementTree as ElementTree
+except ImportError:
+    from xml.etree import ElementTree
 from bs4 import BeautifulSoup, SoupStrainer
+from slidescraper.utils import http
+from slidescraper.utils.concurrency import get_pool
+from slidescraper.utils.html import EmbedCode
 from pprint import pprint
 
 
@@ -17,7 +26,7 @@ class SlideShareOEmbedMethod(OEmbedMethod):
     """
     fields = set(['title', 'user', 'user_url', 'thumbnail_url', 'embed_code', 'slide_count'])
 
-    def process(self, response):
+    def process(self, response, fields=None):
         parsed = json.loads(response.text)
         data = {
             'title': parsed['title'],
@@ -48,10 +57,24 @@ class SlideShareApiMethod(SuiteMethod):
         params = urllib.urlencode(params_dict)
         return "%s?%s" % (api_url, params)
 
+    def get_cache_key(self, url):
+        """
+        Strips the per-request timestamp and hash from an API url so that
+        repeated requests for the same slideshow share a cache entry.
+
+        """
+        base, _, query = url.partition('?')
+        params = sorted((key, value) for key, value in urlparse.parse_qsl(query)
+                        if key not in ('ts', 'hash'))
+        return "%s?%s" % (base, urllib.urlencode(params))
+
     @classmethod
-    def get_api_params(cls, api_key=None, api_secret=None, url=None, user=None, tag=None, group=None):
+    def get_api_params(cls, api_key=None, api_secret=None, url=None, user=None, tag=None, group=None,
+                       limit=None, offset=None):
         """
-        Returns the parameters required for a SlideShare api call.
+        Returns the parameters required for a SlideShare api call. ``limit``
+        and ``offset`` select a page of the slideshows of a user, tag or
+        group.
         """
         ts = int(time.time())
         params_dict = {
@@ -71,48 +94,61 @@ class SlideShareApiMethod(SuiteMethod):
         elif group:
             params_dict['group_name'] = group
 
+        if limit is not None:
+            params_dict['limit'] = limit
+        if offset:
+            params_dict['offset'] = offset
+
         return params_dict
 
-    def process(self, response):
+    def process(self, response, fields=None):
         xml = response.text
         response_json = xmltodict.parse(xml)
-        return SlideShareApiMethod.parse_api_data(response_json['Slideshow'])
+        return SlideShareApiMethod.parse_api_data(response_json['Slideshow'],
+                                                  fields)
 
     @classmethod
-    def parse_api_data(cls, api_json):
+    def parse_api_data(cls, api_json, fields=None):
         """
         Converts API JSON response to a dictionary for loading a Slides object
+
+        If ``fields`` is given, the embed code markup is only parsed for
+        ``embed_code`` and ``user``, the creation date only for
+        ``publish_datetime`` and the tags only for ``tags``.
         """
         data = {'guid': 'slideshare:%s' % api_json['ID'],
                 'title': api_json['Title'],
                 'link': api_json['URL'],
                 'description': api_json['Description'],
-                'embed_code': SlideShareSuite.build_iframe_embed_code(api_json['ID']),
-                'publish_datetime': parser.parse(api_json['Created']),
                 'thumbnail_url': api_json['ThumbnailURL'],
-                'user': api_json['Username'],
                 'user_url': "http://www.slideshare.net/%s" % api_json['Username'],
                 'view_count': int(api_json['NumViews']),
                 'slide_count': int(api_json['NumSlides']),
                 'language': api_json['Language'],
                 }
 
-        # Embed code
-        soup = BeautifulSoup(api_json['Embed'])
-        embed_width = None
-        embed_height = None
-        for tag in soup.find_all("object", limit=1):
-            embed_width = tag['width']
-            embed_height = tag['height']
-        data['embed_code'] = SlideShareSuite.build_iframe_embed_code(api_json['ID'], embed_width, embed_height)
-
-        # Overwrite username with full user name
-        tags = soup.find_all('a')
-        if tags:
-            tag = tags.pop()
-            data['user'] = tag.string
-
-        if 'Tags' in api_json and api_json['Tags'] and 'Tag' in api_json['Tags']:
+        if fields is None or 'publish_datetime' in fields:
+            data['publish_datetime'] = parser.parse(api_json['Created'])
+
+        if fields is None or 'embed_code' in fields or 'user' in fields:
+            # Embed code
+            soup = BeautifulSoup(api_json['Embed'])
+            embed_width = None
+            embed_height = None
+            for tag in soup.find_all("object", limit=1):
+                embed_width = tag['width']
+                embed_height = tag['height']
+            data['embed_code'] = SlideShareSuite.iframe_embed_code(api_json['ID'], embed_width, embed_height)
+
+            # Prefer the full user name to the username
+            data['user'] = api_json['Username']
+            tags = soup.find_all('a')
+            if tags:
+                tag = tags.pop()
+                data['user'] = tag.string
+
+        if ((fields is None or 'tags' in fields) and
+                'Tags' in api_json and api_json['Tags'] and 'Tag' in api_json['Tags']):
             tags = api_json['Tags']['Tag']
             if isinstance(tags, list):
                 data['tags'] = [tag['#text'] for tag in tags]
@@ -128,11 +164,162 @@ class SlideShareApiMethod(SuiteMethod):
         return data
 
 
+def element_to_dict(element):
+    """
+    Converts an :mod:`~xml.etree.ElementTree` element into the structure
+    :mod:`xmltodict` builds for it: attributes become ``@name`` keys,
+    repeated children become lists, and an element with only text becomes
+    that text (or ``None`` if it is empty).
+    """
+    data = {}
+    for key, value in element.attrib.iteritems():
+        data['@' + key] = unicode(value)
+    for child in element:
+        value = element_to_dict(child)
+        if child.tag in data:
+            existing = data[child.tag]
+            if isinstance(existing, list):
+                existing.append(value)
+            else:
+                data[child.tag] = [existing, value]
+        else:
+            data[child.tag] = value
+    text = element.text.strip() if element.text else None
+    if text:
+        if not data:
+            return unicode(text)
+        data['#text'] = unicode(text)
+    return data or None
+
+
+class SlideShareFeedStream(object):
+    """
+    A SlideShare API feed response (``get_slideshows_by_user`` and the like)
+    which is parsed as it is read from the network.
+
+    On creation, the response is read up to its first ``Slideshow``, so the
+    feed information (``Name``, ``Count``) is available through the same
+    ``response['User']['Name']`` lookups as an :mod:`xmltodict` response.
+    Iterating over the stream then yields each ``Slideshow`` as a dictionary
+    as soon as it has been read, in document order, and frees its elements.
+    The stream can only be iterated over once.
+
+    .. attribute:: last_updated
+
+       The latest ``Updated`` date of the slideshows read so far.
+
+    .. attribute:: finished
+
+       ``True`` once the whole response has been read.
+
+    """
+    def __init__(self, response):
+        self.response = response
+        self.last_updated = None
+        self.finished = False
+        self.info = {}
+        response.raw.decode_content = True
+        self._events = ElementTree.iterparse(response.raw,
+                                             events=('start', 'end'))
+        self._root = None
+        self._depth = 0
+        self._read_info()
+
+    def __contains__(self, key):
+        return self._root is not None and self._root.tag == key
+
+    def __getitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        return self.info
+
+    def _read_info(self):
+        """Reads the response up to the start of its first slideshow."""
+        try:
+            for event, element in self._events:
+                if event == 'start':
+                    self._depth += 1
+                    if self._root is None:
+                        self._root = element
+                    elif self._depth == 2 and element.tag == 'Slideshow':
+                        return
+                else:
+                    self._depth -= 1
+                    if self._depth == 1:
+                        self.info[element.tag] = element_to_dict(element)
+                        self._root.remove(element)
+        except Exception:
+            self._close(complete=False)
+            raise
+        self._close(complete=True)
+
+    def __iter__(self):
+        if self.finished:
+            return
+        complete = False
+        try:
+            for event, element in self._events:
+                if event == 'start':
+                    self._depth += 1
+                    continue
+                self._depth -= 1
+                if self._depth != 1:
+                    continue
+                data = element_to_dict(element)
+                element.clear()
+                self._root.remove(element)
+                if element.tag != 'Slideshow':
+                    self.info[element.tag] = data
+                    continue
+                if data and data.get('Updated'):
+                    updated = parser.parse(data['Updated'])
+                    if self.last_updated is None or updated > self.last_updated:
+                        self.last_updated = updated
+                yield data
+            complete = True
+        finally:
+            self._close(complete)
+
+    @property
+    def url(self):
+        """The url the response was fetched from."""
+        return self.response.url
+
+    def close(self):
+        """
+        Closes the response without reading the rest of it.
+
+        """
+        self._close(complete=False)
+
+    def _close(self, complete):
+        if not self.finished:
+            self.finished = True
+            if complete:
+                self.response.raw.release_conn()
+            else:
+                # A partly read connection cannot be reused.
+                self.response.raw.close()
+
+
+class SlideShareFeedPage(dict):
+    """
+    A page of a SlideShare API feed response parsed whole with
+    :mod:`xmltodict`, which remembers the ``url`` it was fetched from so
+    that the url of the following page can be worked out.
+
+    """
+    def __init__(self, parsed_response, url):
+        dict.__init__(self, parsed_response)
+        self.url = url
+
+
 class SlideShareSuite(BaseSuite):
     """
     Suite for slideshare.net. Currently only supports oembed.
     """
     provider_name = 'SlideShare'
+    hosts = ('slideshare.net',)
     slide_regex = r'https?://([^/]+\.)?slideshare.net/(?P<username>\w+)/(?P<presentation_slug>\w+)'
     # Example URLs:
     #     http://www.slideshare.net/zeeg/djangocon-2010-scaling-disqus
@@ -145,6 +332,27 @@ class SlideShareSuite(BaseSuite):
     methods = (SlideShareOEmbedMethod(u"http://www.slideshare.net/api/oembed/2"),
                SlideShareApiMethod(),)
 
+    #: If ``True``, API feed responses are parsed incrementally as they are
+    #: downloaded (see :class:`SlideShareFeedStream`) instead of being read
+    #: whole. Entries are then yielded in the order the API returns them
+    #: (newest first) rather than oldest first, and the feed's
+    #: ``last_modified`` is only computed once all entries have been read.
+    stream_feeds = False
+
+    #: The number of slideshows requested per page when crawling a feed.
+    #: Crawled feeds yield their entries in the order the API returns them
+    #: (newest first).
+    feed_page_size = 50
+
+    #: When crawling a feed which is not streamed, the pages following the
+    #: first one are fetched on the shared fetch pool as soon as the first
+    #: page has told how many slideshows there are, with up to this many
+    #: requests in flight at once. Pages are still read in order, and pages
+    #: beyond the feed's ``max_results`` are only requested once they are
+    #: needed. ``1`` fetches each page only once the previous one is
+    #: exhausted (or ``prefetch_pages`` ahead), as streamed feeds are.
+    feed_page_concurrency = 4
+
     @classmethod
     def strip_embed_extras(cls, embed_code):
         """
@@ -168,9 +376,19 @@ class SlideShareSuite(BaseSuite):
         new_embed_code = embed_code[start:end+end_tag_len]
         return new_embed_code
 
+    IFRAME_EMBED_TEMPLATE = "<iframe src=\"http://www.slideshare.net/slideshow/embed_code/{0}\" width=\"{1}\" height=\"{2}\" frameborder=\"0\" marginwidth=\"0\" marginheight=\"0\" scrolling=\"no\" allowfullscreen></iframe>"
+
     @classmethod
     def build_iframe_embed_code(cls, slidshare_id, width=425, height=355):
-        return "<iframe src=\"http://www.slideshare.net/slideshow/embed_code/{0}\" width=\"{1}\" height=\"{2}\" frameborder=\"0\" marginwidth=\"0\" marginheight=\"0\" scrolling=\"no\" allowfullscreen></iframe>".format(slidshare_id, width, height) 
+        return cls.iframe_embed_code(slidshare_id, width, height).render()
+
+    @classmethod
+    def iframe_embed_code(cls, slidshare_id, width=425, height=355):
+        """
+        Returns the iframe embed code as an :class:`.EmbedCode`, which
+        :class:`.Slides` renders when it is read.
+        """
+        return EmbedCode(cls.IFRAME_EMBED_TEMPLATE, slidshare_id, width, height)
 
     def get_feed_url(self, feed_url, feed=None):
         """
@@ -181,24 +399,55 @@ class SlideShareSuite(BaseSuite):
         """
         match = self.feed_regex.match(feed_url)
         if match and match.group('username'):
-            username = match.group('username')
-            SLIDESHARE_API_BASE_URL = "http://www.slideshare.net/api/2/"
-            API_METHOD = "get_slideshows_by_user"
-            params_dict = SlideShareApiMethod.get_api_params(api_key=feed.api_keys['slideshare_api_key'],
-                                                             api_secret=feed.api_keys['slideshare_api_secret'],
-                                                             user=username)
-            params = urllib.urlencode(params_dict)
-            return "%s%s?%s" % (SLIDESHARE_API_BASE_URL, API_METHOD, params)
+            limit = self.feed_page_size if feed.crawl else None
+            return self.get_user_feed_api_url(feed, match.group('username'),
+                                              limit=limit)
         return feed_url
 
+    def get_user_feed_api_url(self, feed, username, limit=None, offset=None):
+        """
+        Returns a signed ``get_slideshows_by_user`` api url for ``username``.
+        """
+        SLIDESHARE_API_BASE_URL = "http://www.slideshare.net/api/2/"
+        API_METHOD = "get_slideshows_by_user"
+        params_dict = SlideShareApiMethod.get_api_params(api_key=feed.api_keys['slideshare_api_key'],
+                                                         api_secret=feed.api_keys['slideshare_api_secret'],
+                                                         user=username,
+                                                         limit=limit,
+                                                         offset=offset)
+        params = urllib.urlencode(params_dict)
+        return "%s%s?%s" % (SLIDESHARE_API_BASE_URL, API_METHOD, params)
+
+    def get_feed_page_url(self, feed, offset):
+        """
+        Returns the api url for the page of a crawled feed starting at
+        ``offset``, or ``None`` if the feed is not a user feed.
+        """
+        match = self.feed_regex.match(feed.original_url)
+        if match and match.group('username'):
+            return self.get_user_feed_api_url(feed, match.group('username'),
+                                              limit=self.feed_page_size,
+                                              offset=offset)
+        return None
+
     def get_feed_response(self, feed, feed_url):
         """
         Override default to parse API result XML, not as a real feed
         """
-        response = urllib2.urlopen(feed_url, timeout=5)
-        response_text = response.read()
-        parsed_response = xmltodict.parse(response_text)
-        return parsed_response
+        response = self.fetch_feed(feed, feed_url, timeout=5,
+                                   stream=self.stream_feeds)
+        if response is None:
+            return None
+        try:
+            response.raise_for_status()
+        except Exception:
+            # The body of a streamed response has not been read.
+            response.close()
+            raise
+        if self.stream_feeds:
+            return SlideShareFeedStream(response)
+        return SlideShareFeedPage(xmltodict.parse(response.content),
+                                  response.url)
 
     def get_feed_title(self, feed, response):
         if 'User' in response:
@@ -218,6 +467,9 @@ class SlideShareSuite(BaseSuite):
 
     def get_feed_last_modified(self, feed, response):
         """ Approximate last modified by checking last update of latest slideshow"""
+        if isinstance(response, SlideShareFeedStream) and response.last_updated:
+            return response.last_updated
+
         type_ = None
         if 'User' in response:
             type_ = 'User'
@@ -225,7 +477,7 @@ class SlideShareSuite(BaseSuite):
             type_ = 'Tag'
 
         if type_ and 'Slideshow' in response[type_]:
-            slideshows = response[type_]['Slideshow']
+            slideshows = _as_list(response[type_]['Slideshow'])
             last_update = max([parser.parse(slideshow['Updated']) for slideshow in slideshows])
 
 #            # Only check updated date of most recent slideshow
@@ -237,9 +489,13 @@ class SlideShareSuite(BaseSuite):
 
             return last_update
 
+        if feed.http_headers and 'Last-Modified' in feed.http_headers:
+            return http.parse_http_date(feed.http_headers['Last-Modified'])
         return None
 
     def get_feed_etag(self, feed, response):
+        if feed.http_headers:
+            return feed.http_headers.get('ETag')
         return None
 
     def get_feed_webpage(self, feed, response):
@@ -255,13 +511,107 @@ class SlideShareSuite(BaseSuite):
     def get_feed_entries(self, feed, feed_response):
         if feed_response is None: # no more data
             return []
-        elif 'User' in feed_response and 'Slideshow' in feed_response['User']:
-            return reversed(feed_response['User']['Slideshow'])
-        elif 'Tag' in feed_response and 'Slideshow' in feed_response['Tag']:
-            return reversed(feed_response['Tag']['Slideshow'])
+        elif isinstance(feed_response, SlideShareFeedStream):
+            return self._iter_stream_entries(feed, feed_response)
+        for type_ in ('User', 'Tag'):
+            if type_ in feed_response and 'Slideshow' in feed_response[type_]:
+                slideshows = _as_list(feed_response[type_]['Slideshow'])
+                if self._fetches_pages_concurrently(feed, feed_response):
+                    return self._iter_crawled_entries(feed, feed_response,
+                                                      slideshows)
+                if feed.crawl:
+                    return slideshows
+                return reversed(slideshows)
         return feed_response
 
-    def parse_feed_entry(self, entry):
-        return SlideShareApiMethod.parse_api_data(entry)
+    def close_feed_response(self, feed, feed_response):
+        if isinstance(feed_response, SlideShareFeedStream):
+            feed_response.close()
+
+    def get_next_feed_page_url(self, feed, feed_response):
+        """
+        Returns the url of the page of a crawled user feed which follows
+        ``feed_response``, or ``None`` after the last page. Pages which are
+        fetched concurrently (see :attr:`feed_page_concurrency`) are all
+        read through the first page's entries, so have no next page.
+        """
+        if (not isinstance(feed_response, (SlideShareFeedStream,
+                                           SlideShareFeedPage)) or
+                'User' not in feed_response):
+            return None
+        if (isinstance(feed_response, SlideShareFeedPage) and
+                self.feed_page_concurrency > 1):
+            return None
+        query = urlparse.parse_qs(urlparse.urlsplit(feed_response.url).query)
+        offset = int(query.get('offset', ['0'])[0]) + self.feed_page_size
+        if offset >= int(feed_response['User']['Count']):
+            return None
+        return self.get_feed_page_url(feed, offset)
+
+    def _fetches_pages_concurrently(self, feed, feed_response):
+        return (feed.crawl and self.feed_page_concurrency > 1 and
+                isinstance(feed_response, SlideShareFeedPage) and
+                feed_response.url == feed.url and 'User' in feed_response)
+
+    def _iter_crawled_entries(self, feed, first_page, slideshows):
+        """
+        Yields ``slideshows``, the entries of the ``first_page`` of a crawled
+        user feed, and then those of each following page. The following
+        pages are fetched with :meth:`get_feed_response` on the shared fetch
+        pool, up to :attr:`feed_page_concurrency` at once, and are read in
+        offset order. Pages starting at or beyond the feed's ``max_results``
+        are only requested once the pages before them have been read.
+
+        """
+        pool = get_pool('fetch')
+        offsets = collections.deque(xrange(self.feed_page_size,
+                                           int(first_page['User']['Count']),
+                                           self.feed_page_size))
+        max_results = feed.max_results
+        pending = collections.deque()
+
+        def fetch_ahead(needed):
+            while (offsets and
+                   len(pending) < self.feed_page_concurrency and
+                   (max_results is None or offsets[0] < max_results or
+                    (needed and not pending))):
+                url = self.get_feed_page_url(feed, offsets.popleft())
+                pending.append(pool.apply_async(self.get_feed_response,
+                                                (feed, url)))
+
+        fetch_ahead(False)
+        for slideshow in slideshows:
+            yield slideshow
+        while True:
+            fetch_ahead(True)
+            if not pending:
+                break
+            page = pending.popleft().get()
+            fetch_ahead(False)
+            entry_count = 0
+            for slideshow in self.get_feed_entries(feed, page):
+                entry_count += 1
+                yield slideshow
+            if not entry_count:
+                break
+
+    def _iter_stream_entries(self, feed, stream):
+        for entry in stream:
+            yield entry
+        # The last update is only known once every entry has been read.
+        if stream.last_updated is not None:
+            feed.last_modified = stream.last_updated
+
+    def parse_feed_entry(self, entry, fields=None):
+        return SlideShareApiMethod.parse_api_data(entry, fields)
+
+def _as_list(slideshows):
+    # xmltodict gives a lone slideshow as a dictionary rather than a list.
+    if slideshows is None:
+        return []
+    if isinstance(slideshows, list):
+        return slideshows
+    return [slideshows]
+
 
 registry.register(SlideShareSuite)
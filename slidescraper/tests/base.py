@@ -0,0 +1,158 @@
+"""
+Helpers for the test suite. Tests make no network requests: responses come
+from the recorded payloads in ``slidescraper/tests/data``, served by a
+:class:`~slidescraper.utils.transport.MemoryTransport`.
+
+"""
+import json
+import os
+import threading
+import unittest
+import urllib
+import warnings
+
+from slidescraper.suites import BaseSuite, SuiteMethod
+from slidescraper.utils import cache, http, ratelimit, retry
+from slidescraper.utils.retry import RetryPolicy
+from slidescraper.utils.transport import MemoryTransport
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+#: API keys which requests to the SlideShare API are made with.
+API_KEYS = {
+    'slideshare_api_key': 'test-key',
+    'slideshare_api_secret': 'test-secret',
+}
+
+
+def read_data(name):
+    """Returns the contents of the fixture ``name``."""
+    with open(os.path.join(DATA_DIR, name)) as f:
+        return f.read()
+
+
+class JSONMethod(SuiteMethod):
+    """Fetches ``url`` and returns its JSON body as the field data."""
+
+    def __init__(self, url, fields):
+        self.url = url
+        self.fields = set(fields)
+
+    def get_url(self, slides):
+        return self.url
+
+    def process(self, response, fields=None):
+        response.raise_for_status()
+        return json.loads(response.text)
+
+
+class OtherJSONMethod(JSONMethod):
+    pass
+
+
+class ExampleSuite(BaseSuite):
+    """
+    Handles ``http://example.com/slides/<n>`` urls with the given
+    ``methods``. Requests are not retried and the circuit breaker opens
+    after two failures.
+
+    """
+    provider_name = 'Example'
+    slide_regex = r'http://example\.com/slides/\d+'
+    retry_policy = RetryPolicy(max_attempts=1)
+    circuit_breaker_threshold = 2
+
+    def __init__(self, methods=()):
+        self.methods = tuple(methods)
+        super(ExampleSuite, self).__init__()
+
+
+class GatheringTransport(MemoryTransport):
+    """
+    Holds back each request (for up to a second) until :attr:`expected`
+    requests are in flight, and records the most there were at once.
+
+    """
+
+    def __init__(self, expected):
+        MemoryTransport.__init__(self)
+        self.expected = expected
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.gathered = threading.Event()
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout=None, headers=None, stream=False):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            if self.in_flight >= self.expected:
+                self.gathered.set()
+        self.gathered.wait(1)
+        try:
+            return MemoryTransport.get(self, url, timeout=timeout,
+                                       headers=headers, stream=stream)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class TransportTestCase(unittest.TestCase):
+    """
+    Sends all requests made during each test to :attr:`transport`, a fresh
+    :class:`MemoryTransport`, and resets the library's shared state
+    afterwards.
+
+    """
+
+    def setUp(self):
+        # BeautifulSoup warns when no parser is named.
+        warnings.simplefilter('ignore')
+        self.transport = MemoryTransport()
+        self._previous_transport = http.set_transport(self.transport)
+        cache.disable_method_cache()
+        retry.reset_breakers()
+        ratelimit.limiter.reset()
+
+    def tearDown(self):
+        http.set_transport(self._previous_transport)
+        cache.disable_method_cache()
+        retry.reset_breakers()
+        ratelimit.limiter.reset()
+        warnings.resetwarnings()
+
+    def add_slideshare_api(self, url, fixture='slideshare_api_slideshow.xml'):
+        """Serves ``fixture`` for SlideShare API requests for ``url``."""
+        params = urllib.urlencode({
+            'api_key': API_KEYS['slideshare_api_key'],
+            'detailed': 1,
+            'slideshow_url': url,
+        })
+        self.transport.add(
+            'http://www.slideshare.net/api/2/get_slideshow?%s' % params,
+            read_data(fixture))
+
+    def add_slideshare_oembed(self, url):
+        """Serves the recorded oembed response for ``url``."""
+        params = urllib.urlencode([('url', url), ('maxwidth', 620)])
+        self.transport.add(
+            'http://www.slideshare.net/api/oembed/2?%s' % params,
+            read_data('slideshare_oembed.json'))
+
+    def add_slideshare_user_feed(self, **kwargs):
+        """
+        Serves the recorded feed for requests for the user feed of
+        ``haraldf`` which is not crawled. ``kwargs`` are passed on to
+        :meth:`MemoryTransport.add`.
+
+        """
+        params = urllib.urlencode({
+            'api_key': API_KEYS['slideshare_api_key'],
+            'detailed': 1,
+            'username_for': 'haraldf',
+        })
+        self.transport.add(
+            'http://www.slideshare.net/api/2/get_slideshows_by_user?%s' % (
+                params,),
+            read_data('slideshare_user_feed.xml'), **kwargs)
@@ -0,0 +1,79 @@
+import json
+import unittest
+from multiprocessing.pool import ThreadPool
+
+import requests
+
+from slidescraper import auto_feed_async, auto_scrape_async
+from slidescraper.exceptions import MethodsFailed
+from slidescraper.slides import SlideFeed, Slides
+from slidescraper.tests.base import (API_KEYS, ExampleSuite, JSONMethod,
+                                     TransportTestCase)
+
+
+DECK_URL = 'http://www.slideshare.net/haraldf/deck-1'
+FEED_URL = 'http://www.slideshare.net/rss/user/haraldf'
+
+
+class AsyncTestCase(TransportTestCase):
+
+    def setUp(self):
+        super(AsyncTestCase, self).setUp()
+        self.pool = ThreadPool(2)
+
+    def tearDown(self):
+        self.pool.close()
+        super(AsyncTestCase, self).tearDown()
+
+    def test_auto_scrape_async(self):
+        self.add_slideshare_oembed(DECK_URL)
+        loaded = []
+        result = auto_scrape_async(DECK_URL, fields=['title'],
+                                   callback=loaded.append)
+        slides = result.get(1)
+        self.assertEqual(slides.title, u'Business Quotes for 2011')
+        self.assertEqual(loaded, [slides])
+
+    def test_load_async_on_given_pool(self):
+        self.add_slideshare_oembed(DECK_URL)
+        loaded = []
+        slides = Slides(DECK_URL, fields=['title'])
+        result = slides.load_async(callback=loaded.append, pool=self.pool)
+        self.assertTrue(result.get(1) is slides)
+        self.assertEqual(slides.title, u'Business Quotes for 2011')
+        self.assertEqual(loaded, [slides])
+
+    def test_load_async_reraises(self):
+        slides = Slides(DECK_URL, fields=['title'])
+        result = slides.load_async(pool=self.pool)
+        self.assertRaises(MethodsFailed, result.get, 1)
+
+    def test_run_methods_async(self):
+        self.transport.add('http://a/', json.dumps({'title': u'Title'}))
+        suite = ExampleSuite([JSONMethod('http://a/', ['title'])])
+        slides = Slides('http://example.com/slides/1', suite=suite,
+                        fields=['title'])
+        result = suite.run_methods_async(slides, pool=self.pool)
+        self.assertEqual(result.get(1), {'title': u'Title'})
+
+    def test_auto_feed_async_and_iter_async(self):
+        self.add_slideshare_user_feed()
+        feed = auto_feed_async(FEED_URL, fields=['title'], api_keys=API_KEYS,
+                               pool=self.pool).get(1)
+        self.assertEqual(feed.entry_count, u'6')
+        titles = []
+        result = feed.iter_async(lambda slides: titles.append(slides.title),
+                                 pool=self.pool)
+        self.assertEqual(result.get(1), 6)
+        self.assertEqual(titles[0], u'Design Thinking 101')
+        self.assertEqual(len(self.transport.requests), 1)
+
+    def test_iter_async_reraises(self):
+        self.add_slideshare_user_feed(status=500)
+        feed = SlideFeed(FEED_URL, fields=['title'], api_keys=API_KEYS)
+        result = feed.iter_async(lambda slides: None)
+        self.assertRaises(requests.HTTPError, result.get, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
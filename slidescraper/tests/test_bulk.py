@@ -0,0 +1,90 @@
+import threading
+import unittest
+
+from slidescraper.bulk import BulkScrape
+from slidescraper.exceptions import UnhandledURL
+from slidescraper.tests.base import (API_KEYS, GatheringTransport,
+                                     TransportTestCase)
+from slidescraper.utils import http
+from slidescraper.utils.transport import MemoryTransport
+
+
+DECK_URL = 'http://www.slideshare.net/haraldf/deck-%d'
+
+
+class BlockingTransport(MemoryTransport):
+    """Holds back requests for the first deck until :attr:`release` is set."""
+
+    def __init__(self):
+        MemoryTransport.__init__(self)
+        self.release = threading.Event()
+
+    def get(self, url, timeout=None, headers=None, stream=False):
+        if 'deck-0&' in url or url.endswith('deck-0'):
+            self.release.wait(0.5)
+        return MemoryTransport.get(self, url, timeout=timeout,
+                                   headers=headers, stream=stream)
+
+
+class BulkScrapeTestCase(TransportTestCase):
+
+    def scrape(self, urls, **kwargs):
+        return list(BulkScrape(urls, fields=['title'], api_keys=API_KEYS,
+                               **kwargs))
+
+    def test_every_url_gets_a_result(self):
+        urls = [DECK_URL % i for i in xrange(5)] + ['http://example.com/']
+        results = self.scrape(urls)
+        self.assertEqual(sorted(result.url for result in results),
+                         sorted(urls))
+        unhandled = [result for result in results
+                     if isinstance(result.error, UnhandledURL)]
+        self.assertEqual([result.url for result in unhandled],
+                         ['http://example.com/'])
+
+    def test_ordered(self):
+        urls = [DECK_URL % i for i in xrange(10)]
+        results = self.scrape(urls, ordered=True, max_workers=3)
+        self.assertEqual([result.url for result in results], urls)
+
+    def test_ordered_reads_a_bounded_window(self):
+        transport = self.transport = BlockingTransport()
+        http.set_transport(transport)
+
+        read = [0]
+        yielded = [0]
+        lead = [0]
+
+        def urls():
+            for i in xrange(30):
+                lead[0] = max(lead[0], read[0] - yielded[0])
+                if read[0] >= 10:
+                    # Only reached by reading far past the slow first deck.
+                    transport.release.set()
+                read[0] += 1
+                yield DECK_URL % i
+
+        bulk = BulkScrape(urls(), fields=['title'], api_keys=API_KEYS,
+                          max_workers=3, ordered=True)
+        for result in bulk:
+            yielded[0] += 1
+        self.assertEqual(yielded[0], 30)
+        self.assertTrue(lead[0] <= 3, lead[0])
+
+    def test_max_workers_beyond_shared_pools(self):
+        transport = self.transport = GatheringTransport(20)
+        http.set_transport(transport)
+        urls = [DECK_URL % i for i in xrange(20)]
+        results = self.scrape(urls, max_workers=20, per_provider=20)
+        self.assertEqual(len(results), 20)
+        self.assertEqual(transport.max_in_flight, 20)
+
+    def test_limits_must_be_positive(self):
+        self.assertRaises(ValueError, BulkScrape, [], per_provider=0)
+        self.assertRaises(ValueError, BulkScrape, [],
+                          per_provider={'SlideShare': 0})
+        self.assertRaises(ValueError, BulkScrape, [], max_workers=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import time
+import unittest
+
+from slidescraper.slides import Slides
+from slidescraper.suites.slideshare import SlideShareSuite
+from slidescraper.tests.base import API_KEYS, TransportTestCase
+from slidescraper.utils import cache
+from slidescraper.utils.cache import LRUCache
+
+
+SLIDESHARE_URL = 'http://www.slideshare.net/haraldf/business-quotes-for-2011'
+
+
+class LRUCacheTestCase(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        lru = LRUCache(maxsize=2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertEqual(lru.get('b'), None)
+        self.assertEqual(lru.get('c'), 3)
+        self.assertEqual(len(lru), 2)
+
+    def test_entries_expire(self):
+        lru = LRUCache(ttl=60)
+        lru.set('a', 1)
+        lru.set('b', 2, ttl=0.01)
+        time.sleep(0.02)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertEqual(lru.get('b'), None)
+        self.assertEqual(lru.stats()['hits'], 1)
+        self.assertEqual(lru.stats()['misses'], 1)
+
+
+class MethodCacheTestCase(TransportTestCase):
+
+    def setUp(self):
+        super(MethodCacheTestCase, self).setUp()
+        self.add_slideshare_api(SLIDESHARE_URL)
+        cache.enable_method_cache()
+
+    def load(self):
+        slides = Slides(SLIDESHARE_URL, suite=SlideShareSuite(),
+                        fields=['view_count', 'tags'], api_keys=API_KEYS)
+        slides.load()
+        return slides
+
+    def test_second_load_served_from_cache(self):
+        first = self.load()
+        second = self.load()
+        self.assertEqual(len(self.transport.requests), 1)
+        self.assertEqual(second.view_count, first.view_count)
+        self.assertEqual(cache.method_cache.stats()['hits'], 1)
+
+    def test_cached_values_are_copies(self):
+        first = self.load()
+        first.tags.append(u'changed')
+        second = self.load()
+        second.tags.append(u'again')
+        third = self.load()
+        self.assertEqual(third.tags, [u'business', u'quotes', u'for'])
+        self.assertFalse(second.tags is third.tags)
+
+    def test_disabled_cache_fetches_again(self):
+        cache.disable_method_cache()
+        self.load()
+        self.load()
+        self.assertEqual(len(self.transport.requests), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
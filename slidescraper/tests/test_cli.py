@@ -0,0 +1,131 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from StringIO import StringIO
+
+from slidescraper import SlidescraperCommandHandler
+from slidescraper.tests.base import (API_KEYS, GatheringTransport,
+                                     TransportTestCase)
+from slidescraper.utils import http
+
+
+DECK_URL = 'http://www.slideshare.net/haraldf/deck-%d'
+FEED_URL = 'http://www.slideshare.net/rss/user/haraldf'
+API_KEYS_OPTION = ','.join('%s:%s' % item for item in API_KEYS.items())
+
+
+class CommandTestCase(TransportTestCase):
+    """Runs ``slidescraper`` subcommands with their output captured."""
+
+    def setUp(self):
+        super(CommandTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super(CommandTestCase, self).tearDown()
+
+    def run_command(self, *args):
+        """Returns the exit status, stdout and stderr of the command."""
+        argv, stdout, stderr = sys.argv, sys.stdout, sys.stderr
+        sys.argv = ['slidescraper'] + list(args)
+        sys.stdout, sys.stderr = StringIO(), StringIO()
+        try:
+            try:
+                status = SlidescraperCommandHandler().main()
+            except SystemExit, e:
+                status = e.code
+            return status, sys.stdout.getvalue(), sys.stderr.getvalue()
+        finally:
+            sys.argv, sys.stdout, sys.stderr = argv, stdout, stderr
+
+    def write_urls(self, lines):
+        path = os.path.join(self.directory, 'urls.txt')
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        return path
+
+
+class BatchCommandTestCase(CommandTestCase):
+
+    def test_writes_a_line_per_url(self):
+        urls = [DECK_URL % i for i in xrange(3)]
+        for url in urls:
+            self.add_slideshare_oembed(url)
+        path = self.write_urls(['# decks', urls[0], '', '  ' + urls[1],
+                                '  # indented comment', urls[2],
+                                'http://example.com/'])
+        status, out, err = self.run_command('batch', path, '--ordered',
+                                            '--fields', 'title,user')
+        self.assertEqual(status, 0)
+        lines = [json.loads(line) for line in out.splitlines()]
+        self.assertEqual(len(lines), 4)
+        for line in lines[:3]:
+            self.assertEqual(line, {'title': u'Business Quotes for 2011',
+                                    'user': u'Harald Felgner'})
+        self.assertEqual(lines[3]['url'], 'http://example.com/')
+        self.assertEqual(lines[3]['error'], 'UnhandledURL')
+        self.assertTrue(err.startswith('Scraped 4 urls'), err)
+        self.assertTrue('UnhandledURL: 1' in err, err)
+
+    def test_workers_beyond_shared_pools(self):
+        transport = self.transport = GatheringTransport(20)
+        http.set_transport(transport)
+        urls = [DECK_URL % i for i in xrange(20)]
+        for url in urls:
+            self.add_slideshare_oembed(url)
+        status, out, err = self.run_command('batch', self.write_urls(urls),
+                                            '--fields', 'title',
+                                            '--workers', '20',
+                                            '--per-provider', '20')
+        self.assertEqual(status, 0)
+        self.assertEqual(len(out.splitlines()), 20)
+        self.assertEqual(transport.max_in_flight, 20)
+
+    def test_workers_must_be_positive(self):
+        path = self.write_urls([DECK_URL % 0])
+        status, out, err = self.run_command('batch', path, '--workers', '0')
+        self.assertEqual(status, 2)
+        self.assertEqual(out, '')
+        self.assertEqual(self.transport.requests, [])
+
+
+class FeedCommandTestCase(CommandTestCase):
+
+    def test_writes_entries_and_validators(self):
+        self.add_slideshare_user_feed(headers={
+            'ETag': '"abc"',
+            'Last-Modified': 'Wed, 02 Feb 2011 10:00:00 GMT',
+        })
+        status, out, err = self.run_command('feed', FEED_URL,
+                                            '--fields', 'title',
+                                            '--apikeys', API_KEYS_OPTION,
+                                            '--max-results', '2')
+        self.assertEqual(status, 0)
+        self.assertEqual([json.loads(line) for line in out.splitlines()],
+                         [{'title': u'Design Thinking 101'},
+                          {'title': u'The Art of Pitching'}])
+        self.assertTrue('etag: "abc"' in err.splitlines(), err)
+        self.assertTrue('last-modified: Wed, 02 Feb 2011 10:00:00 GMT' in
+                        err.splitlines(), err)
+
+    def test_not_modified(self):
+        self.add_slideshare_user_feed(status=304)
+        status, out, err = self.run_command('feed', FEED_URL,
+                                            '--apikeys', API_KEYS_OPTION,
+                                            '--etag', '"abc"',
+                                            '--last-modified', '2011-02-02')
+        self.assertEqual(status, 0)
+        self.assertEqual(out, '')
+        self.assertEqual(err.splitlines(), [
+            'not-modified: true',
+            'etag: "abc"',
+            'last-modified: Wed, 02 Feb 2011 00:00:00 GMT',
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import multiprocessing
+import threading
+import unittest
+from multiprocessing.pool import ThreadPool
+
+from slidescraper.utils import concurrency
+
+
+class PoolTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        concurrency.set_pool_size('test', concurrency.DEFAULT_POOL_SIZE)
+
+    def test_pools_shared_by_name(self):
+        self.assertTrue(concurrency.get_pool('test') is
+                        concurrency.get_pool('test'))
+        self.assertFalse(concurrency.get_pool('test') is
+                         concurrency.get_pool('fetch'))
+
+    def test_set_pool_size_replaces_pool(self):
+        pool = concurrency.get_pool('test')
+        concurrency.set_pool_size('test', 2)
+        new_pool = concurrency.get_pool('test')
+        self.assertFalse(new_pool is pool)
+        self.assertEqual(len(new_pool._pool), 2)
+
+
+class MapConcurrentlyTestCase(unittest.TestCase):
+
+    def test_results_in_order(self):
+        self.assertEqual(concurrency.map_concurrently(lambda x: x * 2,
+                                                      xrange(20)),
+                         range(0, 40, 2))
+
+    def test_single_item_runs_in_calling_thread(self):
+        threads = concurrency.map_concurrently(
+                            lambda x: threading.current_thread(), [1])
+        self.assertEqual(threads, [threading.current_thread()])
+
+    def test_errors_reraised(self):
+        def fail(x):
+            if x == 3:
+                raise KeyError(x)
+            return x
+        self.assertRaises(KeyError, concurrency.map_concurrently, fail,
+                          xrange(5))
+
+
+class IterateAsyncTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = ThreadPool(1)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_items_delivered_in_order(self):
+        items = []
+        result = concurrency.iterate_async(xrange(5), items.append, self.pool)
+        self.assertEqual(result.get(1), 5)
+        self.assertTrue(result.successful())
+        self.assertEqual(items, range(5))
+
+    def test_errors_reraised(self):
+        def items():
+            yield 1
+            raise KeyError(2)
+        result = concurrency.iterate_async(items(), lambda item: None,
+                                           self.pool)
+        self.assertRaises(KeyError, result.get, 1)
+        self.assertFalse(result.successful())
+
+    def test_worker_free_between_items(self):
+        other_ran = threading.Event()
+        seen = []
+
+        def items():
+            yield 1
+            # Only set in time if the task queued by the callback got the
+            # pool's one worker before this item was asked for.
+            seen.append(other_ran.wait(1))
+
+        def callback(item):
+            self.pool.apply_async(other_ran.set)
+        result = concurrency.iterate_async(items(), callback, self.pool)
+        self.assertEqual(result.get(2), 1)
+        self.assertEqual(seen, [True])
+
+    def test_get_times_out(self):
+        release = threading.Event()
+
+        def items():
+            release.wait(1)
+            yield 1
+        result = concurrency.iterate_async(items(), lambda item: None,
+                                           self.pool)
+        self.assertRaises(multiprocessing.TimeoutError, result.get, 0.01)
+        self.assertFalse(result.ready())
+        release.set()
+        self.assertEqual(result.get(1), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import pickle
+import unittest
+
+from slidescraper.tests.base import ExampleSuite, JSONMethod
+
+
+class PlannerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.a = JSONMethod('http://a/', ['title', 'user'])
+        self.b = JSONMethod('http://b/', ['user', 'tags'])
+        self.c = JSONMethod('http://c/', ['title', 'user', 'tags',
+                                          'view_count'])
+        self.suite = ExampleSuite([self.a, self.b, self.c])
+
+    def test_first_method_covering_everything(self):
+        self.assertEqual(self.suite.find_best_methods(['title']), (self.a,))
+        self.assertEqual(self.suite.find_best_methods(['tags']), (self.b,))
+
+    def test_smallest_combination_preferred(self):
+        # c alone beats a and b together.
+        self.assertEqual(self.suite.find_best_methods(['title', 'tags']),
+                         (self.c,))
+
+    def test_combination_of_methods(self):
+        suite = ExampleSuite([self.a, self.b])
+        self.assertEqual(suite.find_best_methods(['title', 'tags']),
+                         (self.a, self.b))
+
+    def test_unfillable_fields(self):
+        self.assertEqual(self.suite.find_best_methods(['view_count',
+                                                       'language']),
+                         (self.c,))
+        self.assertFalse(self.suite.find_best_methods(['language']))
+
+    def test_plans_cached_until_methods_change(self):
+        plan = self.suite.find_best_methods(['title'])
+        self.assertTrue(self.suite.find_best_methods(set(['title'])) is plan)
+        self.suite.methods = (self.c,)
+        self.assertEqual(self.suite.find_best_methods(['title']), (self.c,))
+
+    def test_pickled_suite_plans_again(self):
+        suite = pickle.loads(pickle.dumps(self.suite))
+        self.assertEqual(len(suite.find_best_methods(['title', 'tags'])), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import time
+import unittest
+
+from slidescraper.utils import http, ratelimit
+from slidescraper.utils.ratelimit import RateLimiter, TokenBucket
+from slidescraper.tests.base import TransportTestCase
+
+
+URL = 'http://www.slideshare.net/api/oembed/2?url=x'
+
+
+class TokenBucketTestCase(unittest.TestCase):
+
+    def test_unlimited_bucket_never_waits(self):
+        bucket = TokenBucket()
+        for i in xrange(100):
+            self.assertEqual(bucket.acquire(), 0.0)
+
+    def test_rate_limits_after_burst(self):
+        bucket = TokenBucket(rate=20, burst=1)
+        self.assertEqual(bucket.acquire(), 0.0)
+        self.assertTrue(bucket.acquire() > 0)
+
+    def test_throttle_halves_rate_and_relax_restores_it(self):
+        bucket = TokenBucket(rate=10)
+        bucket.throttle()
+        self.assertEqual(bucket.rate, 5)
+        for i in xrange(100):
+            bucket.relax()
+        self.assertEqual(bucket.rate, 10)
+
+    def test_retry_after_pauses_bucket(self):
+        bucket = TokenBucket(rate=1000)
+        bucket.throttle(retry_after=0.2)
+        self.assertTrue(0.15 <= bucket.acquire() < 1)
+
+
+class RateLimiterTestCase(unittest.TestCase):
+
+    def test_buckets_per_host_and_api_key(self):
+        limiter = RateLimiter()
+        limiter.configure('slideshare.net', rate=5, key_rate=1)
+        host, key = limiter.get_buckets(
+                        'http://www.slideshare.net/api/2/x?api_key=abc')
+        self.assertEqual(host.rate, 5)
+        self.assertEqual(key.rate, 1)
+        self.assertTrue(limiter.get_buckets(
+                        'http://slideshare.net/y?api_key=abc')[1] is key)
+        self.assertEqual(len(limiter.get_buckets('http://speakerdeck.com/')),
+                         1)
+
+
+class ThrottledGetTestCase(TransportTestCase):
+
+    def test_short_retry_after_is_retried(self):
+        self.transport.add(URL, 'Too Many Requests', status=429,
+                           headers={'Retry-After': '0'})
+        # Keep the slowed down rate high enough not to hold the test up.
+        ratelimit.configure('slideshare.net', rate=1000)
+        ratelimit.limiter.max_retries = 2
+        try:
+            response = http.get(URL)
+        finally:
+            del ratelimit.limiter.max_retries
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(len(self.transport.requests), 3)
+
+    def test_long_retry_after_fails_fast(self):
+        self.transport.add(URL, 'Too Many Requests', status=429,
+                           headers={'Retry-After': '86400'})
+        start = time.time()
+        response = http.get(URL)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(len(self.transport.requests), 1)
+        self.assertTrue(time.time() - start < 1)
+        # The host is paused for max_retry_after at most, not a day.
+        bucket = ratelimit.limiter.get_buckets(URL)[-1]
+        self.assertTrue(bucket._paused_until <=
+                        time.time() + ratelimit.limiter.max_retry_after)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import unittest
+
+from slidescraper.exceptions import UnhandledURL
+from slidescraper.suites import BaseSuite
+from slidescraper.suites.base import SuiteRegistry
+
+
+SLIDES_URL = 'http://www.example.com/slides/1'
+FEED_URL = 'http://www.example.com/feeds/1'
+OTHER_URL = 'http://other.org/slides/1'
+
+
+class CountingSuite(BaseSuite):
+    """Records each url it is asked about in :attr:`asked`."""
+
+    def __init__(self):
+        super(CountingSuite, self).__init__()
+        self.asked = []
+
+    def handles_slide_url(self, url):
+        self.asked.append(url)
+        return super(CountingSuite, self).handles_slide_url(url)
+
+
+class ExampleSuite(CountingSuite):
+    provider_name = 'Example'
+    hosts = ('example.com',)
+    slide_regex = r'http://(www\.)?example\.com/slides/\d+'
+    feed_regex = r'http://(www\.)?example\.com/feeds/\d+'
+
+
+class OtherExampleSuite(CountingSuite):
+    provider_name = 'Other example'
+    hosts = ('example.com',)
+    slide_regex = r'http://(www\.)?example\.com/'
+
+
+class HostlessSuite(CountingSuite):
+    provider_name = 'Hostless'
+    slide_regex = r'http://[^/]+/slides/'
+
+
+class FallbackSuite(CountingSuite):
+    provider_name = 'Fallback'
+    slide_regex = r'http://'
+
+
+class SuiteRegistryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = SuiteRegistry()
+
+    def get_suite(self, suite_class):
+        for suite in self.registry.suites:
+            if isinstance(suite, suite_class):
+                return suite
+
+    def test_first_registered_suite_wins(self):
+        self.registry.register(OtherExampleSuite)
+        self.registry.register(ExampleSuite)
+        self.assertTrue(isinstance(
+                        self.registry.suite_for_slide_url(SLIDES_URL),
+                        OtherExampleSuite))
+
+    def test_only_suites_for_the_host_asked(self):
+        self.registry.register(ExampleSuite)
+        self.registry.register(HostlessSuite)
+        self.assertTrue(isinstance(
+                        self.registry.suite_for_slide_url(OTHER_URL),
+                        HostlessSuite))
+        self.assertEqual(self.get_suite(ExampleSuite).asked, [])
+        self.assertEqual(self.get_suite(HostlessSuite).asked, [OTHER_URL])
+
+    def test_hostless_suite_keeps_its_place(self):
+        self.registry.register(HostlessSuite)
+        self.registry.register(ExampleSuite)
+        self.assertTrue(isinstance(
+                        self.registry.suite_for_slide_url(SLIDES_URL),
+                        HostlessSuite))
+
+    def test_lookups_memoized(self):
+        self.registry.register(ExampleSuite)
+        for i in xrange(3):
+            self.assertTrue(self.registry.handles_slide_url(SLIDES_URL))
+        self.assertEqual(self.get_suite(ExampleSuite).asked, [SLIDES_URL])
+
+    def test_unhandled(self):
+        self.registry.register(ExampleSuite)
+        self.assertFalse(self.registry.handles_slide_url(OTHER_URL))
+        self.assertRaises(UnhandledURL, self.registry.suite_for_slide_url,
+                          OTHER_URL)
+        self.assertRaises(UnhandledURL, self.registry.suite_for_feed_url,
+                          SLIDES_URL)
+
+    def test_classify(self):
+        self.registry.register(ExampleSuite)
+        example = self.get_suite(ExampleSuite)
+        self.assertEqual(self.registry.classify([SLIDES_URL, OTHER_URL,
+                                                 FEED_URL]),
+                         [example, None, None])
+        self.assertEqual(self.registry.classify([SLIDES_URL, FEED_URL],
+                                                kind='feed'),
+                         [None, example])
+
+    def test_classify_uses_fallback(self):
+        self.registry.register(ExampleSuite)
+        self.registry.register_fallback(FallbackSuite)
+        suites = self.registry.classify([SLIDES_URL, OTHER_URL])
+        self.assertTrue(isinstance(suites[0], ExampleSuite))
+        self.assertTrue(isinstance(suites[1], FallbackSuite))
+
+    def test_register_resets_memo(self):
+        self.registry.register(ExampleSuite)
+        self.assertFalse(self.registry.handles_slide_url(OTHER_URL))
+        self.registry.register(HostlessSuite)
+        self.assertTrue(self.registry.handles_slide_url(OTHER_URL))
+
+    def test_unregister_resets_memo(self):
+        self.registry.register(ExampleSuite)
+        self.assertTrue(self.registry.handles_slide_url(SLIDES_URL))
+        self.registry.unregister(ExampleSuite)
+        self.assertFalse(self.registry.handles_slide_url(SLIDES_URL))
+
+    def test_register_fallback_resets_memo(self):
+        self.registry.register(ExampleSuite)
+        self.assertRaises(UnhandledURL, self.registry.suite_for_slide_url,
+                          OTHER_URL)
+        self.registry.register_fallback(FallbackSuite)
+        self.assertTrue(isinstance(
+                        self.registry.suite_for_slide_url(OTHER_URL),
+                        FallbackSuite))
+        # The fallback does not count as handling the url.
+        self.assertFalse(self.registry.handles_slide_url(OTHER_URL))
+
+    def test_unregister_removes_suite(self):
+        # unregister used to compare the suite class with the registered
+        # instances, so it never removed anything.
+        self.registry.register(ExampleSuite)
+        self.registry.register(HostlessSuite)
+        self.registry.unregister(ExampleSuite)
+        self.assertEqual([type(suite) for suite in self.registry.suites],
+                         [HostlessSuite])
+        self.registry.unregister(ExampleSuite)
+        self.assertEqual(len(self.registry.suites), 1)
+        self.registry.register(ExampleSuite)
+        self.assertEqual([type(suite) for suite in self.registry.suites],
+                         [HostlessSuite, ExampleSuite])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import json
+import unittest
+
+import requests
+
+from slidescraper.exceptions import MethodsFailed, ProviderUnavailable
+from slidescraper.slides import Slides
+from slidescraper.tests.base import (ExampleSuite, JSONMethod,
+                                     OtherJSONMethod, TransportTestCase)
+from slidescraper.utils.retry import CircuitBreaker, RetryPolicy
+from slidescraper.utils.transport import build_response
+
+
+SLIDES_URL = 'http://example.com/slides/1'
+
+
+class RetryPolicyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = RetryPolicy(max_attempts=3, backoff=0)
+        self.calls = 0
+
+    def answer(self, *statuses):
+        def func():
+            status = statuses[min(self.calls, len(statuses) - 1)]
+            self.calls += 1
+            if status is None:
+                raise requests.ConnectionError('refused')
+            return build_response('http://example.com/', status)
+        return func
+
+    def test_retries_server_errors(self):
+        response = self.policy.call(self.answer(500, 502, 200))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.calls, 3)
+
+    def test_retries_connection_errors(self):
+        response = self.policy.call(self.answer(None, 200))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.calls, 2)
+
+    def test_raises_after_last_attempt(self):
+        self.assertRaises(requests.HTTPError, self.policy.call,
+                          self.answer(504))
+        self.assertEqual(self.calls, 3)
+
+    def test_503_is_not_retried_again(self):
+        # http.get has already retried it under the rate limiter.
+        self.assertRaises(requests.HTTPError, self.policy.call,
+                          self.answer(503, 200))
+        self.assertEqual(self.calls, 1)
+
+    def test_client_errors_returned(self):
+        response = self.policy.call(self.answer(404))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.calls, 1)
+
+
+class CircuitBreakerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.breaker = CircuitBreaker('Test', threshold=2, reset_timeout=30)
+
+    def test_opens_after_threshold(self):
+        self.breaker.record_failure()
+        self.breaker.before_call()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertRaises(ProviderUnavailable, self.breaker.before_call)
+
+    def test_success_resets_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_trial(self):
+        self.breaker.reset_timeout = 0
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.before_call()
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        # Only the one trial request is let through.
+        self.assertRaises(ProviderUnavailable, self.breaker.before_call)
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.breaker.before_call()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+
+
+class MethodFailureTestCase(TransportTestCase):
+    """Runs two methods whose requests are not retried."""
+
+    def setUp(self):
+        super(MethodFailureTestCase, self).setUp()
+        self.suite = ExampleSuite([
+            JSONMethod('http://a/', ['title', 'user']),
+            OtherJSONMethod('http://b/', ['tags', 'view_count']),
+        ])
+        self.transport.add('http://a/', json.dumps({'title': u'Title',
+                                                     'user': u'someone'}))
+        self.transport.add('http://b/', json.dumps({'tags': [u'x'],
+                                                     'view_count': 3}))
+
+    def get_slides(self):
+        return Slides(SLIDES_URL, suite=self.suite,
+                      fields=['title', 'tags', 'view_count'])
+
+    def test_partial_failure_recorded(self):
+        self.transport.add('http://b/', 'error', status=500)
+        errors = {}
+        data = self.suite.run_methods(self.get_slides(), errors=errors)
+        self.assertEqual(data['title'], u'Title')
+        self.assertEqual(errors.keys(), ['OtherJSONMethod'])
+
+    def test_all_failed_raises(self):
+        self.transport.add('http://a/', 'error', status=500)
+        self.transport.add('http://b/', 'error', status=500)
+        self.assertRaises(MethodsFailed, self.suite.run_methods,
+                          self.get_slides(), errors={})
+
+    def test_circuit_breaker_stops_requests(self):
+        self.transport.add('http://a/', 'error', status=500)
+        slides = Slides(SLIDES_URL, suite=self.suite, fields=['title'])
+        for i in xrange(2):
+            self.assertRaises(MethodsFailed, self.suite.run_methods, slides)
+        requests_made = len(self.transport.requests)
+        try:
+            self.suite.run_methods(slides)
+        except MethodsFailed, e:
+            self.assertTrue(isinstance(e.errors.values()[0],
+                                       ProviderUnavailable))
+        else:
+            self.fail('MethodsFailed not raised')
+        self.assertEqual(len(self.transport.requests), requests_made)
+
+
+if __name__ == '__main__':
+    unittest.main()
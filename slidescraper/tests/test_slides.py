@@ -0,0 +1,253 @@
+import threading
+import time
+import unittest
+
+from slidescraper import slides as slides_module
+from slidescraper.exceptions import SlidesDeleted
+from slidescraper.slides import BaseSlideIterator, Slides
+from slidescraper.suites.slideshare import SlideShareSuite
+from slidescraper.tests.base import API_KEYS, TransportTestCase
+
+
+SLIDESHARE_URL = 'http://www.slideshare.net/haraldf/business-quotes-for-2011'
+
+
+class LazySlidesTestCase(TransportTestCase):
+
+    def setUp(self):
+        super(LazySlidesTestCase, self).setUp()
+        self.add_slideshare_api(SLIDESHARE_URL)
+
+    def get_slides(self, fields):
+        return Slides(SLIDESHARE_URL, suite=SlideShareSuite(), fields=fields,
+                      api_keys=API_KEYS, lazy=True)
+
+    def test_nothing_fetched_until_read(self):
+        self.get_slides(['view_count', 'tags'])
+        self.assertEqual(self.transport.requests, [])
+
+    def test_several_fields_from_one_request(self):
+        slides = self.get_slides(['view_count', 'tags', 'publish_datetime'])
+        self.assertEqual(slides.view_count, 40753)
+        self.assertEqual(len(self.transport.requests), 1)
+        self.assertEqual(slides.tags, [u'business', u'quotes', u'for'])
+        self.assertEqual(slides.publish_datetime.year, 2011)
+        self.assertEqual(len(self.transport.requests), 1)
+        self.assertTrue(slides.is_loaded())
+
+    def test_failed_read_gives_none(self):
+        slides = Slides('http://www.slideshare.net/haraldf/missing',
+                        suite=SlideShareSuite(), fields=['view_count'],
+                        api_keys=API_KEYS, lazy=True)
+        self.assertEqual(slides.view_count, None)
+        self.assertTrue(slides.errors)
+        # The field is not attempted again.
+        self.assertEqual(slides.view_count, None)
+        self.assertEqual(len(self.transport.requests), 1)
+
+    def test_unread_fields_stay_empty(self):
+        slides = self.get_slides(['view_count', 'title'])
+        self.assertFalse(slides.is_loaded())
+        self.assertEqual(slides.missing_fields, ['view_count', 'title'])
+
+
+class InterningTestCase(unittest.TestCase):
+
+    def get_slides(self, **data):
+        slides = Slides(SLIDESHARE_URL, suite=SlideShareSuite())
+        slides._apply(data)
+        return slides
+
+    def test_repeated_values_shared(self):
+        first = self.get_slides(language=u'en', user=u'haraldf')
+        # Build equal strings which are not the same objects.
+        second = self.get_slides(language=(u'en ')[:-1],
+                                 user=(u'haraldf ')[:-1])
+        self.assertTrue(first.language is second.language)
+        self.assertFalse(first.user is second.user)
+
+    def test_table_is_bounded(self):
+        for i in xrange(slides_module.MAX_INTERNED + 10):
+            self.get_slides(language=u'language-%d' % i)
+        self.assertTrue(len(slides_module._interned) <=
+                        slides_module.MAX_INTERNED)
+
+
+class PagedIterator(BaseSlideIterator):
+    """
+    Crawls ``pages`` lists of items, yielding each page's items from a
+    generator as a streamed feed would. Pages which are closed unread are
+    recorded in :attr:`closed`.
+
+    """
+    crawl = True
+
+    def __init__(self, pages, prefetch_pages=1):
+        self.pages = pages
+        self.prefetch_pages = prefetch_pages
+        self.fetched = []
+        self.consumed = []
+        self.closed = []
+        self.page_fetched = threading.Event()
+        self.prefetch_done = threading.Event()
+
+    def get_first_url(self):
+        return 0
+
+    def get_url_response(self, url):
+        self.fetched.append(url)
+        if url:
+            self.page_fetched.set()
+        return url
+
+    def get_response_items(self, response):
+        for item in self.pages[response]:
+            self.consumed.append(item)
+            yield item
+
+    def get_next_url(self, response):
+        if response + 1 < len(self.pages):
+            return response + 1
+        return None
+
+    def close_response(self, response):
+        self.closed.append(response)
+
+    def _prefetch_pages(self, *args):
+        try:
+            BaseSlideIterator._prefetch_pages(self, *args)
+        finally:
+            self.prefetch_done.set()
+
+
+class PrefetchTestCase(unittest.TestCase):
+
+    def test_next_page_fetched_before_first_page_consumed(self):
+        iterator = PagedIterator([[1, 2, 3], [4, 5], [6]])
+        items = iterator._iter_items_prefetched()
+        self.assertEqual(items.next(), 1)
+        self.assertTrue(iterator.page_fetched.wait(5))
+        # The first page is streamed, not read ahead.
+        self.assertEqual(iterator.consumed, [1])
+        self.assertEqual(list(items), [2, 3, 4, 5, 6])
+        self.assertEqual(iterator.fetched, [0, 1, 2])
+
+    def test_stops_at_empty_page(self):
+        iterator = PagedIterator([[1], [], [2]])
+        self.assertEqual(list(iterator._iter_items_prefetched()), [1])
+
+    def test_abandoned_iteration_stops_prefetching(self):
+        iterator = PagedIterator([[1]] * 10)
+        items = iterator._iter_items_prefetched()
+        self.assertEqual(items.next(), 1)
+        self.assertTrue(iterator.page_fetched.wait(5))
+        items.close()
+        # One page is fetched ahead and the thread then stops.
+        self.assertTrue(iterator.prefetch_done.wait(5))
+        self.assertTrue(len(iterator.fetched) <= 3)
+
+    def test_abandoned_pages_closed(self):
+        iterator = PagedIterator([[1]] * 10, prefetch_pages=3)
+        items = iterator._iter_items_prefetched()
+        self.assertEqual(items.next(), 1)
+        self.assertTrue(iterator.page_fetched.wait(5))
+        items.close()
+        self.assertTrue(iterator.prefetch_done.wait(5))
+        self.assertTrue(iterator.closed)
+        self.assertEqual(sorted(iterator.closed), iterator.fetched[1:])
+
+    def test_read_pages_not_closed(self):
+        iterator = PagedIterator([[1], [2], [3]], prefetch_pages=3)
+        self.assertEqual(list(iterator._iter_items_prefetched()), [1, 2, 3])
+        self.assertTrue(iterator.prefetch_done.wait(5))
+        self.assertEqual(iterator.closed, [])
+
+
+class Loaded(object):
+    """Stands in for the :class:`Slides` loaded for ``item``."""
+
+    def __init__(self, item):
+        self.item = item
+        self.index = None
+
+
+class WindowIterator(BaseSlideIterator):
+    """
+    Yields a :class:`Loaded` for each of ``items``, recording which items
+    have been read and how many were being loaded at once. Items finish
+    loading out of order, and those in ``deleted`` raise
+    :exc:`SlidesDeleted`.
+
+    """
+    crawl = False
+
+    def __init__(self, items, lookahead, max_results=None, deleted=()):
+        self.items = items
+        self.lookahead = lookahead
+        self._max_results = max_results
+        self.deleted = set(deleted)
+        self.read = []
+        self.loading = 0
+        self.max_loading = 0
+        self._lock = threading.Lock()
+
+    def _iter_items(self):
+        for item in self.items:
+            self.read.append(item)
+            yield item
+
+    def _data_from_item(self, item):
+        with self._lock:
+            self.loading += 1
+            self.max_loading = max(self.max_loading, self.loading)
+        try:
+            time.sleep(0.01 * (3 - item % 3))
+            if item in self.deleted:
+                raise SlidesDeleted
+            return Loaded(item)
+        finally:
+            with self._lock:
+                self.loading -= 1
+
+
+class LookaheadTestCase(unittest.TestCase):
+
+    def test_feed_order_and_contiguous_index(self):
+        iterator = WindowIterator(range(10), lookahead=4)
+        results = list(iterator)
+        self.assertEqual([loaded.item for loaded in results], range(10))
+        self.assertEqual([loaded.index for loaded in results],
+                         range(1, 11))
+        self.assertTrue(iterator.max_loading > 1)
+
+    def test_deleted_slides_skipped(self):
+        iterator = WindowIterator(range(10), lookahead=4, deleted=(2, 5))
+        results = list(iterator)
+        self.assertEqual([loaded.item for loaded in results],
+                         [0, 1, 3, 4, 6, 7, 8, 9])
+        self.assertEqual([loaded.index for loaded in results], range(1, 9))
+
+    def test_no_reads_past_max_results(self):
+        iterator = WindowIterator(range(10), lookahead=4, max_results=3)
+        self.assertEqual([loaded.item for loaded in iterator], [0, 1, 2])
+        self.assertEqual(iterator.read, [0, 1, 2])
+
+    def test_deleted_slides_replaced_within_max_results(self):
+        iterator = WindowIterator(range(10), lookahead=4, max_results=3,
+                                  deleted=(1,))
+        self.assertEqual([loaded.item for loaded in iterator], [0, 2, 3])
+        self.assertEqual(iterator.read, [0, 1, 2, 3])
+
+    def test_pending_bounded_by_lookahead(self):
+        iterator = WindowIterator(range(20), lookahead=3)
+        yielded = 0
+        for loaded in iterator:
+            yielded += 1
+            self.assertTrue(len(iterator.read) - yielded < 3,
+                            (len(iterator.read), yielded))
+        self.assertEqual(yielded, 20)
+        self.assertTrue(iterator.max_loading <= 3, iterator.max_loading)
+
+
+if __name__ == '__main__':
+    unittest.main()
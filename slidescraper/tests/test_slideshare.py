@@ -0,0 +1,262 @@
+import datetime
+import re
+import threading
+import unittest
+import urllib
+
+import requests
+
+from slidescraper.slides import SlideFeed
+from slidescraper.suites.slideshare import SlideShareSuite
+from slidescraper.tests.base import API_KEYS, TransportTestCase, read_data
+from slidescraper.utils import http
+from slidescraper.utils.transport import MemoryTransport
+
+
+FEED_URL = 'http://www.slideshare.net/rss/user/haraldf'
+API_URL = 'http://www.slideshare.net/api/2/get_slideshows_by_user'
+
+
+class PageCountingTransport(MemoryTransport):
+    """
+    Records the most requests for following pages of a feed which were in
+    flight at once. Each waits (for up to a second) until a second one has
+    started, so that pages fetched one at a time are slow to be found out.
+
+    """
+
+    def __init__(self, responses=None):
+        MemoryTransport.__init__(self, responses)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.overlapped = threading.Event()
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout=None, headers=None, stream=False):
+        if 'offset=' not in url:
+            return MemoryTransport.get(self, url, timeout=timeout,
+                                       headers=headers, stream=stream)
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            if self.in_flight > 1:
+                self.overlapped.set()
+        self.overlapped.wait(1)
+        try:
+            return MemoryTransport.get(self, url, timeout=timeout,
+                                       headers=headers, stream=stream)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class HeaderRecordingTransport(MemoryTransport):
+    """Records the headers sent with each request in :attr:`headers`."""
+
+    def __init__(self):
+        MemoryTransport.__init__(self)
+        self.headers = []
+
+    def get(self, url, timeout=None, headers=None, stream=False):
+        self.headers.append(headers or {})
+        return MemoryTransport.get(self, url, timeout=timeout,
+                                   headers=headers, stream=stream)
+
+
+class ResponseRecordingTransport(MemoryTransport):
+    """Records each response it returns in :attr:`responses`."""
+
+    def __init__(self):
+        MemoryTransport.__init__(self)
+        self.responses = []
+
+    def get(self, url, timeout=None, headers=None, stream=False):
+        response = MemoryTransport.get(self, url, timeout=timeout,
+                                       headers=headers, stream=stream)
+        self.responses.append(response)
+        return response
+
+
+class StreamedFeedResponseTestCase(TransportTestCase):
+    """Checks that streamed responses which are not read get closed."""
+
+    def setUp(self):
+        super(StreamedFeedResponseTestCase, self).setUp()
+        self.transport = ResponseRecordingTransport()
+        http.set_transport(self.transport)
+        self.suite = SlideShareSuite()
+        self.suite.stream_feeds = True
+
+    def get_feed(self):
+        return SlideFeed(FEED_URL, suite=self.suite, fields=['title'],
+                         api_keys=API_KEYS, etag='"abc"')
+
+    def test_not_modified_response_closed(self):
+        self.add_slideshare_user_feed(status=304)
+        feed = self.get_feed()
+        self.assertEqual(list(feed), [])
+        self.assertTrue(feed.not_modified)
+        self.assertTrue(self.transport.responses[0].raw.closed)
+
+    def test_failed_response_closed(self):
+        self.add_slideshare_user_feed(status=500)
+        self.assertRaises(requests.HTTPError, self.get_feed().load)
+        self.assertTrue(self.transport.responses[0].raw.closed)
+
+    def test_unread_stream_closed(self):
+        self.add_slideshare_user_feed()
+        feed = self.get_feed()
+        response = feed.load()
+        self.suite.close_feed_response(feed, response)
+        self.assertTrue(self.transport.responses[0].raw.closed)
+        self.assertEqual(list(response), [])
+
+
+class ConditionalFeedTestCase(TransportTestCase):
+    """Reads the user feed with the validators of an earlier response."""
+    http_last_modified = 'Wed, 02 Feb 2011 10:00:00 GMT'
+
+    def setUp(self):
+        super(ConditionalFeedTestCase, self).setUp()
+        self.transport = HeaderRecordingTransport()
+        http.set_transport(self.transport)
+        self.suite = SlideShareSuite()
+        self.parsed = []
+        parse_feed_entry = self.suite.parse_feed_entry
+
+        def record_parse(entry, fields=None):
+            self.parsed.append(entry)
+            return parse_feed_entry(entry, fields)
+        self.suite.parse_feed_entry = record_parse
+
+    def get_feed(self, **kwargs):
+        return SlideFeed(FEED_URL, suite=self.suite, fields=['title'],
+                         api_keys=API_KEYS, **kwargs)
+
+    def test_validators_stored(self):
+        self.add_slideshare_user_feed(headers={
+            'ETag': '"abc"',
+            'Last-Modified': self.http_last_modified,
+        })
+        feed = self.get_feed()
+        self.assertEqual(len(list(feed)), 6)
+        self.assertEqual(self.transport.headers, [{}])
+        self.assertEqual(feed.etag, '"abc"')
+        self.assertEqual(feed.http_last_modified, self.http_last_modified)
+        # The date of the newest slideshow, not the server's date.
+        self.assertEqual(feed.last_modified.date(),
+                         datetime.date(2011, 1, 25))
+
+    def test_not_modified(self):
+        self.add_slideshare_user_feed(status=304)
+        last_modified = datetime.datetime(2011, 1, 25, 21, 2, 11)
+        feed = self.get_feed(etag='"abc"', last_modified=last_modified,
+                             http_last_modified=self.http_last_modified)
+        self.assertEqual(list(feed), [])
+        self.assertEqual(self.transport.headers, [{
+            'If-None-Match': '"abc"',
+            'If-Modified-Since': self.http_last_modified,
+        }])
+        self.assertTrue(feed.not_modified)
+        self.assertEqual(self.parsed, [])
+        self.assertEqual(feed.etag, '"abc"')
+        self.assertEqual(feed.last_modified, last_modified)
+        self.assertEqual(feed.http_last_modified, self.http_last_modified)
+
+    def test_content_date_not_sent(self):
+        self.add_slideshare_user_feed()
+        feed = self.get_feed(
+                        last_modified=datetime.datetime(2011, 1, 25, 21, 2))
+        feed.load()
+        self.assertEqual(self.transport.headers, [{}])
+
+
+class SlideShareCrawlTestCase(TransportTestCase):
+    """Crawls the recorded user feed of six slideshows, two per page."""
+    page_size = 2
+
+    def setUp(self):
+        super(SlideShareCrawlTestCase, self).setUp()
+        self.suite = SlideShareSuite()
+        self.suite.feed_page_size = self.page_size
+        feed = read_data('slideshare_user_feed.xml')
+        self.slideshows = re.findall(r'<Slideshow>.*?</Slideshow>', feed,
+                                     re.S)
+        self.add_pages(self.transport)
+
+    def add_pages(self, transport):
+        for offset in xrange(0, len(self.slideshows), self.page_size):
+            transport.add(self.page_url(offset), self.page(offset))
+
+    def page_url(self, offset):
+        params = {
+            'api_key': API_KEYS['slideshare_api_key'],
+            'detailed': 1,
+            'username_for': 'haraldf',
+            'limit': self.page_size,
+        }
+        if offset:
+            params['offset'] = offset
+        return '%s?%s' % (API_URL, urllib.urlencode(params))
+
+    def page(self, offset):
+        return ('<?xml version="1.0" encoding="UTF-8"?>\n<User>\n'
+                '<Name>haraldf</Name>\n<Count>%d</Count>\n%s\n</User>\n' % (
+                    len(self.slideshows),
+                    '\n'.join(self.slideshows[offset:offset +
+                                              self.page_size])))
+
+    def get_feed(self, **kwargs):
+        return SlideFeed(FEED_URL, suite=self.suite, fields=['title'],
+                         crawl=True, api_keys=API_KEYS, **kwargs)
+
+    def feed_requests(self):
+        return [url for url in self.transport.requests
+                if url.startswith(API_URL)]
+
+    def test_crawl_reads_every_page_in_api_order(self):
+        titles = [slides.title for slides in self.get_feed()]
+        self.assertEqual(len(titles), 6)
+        self.assertEqual(titles[0], u'Business Quotes for 2011')
+        self.assertEqual(len(self.feed_requests()), 3)
+
+    def test_crawl_stops_at_max_results(self):
+        slides = list(self.get_feed(max_results=2))
+        self.assertEqual(len(slides), 2)
+        self.assertEqual(len(self.feed_requests()), 1)
+
+    def test_pages_fetched_concurrently(self):
+        transport = self.transport = PageCountingTransport()
+        self.add_pages(transport)
+        http.set_transport(transport)
+        titles = [slides.title for slides in self.get_feed()]
+        self.assertEqual(len(titles), 6)
+        self.assertEqual(titles[0], u'Business Quotes for 2011')
+        self.assertEqual(transport.max_in_flight, 2)
+        self.assertEqual(len(self.feed_requests()), 3)
+
+    def test_pages_past_max_results_fetched_when_needed(self):
+        slides = list(self.get_feed(max_results=3))
+        self.assertEqual(len(slides), 3)
+        self.assertEqual(len(self.feed_requests()), 2)
+
+    def test_pages_fetched_one_at_a_time(self):
+        self.suite.feed_page_concurrency = 1
+        titles = [slides.title for slides in self.get_feed()]
+        self.assertEqual(len(titles), 6)
+        self.assertEqual(len(self.feed_requests()), 3)
+
+    def test_prefetched_crawl(self):
+        titles = [slides.title for slides in self.get_feed(prefetch_pages=2)]
+        self.assertEqual(len(titles), 6)
+        self.assertEqual(len(self.feed_requests()), 3)
+
+    def test_streamed_crawl(self):
+        self.suite.stream_feeds = True
+        titles = [slides.title for slides in self.get_feed()]
+        self.assertEqual(len(titles), 6)
+        self.assertEqual(len(self.feed_requests()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
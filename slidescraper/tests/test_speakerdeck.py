@@ -0,0 +1,98 @@
+import unittest
+import warnings
+
+from slidescraper.suites.speakerdeck import SpeakerDeckScrapeMethod
+from slidescraper.tests.base import read_data
+from slidescraper.utils.html import ElementExtractor
+from slidescraper.utils.transport import build_response
+
+
+DECK_URL = 'https://speakerdeck.com/u/kidpollo/p/tanker'
+
+#: A page whose description relies on an implied end tag.
+UNCLOSED_PAGE = u"""<html><head>
+<title>Tanker // Speaker Deck</title>
+<meta property="og:image" content="http://example.com/thumb.jpg">
+</head><body>
+<div class="presenter"><h2><a href="/u/kidpollo">Kid Pollo</a></h2></div>
+<div class="description"><p>Search made easy
+</body></html>
+"""
+
+
+class ScrapeMethodTestCase(unittest.TestCase):
+    """Compares the data read with and without ``fast_extract``."""
+
+    field_sets = (
+        None,
+        ['title'],
+        ['user', 'user_url'],
+        ['embed_code', 'guid'],
+        ['description', 'thumbnail_url'],
+        ['file_url', 'file_format'],
+        ['title', 'description', 'file_url'],
+    )
+
+    def setUp(self):
+        # BeautifulSoup warns when no parser is named.
+        warnings.simplefilter('ignore')
+
+    def tearDown(self):
+        warnings.resetwarnings()
+
+    def process(self, body, fields, fast_extract):
+        method = SpeakerDeckScrapeMethod()
+        method.fast_extract = fast_extract
+        response = build_response(DECK_URL, body=body, headers={
+            'Content-Type': 'text/html; charset=utf-8'})
+        return method.process(response, fields)
+
+    def assertSameData(self, body, fields):
+        fast = self.process(body, fields, True)
+        slow = self.process(body, fields, False)
+        if fields is None:
+            self.assertEqual(fast, slow)
+        else:
+            for field in fields:
+                self.assertEqual(fast.get(field), slow.get(field), field)
+        return slow
+
+    def test_page_read_the_same(self):
+        page = read_data('speakerdeck_page.html')
+        for fields in self.field_sets:
+            self.assertSameData(page, fields)
+        data = self.process(page, None, True)
+        self.assertEqual(sorted(data), sorted(SpeakerDeckScrapeMethod.fields))
+
+    def test_missing_end_tag_falls_back_to_full_parse(self):
+        extractor = ElementExtractor(classes=['description'])
+        self.assertEqual(extractor.extract(UNCLOSED_PAGE), None)
+        for fields in self.field_sets:
+            self.assertSameData(UNCLOSED_PAGE, fields)
+        data = self.process(UNCLOSED_PAGE, None, True)
+        self.assertEqual(data['title'], u'Tanker')
+        self.assertEqual(data['user'], u'Kid Pollo')
+        self.assertTrue(u'Search made easy' in data['description'])
+
+
+class ElementExtractorTestCase(unittest.TestCase):
+
+    def test_selected_elements_in_order(self):
+        extractor = ElementExtractor(tag_names=['title'], ids=['a'],
+                                     classes=['b'])
+        markup = ('<title>T</title><p id="a"><span class="b">x</span></p>'
+                  '<div class="b c"><div>y</div></div><!-- <p id="a"> -->'
+                  '<br class="b">')
+        self.assertEqual(extractor.extract(markup),
+                         ['<title>T</title>',
+                          '<p id="a"><span class="b">x</span></p>',
+                          '<br class="b">'])
+
+    def test_unclosed_element_gives_none(self):
+        extractor = ElementExtractor(ids=['a'])
+        self.assertEqual(extractor.extract('<div id="a"><p>x</p>'), None)
+        self.assertEqual(extractor.extract('<div id="a"><div>x</div>'), None)
+
+
+if __name__ == '__main__':
+    unittest.main()
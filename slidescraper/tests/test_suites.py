@@ -0,0 +1,65 @@
+import json
+import threading
+import unittest
+
+from slidescraper.slides import Slides
+from slidescraper.tests.base import (ExampleSuite, JSONMethod,
+                                     OtherJSONMethod, TransportTestCase)
+from slidescraper.utils import http
+from slidescraper.utils.transport import MemoryTransport
+
+
+SLIDES_URL = 'http://example.com/slides/1'
+
+
+class CountingTransport(MemoryTransport):
+    """Records the most requests which were in flight at once."""
+
+    def __init__(self, responses=None):
+        MemoryTransport.__init__(self, responses)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.both_started = threading.Event()
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout=None, headers=None, stream=False):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            if self.in_flight == 2:
+                self.both_started.set()
+        self.both_started.wait(1)
+        try:
+            return MemoryTransport.get(self, url, timeout=timeout,
+                                       headers=headers, stream=stream)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class RunMethodsTestCase(TransportTestCase):
+
+    def setUp(self):
+        super(RunMethodsTestCase, self).setUp()
+        self.suite = ExampleSuite([
+            JSONMethod('http://a/', ['title', 'user']),
+            OtherJSONMethod('http://b/', ['tags', 'view_count']),
+        ])
+
+    def get_slides(self):
+        return Slides(SLIDES_URL, suite=self.suite,
+                      fields=['title', 'tags', 'view_count'])
+
+    def test_methods_fetched_concurrently(self):
+        transport = self.transport = CountingTransport({
+            'http://a/': json.dumps({'title': u'Title'}),
+            'http://b/': json.dumps({'tags': [u'x'], 'view_count': 3}),
+        })
+        http.set_transport(transport)
+        data = self.suite.run_methods(self.get_slides())
+        self.assertEqual(transport.max_in_flight, 2)
+        self.assertEqual(data, {'title': u'Title', 'tags': [u'x'],
+                                'view_count': 3})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import shutil
+import tempfile
+import unittest
+
+import requests
+
+from slidescraper.utils import http
+from slidescraper.utils.transport import (HostOverrideTransport,
+                                          MemoryTransport, RecordingTransport,
+                                          ReplayTransport, request_key)
+
+
+class RequestKeyTestCase(unittest.TestCase):
+
+    def test_volatile_params_ignored_and_rest_sorted(self):
+        self.assertEqual(request_key('http://a.com/x?ts=1&b=2&a=1&hash=z'),
+                         'http://a.com/x?a=1&b=2')
+        self.assertEqual(request_key('http://a.com/x?ts=1'), 'http://a.com/x')
+
+
+class MemoryTransportTestCase(unittest.TestCase):
+
+    def test_canned_and_unknown_responses(self):
+        transport = MemoryTransport({
+            'http://a.com/': 'body',
+            'http://a.com/gone': (410, 'Gone'),
+            'http://a.com/json': (200, {'Content-Type': 'application/json'},
+                                  '{}'),
+        })
+        self.assertEqual(transport.get('http://a.com/').content, 'body')
+        self.assertEqual(transport.get('http://a.com/gone').status_code, 410)
+        self.assertEqual(transport.get('http://a.com/json').json(), {})
+        self.assertEqual(transport.get('http://a.com/none').status_code, 404)
+        self.assertEqual(len(transport.requests), 4)
+
+    def test_streamed_body_read_from_raw(self):
+        transport = MemoryTransport({'http://a.com/': 'streamed'})
+        response = transport.get('http://a.com/', stream=True)
+        self.assertEqual(response.raw.read(), 'streamed')
+
+
+class HostOverrideTransportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.memory = MemoryTransport({'http://127.0.0.1:8000/p?x=1': 'local'})
+        self.transport = HostOverrideTransport(
+                            {'SpeakerDeck.com': 'http://127.0.0.1:8000'},
+                            self.memory)
+        self.previous = http.set_transport(self.transport)
+
+    def tearDown(self):
+        http.set_transport(self.previous)
+
+    def test_overridden_host_sent_to_target(self):
+        response = http.get('https://speakerdeck.com/p?x=1')
+        self.assertEqual(response.content, 'local')
+        # The response keeps the url actually fetched.
+        self.assertEqual(response.url, 'http://127.0.0.1:8000/p?x=1')
+
+    def test_other_hosts_unchanged(self):
+        http.get('http://www.slideshare.net/p')
+        self.assertEqual(self.memory.requests[-1],
+                         'http://www.slideshare.net/p')
+
+
+class RecordingTransportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_replay_of_recording(self):
+        memory = MemoryTransport({'http://a.com/?a=1': (201, 'recorded')})
+        recorder = RecordingTransport(self.directory, memory)
+        self.assertEqual(recorder.get('http://a.com/?a=1&ts=5').content,
+                         'recorded')
+        replay = ReplayTransport(self.directory)
+        response = replay.get('http://a.com/?ts=9&a=1')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.content, 'recorded')
+        self.assertRaises(requests.ConnectionError, replay.get,
+                          'http://a.com/other')
+
+
+if __name__ == '__main__':
+    unittest.main()
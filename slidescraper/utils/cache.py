@@ -0,0 +1,115 @@
+"""
+In-memory caching of processed :class:`.SuiteMethod` results.
+
+The method cache is disabled by default. Once enabled with
+:func:`enable_method_cache`, :meth:`.BaseSuite.run_methods` stores the field
+dictionary produced by each method, together with the set of fields the method
+was asked to process, under that method's cache key (see
+:meth:`.SuiteMethod.get_cache_key`) and reuses it for requests of those fields
+until it expires.
+
+"""
+
+import collections
+import threading
+import time
+
+
+class LRUCache(object):
+    """
+    A thread-safe mapping which holds at most ``maxsize`` entries, evicting
+    the least recently used one when full. Entries expire ``ttl`` seconds
+    after they are set (never, if ``ttl`` is ``None``); the ttl may be
+    overridden per entry.
+
+    .. attribute:: hits
+
+       The number of lookups which found a live entry.
+
+    .. attribute:: misses
+
+       The number of lookups which found no entry or an expired one.
+
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """Returns the live value for ``key``, or ``default``."""
+        with self._lock:
+            try:
+                expires, value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires is not None and expires <= time.time():
+                self.misses += 1
+                return default
+            # Re-insert to mark the entry as most recently used.
+            self._data[key] = (expires, value)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Stores ``value`` for ``key``. ``ttl`` overrides the cache's default
+        time to live for this entry.
+
+        """
+        if ttl is None:
+            ttl = self.ttl
+        expires = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (expires, value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Removes every entry and resets the hit/miss counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Returns a dictionary of the cache's size and hit/miss counters."""
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+#: The cache used by :meth:`.BaseSuite.run_methods`, or ``None`` if method
+#: caching is disabled.
+method_cache = None
+
+
+def enable_method_cache(maxsize=1024, ttl=300):
+    """
+    Enables caching of processed method results, replacing any existing
+    method cache, and returns the new :class:`LRUCache`. ``ttl`` is the
+    default time to live in seconds; suites and methods may override it with
+    their ``cache_ttl`` attribute.
+
+    """
+    global method_cache
+    method_cache = LRUCache(maxsize=maxsize, ttl=ttl)
+    return method_cache
+
+
+def disable_method_cache():
+    """Disables caching of processed method results."""
+    global method_cache
+    method_cache = None
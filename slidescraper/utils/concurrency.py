@@ -0,0 +1,140 @@
+"""
+Shared worker pools used by :mod:`slidescraper` to run blocking work
+concurrently without relying on gevent.
+
+Pools are identified by name so that work submitted from inside one pool never
+waits on a worker from the same pool (which could otherwise deadlock once all
+workers are busy). ``fetch`` is used for single HTTP requests; ``scrape`` is
+used for whole scrapes, which may in turn submit requests to ``fetch``;
+``feed`` is used for feed loading and iteration, which may submit scrapes.
+
+"""
+
+import sys
+import threading
+from multiprocessing import TimeoutError
+from multiprocessing.pool import ThreadPool
+
+
+#: The number of worker threads used for each named pool. Changes only affect
+#: pools which have not been created yet; see :func:`set_pool_size`.
+POOL_SIZES = {
+    'fetch': 8,
+    'scrape': 16,
+    'feed': 4,
+}
+
+#: Used for pools which are not listed in :data:`POOL_SIZES`.
+DEFAULT_POOL_SIZE = 4
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name='fetch'):
+    """
+    Returns the :class:`ThreadPool` registered as ``name``, creating it the
+    first time it is requested.
+
+    """
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = ThreadPool(POOL_SIZES.get(name, DEFAULT_POOL_SIZE))
+            _pools[name] = pool
+        return pool
+
+
+def set_pool_size(name, size):
+    """
+    Sets the number of workers for the pool ``name``. If the pool is already
+    running, it is shut down once its queued work is done and a new pool of
+    the requested size is created on next use.
+
+    """
+    with _pools_lock:
+        POOL_SIZES[name] = size
+        pool = _pools.pop(name, None)
+    if pool is not None:
+        pool.close()
+
+
+def map_concurrently(func, iterable, pool='fetch'):
+    """
+    Returns ``[func(item) for item in iterable]``, calling ``func`` from the
+    worker pool named ``pool`` when there is more than one item. Results are
+    returned in the order of ``iterable``; if any call raises, the exception
+    is re-raised in the calling thread.
+
+    """
+    items = list(iterable)
+    if len(items) < 2:
+        return [func(item) for item in items]
+    return get_pool(pool).map(func, items)
+
+
+def iterate_async(iterable, callback, pool):
+    """
+    Calls ``callback`` with each item of ``iterable`` from the worker threads
+    of ``pool``, in order. Each item is produced and handed to ``callback``
+    by a task of its own, which queues the task for the next item when it
+    is done, so a long iteration only holds a worker while an item is being
+    produced and other work submitted to ``pool`` runs in between.
+
+    Returns an :class:`AsyncIteration` whose ``get()`` returns the number of
+    items delivered, or re-raises the error which stopped the iteration.
+
+    """
+    iteration = AsyncIteration(iter(iterable), callback, pool)
+    pool.apply_async(iteration._step)
+    return iteration
+
+
+class AsyncIteration(object):
+    """
+    The result of :func:`iterate_async`, with the same ``ready()``,
+    ``successful()``, ``wait()`` and ``get()`` methods as the
+    :class:`~multiprocessing.pool.AsyncResult` of a single task.
+
+    """
+
+    def __init__(self, iterator, callback, pool):
+        self._iterator = iterator
+        self._callback = callback
+        self._pool = pool
+        self._count = 0
+        self._error = None
+        self._done = threading.Event()
+
+    def ready(self):
+        return self._done.is_set()
+
+    def successful(self):
+        if not self.ready():
+            raise AssertionError('iteration has not finished')
+        return self._error is None
+
+    def wait(self, timeout=None):
+        self._done.wait(timeout)
+
+    def get(self, timeout=None):
+        self.wait(timeout)
+        if not self.ready():
+            raise TimeoutError
+        if self._error is not None:
+            raise self._error[0], self._error[1], self._error[2]
+        return self._count
+
+    def _step(self):
+        try:
+            try:
+                item = self._iterator.next()
+            except StopIteration:
+                self._done.set()
+                return
+            self._callback(item)
+            self._count += 1
+            self._pool.apply_async(self._step)
+        except Exception:
+            self._error = sys.exc_info()
+            self._done.set()
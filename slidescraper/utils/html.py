@@ -46,6 +46,163 @@ def convert_entities(text):
                                                    text))
 
 
+class EmbedCode(object):
+    """
+    An embed code kept as a shared ``template`` (a :meth:`str.format` string)
+    and the ``params`` which fill it in. Most of an embed code is boilerplate,
+    so storing it this way and rendering it only when it is read saves a
+    full string per slide deck.
+
+    """
+    __slots__ = ('template', 'params')
+
+    def __init__(self, template, *params):
+        self.template = template
+        self.params = params
+
+    def __getstate__(self):
+        return self.template, self.params
+
+    def __setstate__(self, state):
+        self.template, self.params = state
+
+    def render(self):
+        """Returns the embed code as a string."""
+        return self.template.format(*self.params)
+
+    __str__ = render
+
+    def __unicode__(self):
+        return unicode(self.render())
+
+    def __eq__(self, other):
+        if isinstance(other, EmbedCode):
+            return (self.template, self.params) == (other.template,
+                                                    other.params)
+        return self.render() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return '<EmbedCode %r>' % (self.params,)
+
+
+#: Elements which never have an end tag.
+VOID_ELEMENTS = frozenset(['area', 'base', 'br', 'col', 'command', 'embed',
+                           'hr', 'img', 'input', 'keygen', 'link', 'meta',
+                           'param', 'source', 'track', 'wbr'])
+
+#: Comments and raw text elements, whose contents are never markup.
+_SKIP_PATTERN = r"<!--.*?-->|<(?P<raw>script|style)\b[^>]*>.*?</(?P=raw)\s*>"
+
+_ATTR_RE = re.compile(r"""([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?""")
+
+
+class ElementExtractor(object):
+    """
+    Finds the markup of the elements in a page which have one of the given
+    tag names, or whose ``id``, ``class`` or ``property`` attribute is
+    exactly one of the given values. This selects the same elements as a
+    :class:`~bs4.SoupStrainer` with those criteria, but with a handful of
+    regular expression searches rather than a full parse, so that only the
+    (usually small) extracted markup needs to be handed to BeautifulSoup.
+
+    As with a strainer, an element nested inside one which was already
+    selected is only returned as part of its parent.
+
+    """
+    def __init__(self, tag_names=(), ids=(), classes=(), properties=()):
+        self.tag_names = frozenset(tag_names)
+        self.attributes = {
+            'id': frozenset(ids),
+            'class': frozenset(classes),
+            'property': frozenset(properties),
+        }
+        values = set(ids) | set(classes) | set(properties)
+        alternatives = [_SKIP_PATTERN]
+        if values:
+            alternatives.append(
+                r"<(?P<name>[a-zA-Z][a-zA-Z0-9]*)(?P<attrs>\s[^>]*?(?:%s)[^>]*)>" %
+                "|".join(re.escape(value) for value in values))
+        if self.tag_names:
+            alternatives.append(r"<(?P<tag>%s)(?P<tag_attrs>[\s/][^>]*)?>" %
+                                "|".join(re.escape(name)
+                                         for name in self.tag_names))
+        self._scan_re = re.compile("|".join(alternatives), re.I | re.S)
+        self._end_res = {}
+
+    def _matches(self, attrs):
+        for match in _ATTR_RE.finditer(attrs):
+            values = self.attributes.get(match.group(1).lower())
+            if values:
+                value = match.group(2)
+                if value is None:
+                    value = match.group(3)
+                if value is None:
+                    value = match.group(4)
+                if value in values:
+                    return True
+        return False
+
+    def _find_end(self, markup, name, pos):
+        """
+        Returns the position just after the end tag which closes the
+        ``name`` element whose start tag ends at ``pos``, or ``None``.
+
+        """
+        end_re = self._end_res.get(name)
+        if end_re is None:
+            end_re = re.compile(r"%s|<(?P<close>/?)%s\b[^>]*>" % (
+                _SKIP_PATTERN, re.escape(name)), re.I | re.S)
+            self._end_res[name] = end_re
+        depth = 1
+        for match in end_re.finditer(markup, pos):
+            if match.group('raw') is not None or match.group(0).startswith('<!'):
+                continue
+            if match.group('close'):
+                depth -= 1
+                if not depth:
+                    return match.end()
+            elif not match.group(0).endswith('/>'):
+                depth += 1
+        return None
+
+    def extract(self, markup):
+        """
+        Returns a list of the markup of each selected element, in document
+        order, or ``None`` if the end of a selected element could not be
+        found (for example, because it relies on an implied end tag). Callers
+        should then fall back to parsing the whole page.
+
+        """
+        elements = []
+        pos = 0
+        scan_re = self._scan_re
+        while True:
+            match = scan_re.search(markup, pos)
+            if match is None:
+                return elements
+            pos = match.end()
+            if match.lastgroup == 'attrs':
+                name = match.group('name').lower()
+                if (name not in self.tag_names and
+                        not self._matches(match.group('attrs'))):
+                    continue
+            elif match.lastgroup in ('tag', 'tag_attrs'):
+                name = match.group('tag').lower()
+            else:
+                continue
+            if name in VOID_ELEMENTS or match.group(0).endswith('/>'):
+                end = pos
+            else:
+                end = self._find_end(markup, name, pos)
+                if end is None:
+                    return None
+            elements.append(markup[match.start():end])
+            pos = end
+
+
 def make_embed_code(video_url, flash_qs, width=400, height=264):
     """Generates embed code from a flash enclosure."""
     # TODO - rewrite or remove 
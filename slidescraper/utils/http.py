@@ -24,9 +24,14 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF
 # THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import calendar
+import datetime
+import email.utils
 import random
 import time
-import urllib
+import urlparse
+
+from slidescraper.utils import metrics, ratelimit, transport
 
 #from lxml import etree
 #from lxml.html import clean
@@ -50,24 +55,260 @@ import urllib
 #    return DESCRIPTION_CLEANER.clean_html(html)
 
 
-# TODO: Is this still required?
-class LiarOpener(urllib.FancyURLopener):
+#: The user agent sent with every request. Some APIs (*cough* vimeo *cough*)
+#: don't allow urllib's user agent to access their site.
+DEFAULT_USER_AGENT = (
+    'Mozilla/5.0 (X11; U; Linux x86_64; rv:1.8.1.6) Gecko/20070802 Firefox')
+
+#: Headers sent with every request unless overridden per request.
+DEFAULT_HEADERS = {
+    'User-Agent': DEFAULT_USER_AGENT,
+    'Accept-Encoding': 'gzip, deflate',
+}
+
+#: The maximum number of keep-alive connections kept open per host.
+POOL_SIZE = 10
+
+#: The timeout (in seconds) used for requests which don't specify one.
+DEFAULT_TIMEOUT = 10
+
+_requests_transport = transport.RequestsTransport(POOL_SIZE, DEFAULT_HEADERS)
+_transport = _requests_transport
+
+
+def _host_key(url):
+    parts = urlparse.urlsplit(url)
+    return parts.scheme, parts.netloc.lower()
+
+
+def get_transport():
+    """
+    Returns the transport which requests are currently sent through (see
+    :mod:`slidescraper.utils.transport`).
+
+    """
+    return _transport
+
+
+def set_transport(new_transport):
+    """
+    Sends all requests made by :func:`get` through ``new_transport`` from
+    now on, or through the default
+    :class:`~slidescraper.utils.transport.RequestsTransport` again if it is
+    ``None``. Returns the previous transport.
+
+    """
+    global _transport
+    previous = _transport
+    if new_transport is None:
+        new_transport = _requests_transport
+    _transport = new_transport
+    return previous
+
+
+def get_session(url):
+    """
+    Returns the pooled :class:`requests.Session` used for the host of ``url``
+    by the default transport. Connections to each host are kept alive and
+    reused by every suite method and feed which talks to that host.
+
+    """
+    return _requests_transport.get_session(url)
+
+
+def close_sessions():
+    """Closes all pooled sessions and their open connections."""
+    _requests_transport.close()
+
+
+def configure(pool_size=None, user_agent=None, headers=None, timeout=None):
+    """
+    Changes the defaults used for new sessions. Existing sessions are closed
+    so that the new settings apply to every subsequent request.
+
+    :param pool_size: Maximum number of keep-alive connections per host.
+    :param user_agent: The ``User-Agent`` header to send.
+    :param headers: A dictionary of extra default headers.
+    :param timeout: The default request timeout in seconds.
+
+    """
+    global POOL_SIZE, DEFAULT_TIMEOUT
+    if pool_size is not None:
+        POOL_SIZE = pool_size
+        _requests_transport.pool_size = pool_size
+    if timeout is not None:
+        DEFAULT_TIMEOUT = timeout
+    if user_agent is not None:
+        DEFAULT_HEADERS['User-Agent'] = user_agent
+    if headers:
+        DEFAULT_HEADERS.update(headers)
+    close_sessions()
+
+
+def get(url, timeout=None, headers=None, stream=False):
+    """
+    Fetches ``url`` through the current transport (by default, the pooled
+    session for its host; see :func:`set_transport`) and returns the
+    :mod:`requests` response. All of :mod:`slidescraper`'s network access
+    goes through this function.
+
+    Requests are rate limited by :mod:`slidescraper.utils.ratelimit`. A
+    ``429`` or ``503`` response slows requests to the provider down and is
+    retried after its ``Retry-After`` period or, without one, a random
+    exponential backoff; once the retries are used up, or if the
+    ``Retry-After`` period is longer than the limiter's ``max_retry_after``,
+    the last response is returned.
+
+    If metrics are enabled, every request made is recorded (see
+    :mod:`slidescraper.utils.metrics`).
+
+    """
+    if timeout is None:
+        timeout = DEFAULT_TIMEOUT
+    limiter = ratelimit.limiter
+    buckets = limiter.get_buckets(url)
+    backoff = None
+    attempt = 0
+    while True:
+        for bucket in buckets:
+            bucket.acquire()
+        if metrics.sink.enabled:
+            response = _instrumented_get(url, timeout, headers, stream)
+        else:
+            response = _transport.get(url, timeout=timeout, headers=headers,
+                                      stream=stream)
+        if response.status_code not in limiter.throttle_statuses:
+            buckets[-1].relax()
+            return response
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        too_long = (retry_after is not None and
+                    retry_after > limiter.max_retry_after)
+        if too_long:
+            retry_after = limiter.max_retry_after
+        buckets[-1].throttle(retry_after)
+        if too_long or attempt >= limiter.max_retries:
+            return response
+        attempt += 1
+        if stream:
+            # Don't hand a partly read connection back to the pool.
+            response.raw.close()
+        if retry_after is None:
+            if backoff is None:
+                backoff = random_exponential_backoff(
+                                                limiter.backoff_denominator)
+            backoff.next()
+
+
+def _instrumented_get(url, timeout, headers, stream):
+    """
+    Requests ``url`` like :func:`get` does and records it in the metrics
+    sink under its host. ``http.elapsed`` is the time
+    until the response headers were parsed; for requests which are not
+    streamed, the remainder of the call was spent downloading the body and
+    is recorded as ``http.download``.
+
+    """
+    sink = metrics.sink
+    host = _host_key(url)[1]
+    start = time.time()
+    try:
+        response = _transport.get(url, timeout=timeout, headers=headers,
+                                  stream=stream)
+    except Exception, e:
+        sink.increment('http.errors', host=host, error=type(e).__name__)
+        raise
+    total = time.time() - start
+    elapsed = response.elapsed.total_seconds()
+    sink.increment('http.requests', host=host, status=response.status_code)
+    sink.observe('http.elapsed', elapsed, host=host)
+    if stream:
+        size = response.headers.get('Content-Length')
+        if size is not None and size.isdigit():
+            sink.increment('http.bytes', int(size), host=host)
+    else:
+        sink.observe('http.download', max(0, total - elapsed), host=host)
+        sink.increment('http.bytes', len(response.content), host=host)
+    return response
+
+
+def format_http_date(value):
+    """
+    Formats ``value`` for use in an HTTP header. Naive datetimes are assumed
+    to be in UTC; strings are returned unchanged.
+
+    """
+    if isinstance(value, basestring):
+        return value
+    if value.utcoffset() is not None:
+        value = value - value.utcoffset()
+    return email.utils.formatdate(calendar.timegm(value.timetuple()),
+                                  usegmt=True)
+
+
+def parse_http_date(value):
     """
-    Some APIs (*cough* vimeo *cough*) don't allow urllib's user agent
-    to access their site.
+    Returns a naive UTC datetime for an HTTP date header ``value``, or
+    ``None`` if it cannot be parsed.
 
-    (Why on earth would you ban Python's most common url fetching
-    library from accessing an API??)
     """
-    version = (
-        'Mozilla/5.0 (X11; U; Linux x86_64; rv:1.8.1.6) Gecko/20070802 Firefox')
+    parsed = email.utils.parsedate_tz(value)
+    if parsed is None:
+        return None
+    return datetime.datetime.utcfromtimestamp(email.utils.mktime_tz(parsed))
+
+
+def parse_retry_after(value):
+    """
+    Returns the number of seconds to wait given a ``Retry-After`` header
+    ``value`` (a number of seconds or an HTTP date), or ``None``.
+
+    """
+    if not value:
+        return None
+    try:
+        return max(0, int(value))
+    except ValueError:
+        pass
+    date = parse_http_date(value)
+    if date is None:
+        return None
+    delta = date - datetime.datetime.utcnow()
+    return max(0, delta.days * 86400 + delta.seconds)
+
+
+def conditional_headers(etag=None, last_modified=None):
+    """
+    Returns the headers for a conditional request given the validators of a
+    previous response: ``If-None-Match`` for ``etag`` and
+    ``If-Modified-Since`` for ``last_modified`` (a datetime or an HTTP date
+    string).
+
+    """
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = format_http_date(last_modified)
+    return headers
 
 
 def open_url_while_lying_about_agent(url):
-    opener = LiarOpener()
-    return opener.open(url)
+    """
+    Returns a file-like object for ``url``. The request is made through the
+    pooled session for the url's host, which already sends
+    :data:`DEFAULT_USER_AGENT`.
+
+    """
+    raw = get(url, stream=True).raw
+    raw.decode_content = True
+    return raw
 
 def random_exponential_backoff(denominator):
+    """
+    Sleeps for a random time of up to ``i ** 2 / denominator`` seconds on the
+    ``i``-th iteration and yields the time slept.
+
+    """
     i = 1.0
     while True:
         sleep_range = (i ** 2) / denominator
@@ -0,0 +1,222 @@
+"""
+Instrumentation of the stages of a scrape: HTTP requests (count, bytes,
+errors, and the time to the response headers and to download the body),
+:meth:`.SuiteMethod.process`, :meth:`.BaseSuite.find_best_methods`, slide
+loading and feed entry enrichment.
+
+Measurements go to the current :data:`sink`. By default this is a
+:class:`NullSink`, and the instrumented code checks ``sink.enabled`` before
+taking any timings, so metrics cost next to nothing until they are turned on
+with :func:`enable` (which installs a :class:`MemorySink`) or
+:func:`set_sink`. A sink is any object with an ``enabled`` attribute and
+``increment`` and ``observe`` methods; see :class:`NullSink`.
+
+Metric names and their labels:
+
+===================== ====================== ===============================
+Name                  Labels                 Value
+===================== ====================== ===============================
+``http.requests``     host, status           requests made
+``http.errors``       host, error            requests which raised
+``http.bytes``        host                   response body bytes
+``http.elapsed``      host                   seconds until the headers came
+``http.download``     host                   seconds reading the body
+``method.fetch``      provider, method       seconds fetching, with retries
+``method.process``    provider, method       seconds in ``process``
+``method.errors``     provider, method       failed fetches or processing
+``suite.plan``        provider               seconds choosing methods
+``slides.load``       provider               seconds loading a deck
+``feed.parse``        provider               seconds parsing a feed entry
+``feed.entry``        provider               seconds parsing and loading one
+===================== ====================== ===============================
+
+"""
+
+import bisect
+import json
+import threading
+
+
+class NullSink(object):
+    """A sink which discards everything. Instrumentation is skipped."""
+    enabled = False
+
+    def increment(self, name, value=1, **labels):
+        """Adds ``value`` to the counter ``name`` with ``labels``."""
+        pass
+
+    def observe(self, name, value, **labels):
+        """Records ``value`` in the histogram ``name`` with ``labels``."""
+        pass
+
+
+class Histogram(object):
+    """
+    Counts observations into buckets with the given upper ``bounds`` and
+    keeps their count and sum.
+
+    """
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, percent):
+        """
+        Returns the upper bound of the bucket holding the ``percent``-th
+        percentile observation, or ``None`` if it is in the last, unbounded
+        bucket or there are no observations.
+
+        """
+        if not self.count:
+            return None
+        rank = percent / 100.0 * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+
+class MemorySink(object):
+    """
+    Keeps counters and histograms in memory, to be read with
+    :meth:`snapshot`, :meth:`dump` or :meth:`format_text`.
+
+    :param bounds: The bucket upper bounds used for histograms. The defaults
+                   suit latencies in seconds; ``http.bytes`` is a counter, so
+                   they need not cover sizes.
+
+    """
+    enabled = True
+
+    DEFAULT_BOUNDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                      0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self.bounds = tuple(bounds)
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.bounds)
+            histogram.observe(value)
+
+    def reset(self):
+        """Discards everything recorded so far."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self):
+        """
+        Returns a JSON-serializable dictionary of the current counters and
+        histograms.
+
+        """
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value
+                        in sorted(self._counters.items())]
+            histograms = []
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                histograms.append({
+                    'name': name,
+                    'labels': dict(labels),
+                    'count': histogram.count,
+                    'sum': histogram.sum,
+                    'bounds': list(histogram.bounds),
+                    'buckets': list(histogram.counts),
+                    'p50': histogram.percentile(50),
+                    'p99': histogram.percentile(99),
+                })
+        return {'counters': counters, 'histograms': histograms}
+
+    def dump(self, fileobj):
+        """Writes :meth:`snapshot` to ``fileobj`` as JSON."""
+        json.dump(self.snapshot(), fileobj, indent=2, sort_keys=True)
+        fileobj.write('\n')
+
+    def format_text(self):
+        """
+        Returns the metrics in the Prometheus text exposition format, so that
+        they can be scraped. Dots in names become underscores.
+
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for counter in snapshot['counters']:
+            lines.append('%s%s %s' % (_metric_name(counter['name']),
+                                      _format_labels(counter['labels']),
+                                      counter['value']))
+        for histogram in snapshot['histograms']:
+            name = _metric_name(histogram['name'])
+            labels = histogram['labels']
+            cumulative = 0
+            bounds = histogram['bounds'] + ['+Inf']
+            for bound, count in zip(bounds, histogram['buckets']):
+                cumulative += count
+                bucket_labels = dict(labels, le=bound)
+                lines.append('%s_bucket%s %d' % (
+                                name, _format_labels(bucket_labels),
+                                cumulative))
+            lines.append('%s_sum%s %r' % (name, _format_labels(labels),
+                                          histogram['sum']))
+            lines.append('%s_count%s %d' % (name, _format_labels(labels),
+                                            histogram['count']))
+        return '\n'.join(lines) + '\n'
+
+
+def _metric_name(name):
+    return 'slidescraper_' + name.replace('.', '_')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{%s}' % ','.join('%s="%s"' % (key, unicode(value).replace('"',
+                                                                      '\\"'))
+                             for key, value in sorted(labels.items()))
+
+
+#: The sink measurements currently go to.
+sink = NullSink()
+
+
+def set_sink(new_sink):
+    """Sends measurements to ``new_sink`` from now on."""
+    global sink
+    sink = new_sink
+
+
+def enable(bounds=MemorySink.DEFAULT_BOUNDS):
+    """
+    Installs and returns a new :class:`MemorySink` as the current
+    :data:`sink`.
+
+    """
+    new_sink = MemorySink(bounds)
+    set_sink(new_sink)
+    return new_sink
+
+
+def disable():
+    """Turns instrumentation off again."""
+    set_sink(NullSink())
@@ -0,0 +1,118 @@
+"""
+Streaming export of :class:`.Slides` as newline-delimited JSON: one JSON
+object per line, written to a file object in buffered chunks so that feeds and
+bulk scrapes of any size can be piped out without holding them in memory.
+
+"""
+
+import datetime
+import json
+
+
+def json_default(obj):
+    """
+    ``default`` hook for :mod:`json` which serializes datetimes as ISO 8601
+    strings.
+
+    """
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    raise TypeError("%r is not serializable" % (obj,))
+
+
+_encoder = json.JSONEncoder(separators=(',', ':'), default=json_default)
+
+
+class NDJSONWriter(object):
+    """
+    Writes one JSON object per line to ``fileobj``.
+
+    :param fileobj: A file-like object with a ``write`` method.
+    :param fields: An optional list of field names to write for each
+                   :class:`.Slides`. By default, a deck's requested fields
+                   are written.
+    :param chunk_size: The number of bytes to buffer before writing to
+                       ``fileobj``. ``0`` writes every record immediately.
+
+    """
+
+    def __init__(self, fileobj, fields=None, chunk_size=65536):
+        self.fileobj = fileobj
+        self.fields = fields
+        self.chunk_size = chunk_size
+        self.count = 0
+        self._buffer = []
+        self._buffered = 0
+
+    def record(self, slides):
+        """
+        Returns the dictionary which is written for ``slides``. If some of
+        its suite's methods failed, their errors are included as
+        ``"errors"``.
+
+        """
+        fields = self.fields if self.fields is not None else slides.fields
+        record = {}
+        for field in fields:
+            value = getattr(slides, field, None)
+            if isinstance(value, datetime.datetime):
+                value = value.isoformat()
+            record[field] = value
+        errors = getattr(slides, 'errors', None)
+        if errors:
+            record['errors'] = dict((name, unicode(error))
+                                    for name, error in errors.iteritems())
+        return record
+
+    def write_record(self, record):
+        """Writes an arbitrary JSON-serializable dictionary as one line."""
+        line = _encoder.encode(record) + '\n'
+        self._buffer.append(line)
+        self._buffered += len(line)
+        self.count += 1
+        if self._buffered >= self.chunk_size:
+            self.flush()
+
+    def write(self, item):
+        """
+        Writes ``item``, which may be a :class:`.Slides` instance or a
+        :class:`.ScrapeResult`. A failed result is written as
+        ``{"url": ..., "error": ..., "message": ...}``.
+
+        """
+        slides = getattr(item, 'slides', item)
+        error = getattr(item, 'error', None)
+        if error is not None:
+            self.write_record({
+                'url': item.url,
+                'error': type(error).__name__,
+                'message': unicode(error),
+            })
+        else:
+            self.write_record(self.record(slides))
+
+    def flush(self):
+        """Writes any buffered lines to the file object."""
+        if self._buffer:
+            self.fileobj.write(''.join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+        if hasattr(self.fileobj, 'flush'):
+            self.fileobj.flush()
+
+
+def write_ndjson(items, fileobj, fields=None, chunk_size=65536):
+    """
+    Writes each of ``items`` (an iterable of :class:`.Slides`, such as a
+    :class:`.SlideFeed`, or of :class:`.ScrapeResult`, such as a
+    :class:`.BulkScrape`) to ``fileobj`` as newline-delimited JSON, as the
+    iterable yields them. Returns the number of lines written.
+
+    """
+    writer = NDJSONWriter(fileobj, fields=fields, chunk_size=chunk_size)
+    try:
+        for item in items:
+            writer.write(item)
+    finally:
+        writer.flush()
+    return writer.count
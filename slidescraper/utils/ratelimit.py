@@ -0,0 +1,270 @@
+"""
+Rate limiting of the requests made to service providers.
+
+Every request made through :func:`slidescraper.utils.http.get` first takes a
+token from the :class:`TokenBucket` for its host and, if the url carries an
+API key, from the bucket for that key. Buckets run at the rate configured for
+their host with :meth:`RateLimiter.configure` (suites do this for their
+:attr:`~.BaseSuite.hosts` from :attr:`~.BaseSuite.rate_limit` and
+:attr:`~.BaseSuite.api_key_rate_limit`), or without a limit if none was
+configured.
+
+When a provider answers ``429 Too Many Requests`` or ``503 Service
+Unavailable``, the most specific bucket used for the request halves its rate
+and, if the response carried a ``Retry-After`` header, stops handing out
+tokens until then; the request is retried. A ``Retry-After`` longer than
+:attr:`RateLimiter.max_retry_after` is not waited for: the bucket pauses for
+that long at most and the response is returned straight away. Each healthy
+response then raises the rate again, by about :attr:`TokenBucket.increase`
+requests per second every second, until it is back at the configured rate. A
+bucket with no configured rate starts from the rate it was being used at when
+it was throttled, and becomes unlimited again once it has recovered past it.
+
+"""
+
+import threading
+import time
+import urlparse
+
+
+class TokenBucket(object):
+    """
+    Hands out tokens at ``rate`` per second, allowing bursts of up to
+    ``burst`` tokens (by default, one second's worth). A ``rate`` of ``None``
+    means no limit until the bucket is throttled.
+
+    """
+
+    #: The lowest rate a bucket is slowed down to.
+    min_rate = 0.1
+
+    #: The factor the rate is multiplied by when the bucket is throttled.
+    decrease = 0.5
+
+    #: Roughly how much the rate grows per second while responses are
+    #: healthy.
+    increase = 1.0
+
+    #: Further refusals within this many seconds of a slowdown do not slow
+    #: the bucket down again, since they were most likely requests already
+    #: in flight.
+    cooldown = 1.0
+
+    def __init__(self, rate=None, burst=None):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = self.capacity
+        self._updated = time.time()
+        self._paused_until = 0
+        self._ceiling = None
+        self._throttled_at = None
+        self._last = None
+        self._interval = None
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self):
+        if self.burst is not None:
+            return self.burst
+        return max(1.0, self.rate or 1.0)
+
+    def _refill(self, now):
+        if self.rate is not None:
+            self.tokens = min(self.capacity,
+                              self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _observe(self, now):
+        # Keeps a moving average of the time between requests, so that an
+        # unlimited bucket knows how fast it was going when throttled.
+        if self._last is not None:
+            interval = now - self._last
+            if self._interval is None:
+                self._interval = interval
+            else:
+                self._interval = 0.8 * self._interval + 0.2 * interval
+        self._last = now
+
+    def acquire(self):
+        """
+        Blocks until a request may be made. Returns the number of seconds
+        spent waiting.
+
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.time()
+                delay = self._paused_until - now
+                if delay <= 0:
+                    self._refill(now)
+                    if self.rate is None or self.tokens >= 1:
+                        if self.rate is not None:
+                            self.tokens -= 1
+                        self._observe(now)
+                        return waited
+                    delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def throttle(self, retry_after=None):
+        """
+        Slows the bucket down after the provider refused a request. If
+        ``retry_after`` (in seconds) is given, no tokens are handed out until
+        it has passed.
+
+        """
+        with self._lock:
+            now = time.time()
+            self._refill(now)
+            if (self._throttled_at is None or
+                    now - self._throttled_at >= self.cooldown):
+                self._throttled_at = now
+                if self.rate is None:
+                    observed = 1.0
+                    if self._interval:
+                        observed = 1.0 / self._interval
+                    self._ceiling = observed
+                    self.rate = observed
+                    self.tokens = 0
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self.tokens = min(self.tokens, self.capacity)
+            if retry_after:
+                self._paused_until = max(self._paused_until,
+                                         now + retry_after)
+
+    def relax(self):
+        """Speeds the bucket back up after a healthy response."""
+        if self.rate is None or self.rate == self.max_rate:
+            return
+        with self._lock:
+            if self.rate is None:
+                return
+            self._refill(time.time())
+            self.rate += self.increase / self.rate
+            ceiling = self.max_rate
+            if ceiling is None:
+                ceiling = self._ceiling
+            if ceiling is not None and self.rate >= ceiling:
+                self.rate = self.max_rate
+
+    def __repr__(self):
+        return '<TokenBucket rate=%r>' % (self.rate,)
+
+
+class RateLimiter(object):
+    """
+    Keeps the :class:`TokenBucket` instances for each host and API key.
+    Settings for a host also apply to its subdomains.
+
+    """
+
+    #: Query string parameters which hold an API key.
+    api_key_params = ('api_key', 'key', 'client_id')
+
+    #: Responses with these status codes throttle the bucket and are retried.
+    throttle_statuses = (429, 503)
+
+    #: The number of times a throttled request is retried before its
+    #: response is returned as is.
+    max_retries = 3
+
+    #: The longest ``Retry-After`` (in seconds) which is waited for. A
+    #: throttled response asking for a longer wait is returned without
+    #: retrying, and its bucket is only paused for this long.
+    max_retry_after = 60
+
+    #: Passed to :func:`.random_exponential_backoff` to space out retries of
+    #: responses without a ``Retry-After`` header.
+    backoff_denominator = 4.0
+
+    def __init__(self):
+        self._settings = {}
+        self._buckets = {}
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def configure(self, host, rate=None, burst=None, key_rate=None,
+                  key_burst=None):
+        """
+        Sets the limits for ``host`` and its subdomains: ``rate`` (requests
+        per second) and ``burst`` for all requests to the host, and
+        ``key_rate`` and ``key_burst`` for the requests made with each API
+        key. ``None`` means no limit. Existing buckets for the host are
+        replaced.
+
+        """
+        host = host.lower()
+        with self._lock:
+            self._settings[host] = (rate, burst, key_rate, key_burst)
+            self._hosts.clear()
+            for key in self._buckets.keys():
+                if key[0] == host:
+                    del self._buckets[key]
+
+    def reset(self):
+        """Removes all settings and buckets."""
+        with self._lock:
+            self._settings.clear()
+            self._buckets.clear()
+            self._hosts.clear()
+
+    def _settings_host(self, host):
+        """Returns the configured host which ``host`` falls under."""
+        try:
+            return self._hosts[host]
+        except KeyError:
+            pass
+        parts = host.split('.')
+        configured = host
+        for i in xrange(len(parts)):
+            candidate = '.'.join(parts[i:])
+            if candidate in self._settings:
+                configured = candidate
+                break
+        self._hosts[host] = configured
+        return configured
+
+    def _api_key(self, query):
+        if not query:
+            return None
+        for key, value in urlparse.parse_qsl(query):
+            if key in self.api_key_params:
+                return value
+        return None
+
+    def get_buckets(self, url):
+        """
+        Returns the buckets which requests for ``url`` are limited by: the
+        bucket for the url's host and, if the url carries an API key, the
+        bucket for that key.
+
+        """
+        parts = urlparse.urlsplit(url)
+        api_key = self._api_key(parts.query)
+        with self._lock:
+            host = self._settings_host((parts.hostname or '').lower())
+            rate, burst, key_rate, key_burst = self._settings.get(
+                                            host, (None, None, None, None))
+            buckets = [self._bucket((host, None), rate, burst)]
+            if api_key is not None:
+                buckets.append(self._bucket((host, api_key), key_rate,
+                                            key_burst))
+        return buckets
+
+    def _bucket(self, key, rate, burst):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(rate, burst)
+        return bucket
+
+
+#: The rate limiter shared by all requests.
+limiter = RateLimiter()
+
+
+def configure(host, rate=None, burst=None, key_rate=None, key_burst=None):
+    """Configures the shared :data:`limiter`; see :meth:`RateLimiter.configure`."""
+    limiter.configure(host, rate=rate, burst=burst, key_rate=key_rate,
+                      key_burst=key_burst)
@@ -0,0 +1,169 @@
+"""
+Retrying of failed requests and circuit breaking for providers which keep
+failing, as used by :meth:`.BaseSuite.run_methods`.
+
+Each :class:`.SuiteMethod` request is made under a :class:`RetryPolicy` (the
+method's :attr:`~.SuiteMethod.retry_policy` or its suite's), and counts
+towards the :class:`CircuitBreaker` of its suite's provider. After enough
+consecutive failures, the breaker opens and requests to the provider fail
+at once with :exc:`.ProviderUnavailable` until it has had time to recover.
+
+"""
+
+import random
+import threading
+import time
+
+import requests
+
+from slidescraper.exceptions import ProviderUnavailable
+
+
+class RetryPolicy(object):
+    """
+    Describes how a request is retried.
+
+    :param max_attempts: The total number of attempts, including the first.
+    :param backoff: The base delay in seconds. Before the ``n``-th retry, a
+                    random delay of up to ``backoff * 2 ** (n - 1)`` seconds
+                    (but at most ``max_backoff``) is slept.
+    :param max_backoff: The longest delay between attempts.
+    :param timeout: The timeout in seconds of each attempt.
+    :param retry_statuses: Response status codes which are retried. A
+                           response which still has one of these codes after
+                           the last attempt raises :exc:`requests.HTTPError`.
+    :param fail_statuses: Response status codes which raise
+                          :exc:`requests.HTTPError` without being retried.
+                          ``503`` is here rather than in ``retry_statuses``
+                          because :func:`.http.get` has already retried it
+                          under the rate limiter (see
+                          :mod:`slidescraper.utils.ratelimit`).
+
+    Connection errors and timeouts are always retried.
+
+    """
+
+    def __init__(self, max_attempts=2, backoff=0.2, max_backoff=2.0,
+                 timeout=3, retry_statuses=(500, 502, 504),
+                 fail_statuses=(503,)):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.retry_statuses = retry_statuses
+        self.fail_statuses = fail_statuses
+
+    def get_delay(self, retry):
+        """Returns a jittered delay before the ``retry``-th retry."""
+        return random.uniform(0, min(self.max_backoff,
+                                     self.backoff * 2 ** (retry - 1)))
+
+    def call(self, func, *args, **kwargs):
+        """
+        Calls ``func`` (which should return a :mod:`requests` response) up
+        to :attr:`max_attempts` times and returns its first successful
+        response. The last error is raised if every attempt fails.
+
+        """
+        attempt = 1
+        while True:
+            try:
+                response = func(*args, **kwargs)
+            except requests.RequestException:
+                if attempt >= self.max_attempts:
+                    raise
+            else:
+                if response.status_code in self.fail_statuses:
+                    response.raise_for_status()
+                if response.status_code not in self.retry_statuses:
+                    return response
+                if attempt >= self.max_attempts:
+                    response.raise_for_status()
+                    return response
+            time.sleep(self.get_delay(attempt))
+            attempt += 1
+
+
+class CircuitBreaker(object):
+    """
+    Stops requests to a provider after ``threshold`` consecutive failures.
+    Once ``reset_timeout`` seconds have passed, a single trial request is let
+    through; if it succeeds the breaker closes again, otherwise it stays open
+    for another ``reset_timeout``.
+
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, name, threshold=5, reset_timeout=30):
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        Raises :exc:`.ProviderUnavailable` if a request may not be made
+        right now.
+
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if (self.state == self.OPEN and
+                    time.time() - self._opened_at >= self.reset_timeout):
+                # Let this request through as a trial.
+                self.state = self.HALF_OPEN
+                return
+        raise ProviderUnavailable(self.name)
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if (self.state == self.HALF_OPEN or
+                    self.failures >= self.threshold):
+                self.state = self.OPEN
+                self._opened_at = time.time()
+
+    def reset(self):
+        """Closes the breaker."""
+        self.record_success()
+
+    def __repr__(self):
+        return '<CircuitBreaker %s: %s>' % (self.name, self.state)
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name, threshold=5, reset_timeout=30):
+    """
+    Returns the :class:`CircuitBreaker` for the provider ``name``, creating
+    it with ``threshold`` and ``reset_timeout`` the first time.
+
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(
+                                                name, threshold=threshold,
+                                                reset_timeout=reset_timeout)
+        return breaker
+
+
+def reset_breakers():
+    """Closes every circuit breaker."""
+    with _breakers_lock:
+        breakers = _breakers.values()
+    for breaker in breakers:
+        breaker.reset()
@@ -0,0 +1,334 @@
+"""
+The transports which :func:`slidescraper.utils.http.get` sends requests
+through. A transport is any object with a ``get(url, timeout=None,
+headers=None, stream=False)`` method returning a :mod:`requests` response,
+and a ``close()`` method; see :class:`Transport`. The current transport is
+chosen with :func:`slidescraper.utils.http.set_transport`.
+
+* :class:`RequestsTransport` (the default) makes real requests, with a pooled
+  :class:`requests.Session` per host.
+* :class:`MemoryTransport` answers from a dictionary of canned responses.
+* :class:`HostOverrideTransport` sends requests for some hosts to other base
+  urls, for example to point providers at a local test server.
+* :class:`RecordingTransport` passes requests on to another transport and
+  writes each response to a directory, from which :class:`ReplayTransport`
+  answers them again later without any network access.
+
+Canned and replayed responses are full :class:`requests.Response` objects,
+so parsing code (including streaming parsers which read ``response.raw``)
+cannot tell them from real ones.
+
+"""
+
+import datetime
+import hashlib
+import httplib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib
+import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.response import HTTPResponse
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+#: Query string parameters which change with every request (such as the
+#: timestamp and signature of SlideShare API calls) and are ignored when
+#: matching requests to canned or recorded responses.
+VOLATILE_PARAMS = ('ts', 'hash')
+
+
+def request_key(url, ignore_params=VOLATILE_PARAMS):
+    """
+    Returns ``url`` with the query string parameters in ``ignore_params``
+    removed and the rest sorted, so that equivalent requests match.
+
+    """
+    base, _, query = url.partition('?')
+    if not query:
+        return base
+    params = sorted((key, value) for key, value in urlparse.parse_qsl(query)
+                    if key not in ignore_params)
+    if not params:
+        return base
+    return '%s?%s' % (base, urllib.urlencode(params))
+
+
+def build_response(url, status=200, headers=None, body='', elapsed=0,
+                   stream=False):
+    """
+    Returns a :class:`requests.Response` for ``url`` with the given status,
+    headers and (already decoded) ``body``. Unless ``stream`` is ``True``,
+    the body is read into the response's ``content`` straight away.
+
+    """
+    if isinstance(body, unicode):
+        body = body.encode('utf-8')
+    headers = CaseInsensitiveDict(headers or {})
+    # The body is stored decoded.
+    headers.pop('Content-Encoding', None)
+    headers.pop('Transfer-Encoding', None)
+    headers['Content-Length'] = str(len(body))
+
+    reason = httplib.responses.get(status, '')
+    response = requests.Response()
+    response.status_code = status
+    response.reason = reason
+    response.headers = headers
+    response.url = url
+    response.encoding = get_encoding_from_headers(headers)
+    response.elapsed = datetime.timedelta(seconds=elapsed)
+    response.raw = HTTPResponse(body=io.BytesIO(body), headers=dict(headers),
+                                status=status, reason=reason,
+                                preload_content=False, decode_content=False)
+    if not stream:
+        response.content
+    return response
+
+
+class Transport(object):
+    """The interface of a transport."""
+
+    def get(self, url, timeout=None, headers=None, stream=False):
+        """
+        Makes a ``GET`` request for ``url`` and returns the
+        :class:`requests.Response`. Failures to get any response raise
+        :exc:`requests.RequestException`.
+
+        :param timeout: The timeout in seconds.
+        :param headers: A dictionary of extra request headers.
+        :param stream: If ``True``, the body need not be read until the
+                       response's ``content`` or ``raw`` is used.
+
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Releases any connections or files the transport holds."""
+        pass
+
+
+class RequestsTransport(Transport):
+    """
+    Makes requests with :mod:`requests`, through a pooled session per host
+    which keeps up to ``pool_size`` connections alive and sends ``headers``
+    with every request. ``headers`` is read whenever a session is created,
+    so changes to it apply once :meth:`close` has been called.
+
+    """
+
+    def __init__(self, pool_size=10, headers=None):
+        self.pool_size = pool_size
+        self.headers = headers if headers is not None else {}
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _build_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update(self.headers)
+        return session
+
+    def get_session(self, url):
+        """Returns the pooled session for the host of ``url``."""
+        parts = urlparse.urlsplit(url)
+        key = parts.scheme, parts.netloc.lower()
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = self._build_session()
+            return session
+
+    def get(self, url, timeout=None, headers=None, stream=False):
+        return self.get_session(url).get(url, timeout=timeout,
+                                         headers=headers, stream=stream)
+
+    def close(self):
+        """Closes all pooled sessions and their open connections."""
+        with self._lock:
+            sessions = self._sessions.values()
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+class MemoryTransport(Transport):
+    """
+    Answers requests from canned responses. ``responses`` maps urls to a
+    body, a ``(status, body)`` pair or a ``(status, headers, body)`` triple;
+    more may be added with :meth:`add`. Urls are matched with
+    :func:`request_key`. Requests for unknown urls get a ``404`` response.
+
+    .. attribute:: requests
+
+       The urls requested so far, in order.
+
+    """
+
+    def __init__(self, responses=None, ignore_params=VOLATILE_PARAMS):
+        self.ignore_params = ignore_params
+        self.requests = []
+        self._responses = {}
+        for url, response in (responses or {}).iteritems():
+            if isinstance(response, basestring):
+                response = (200, response)
+            if len(response) == 2:
+                response = (response[0], None, response[1])
+            self.add(url, response[2], status=response[0],
+                     headers=response[1])
+
+    def add(self, url, body, status=200, headers=None):
+        """Sets the response for requests of ``url``."""
+        key = request_key(url, self.ignore_params)
+        self._responses[key] = (status, headers, body)
+
+    def get(self, url, timeout=None, headers=None, stream=False):
+        self.requests.append(url)
+        status, response_headers, body = self._responses.get(
+                                    request_key(url, self.ignore_params),
+                                    (404, None, 'Not Found'))
+        return build_response(url, status, response_headers, body,
+                              stream=stream)
+
+
+class HostOverrideTransport(Transport):
+    """
+    Passes requests on to ``transport`` (by default, a new
+    :class:`RequestsTransport`), first sending requests for the hosts in
+    ``overrides`` to other base urls: ``overrides`` maps host names to the
+    scheme and host to use instead, for example
+    ``{'speakerdeck.com': 'http://127.0.0.1:8000'}``. The responses are
+    returned unchanged, so their ``url`` is the one actually fetched.
+
+    Rate limiting and metrics in :func:`slidescraper.utils.http.get` still
+    apply to the original host.
+
+    """
+
+    def __init__(self, overrides, transport=None):
+        if transport is None:
+            transport = RequestsTransport()
+        self.overrides = dict((host.lower(), target)
+                              for host, target in overrides.iteritems())
+        self.transport = transport
+
+    def rewrite_url(self, url):
+        """
+        Returns the url a request for ``url`` is sent to: if the url's host
+        is overridden, its scheme and host are replaced by those of the
+        override; otherwise the url is returned unchanged.
+
+        """
+        parts = urlparse.urlsplit(url)
+        target = self.overrides.get((parts.hostname or '').lower())
+        if target is None:
+            return url
+        target = urlparse.urlsplit(target)
+        return urlparse.urlunsplit((target.scheme, target.netloc, parts.path,
+                                    parts.query, parts.fragment))
+
+    def get(self, url, timeout=None, headers=None, stream=False):
+        return self.transport.get(self.rewrite_url(url), timeout=timeout,
+                                  headers=headers, stream=stream)
+
+    def close(self):
+        self.transport.close()
+
+
+class RecordingTransport(Transport):
+    """
+    Passes requests on to ``transport`` (by default, a new
+    :class:`RequestsTransport`) and writes each response to ``directory``,
+    in the format :class:`ReplayTransport` reads. A later response for the
+    same :func:`request_key` replaces the earlier one.
+
+    """
+
+    def __init__(self, directory, transport=None,
+                 ignore_params=VOLATILE_PARAMS):
+        if transport is None:
+            transport = RequestsTransport()
+        self.directory = directory
+        self.transport = transport
+        self.ignore_params = ignore_params
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def get(self, url, timeout=None, headers=None, stream=False):
+        start = time.time()
+        response = self.transport.get(url, timeout=timeout, headers=headers)
+        elapsed = time.time() - start
+        body = response.content
+        _write_recording(self.directory, request_key(url, self.ignore_params),
+                         {'url': url,
+                          'status': response.status_code,
+                          'headers': dict(response.headers),
+                          'elapsed': elapsed}, body)
+        return build_response(response.url, response.status_code,
+                              response.headers, body, elapsed=elapsed,
+                              stream=stream)
+
+    def close(self):
+        self.transport.close()
+
+
+class ReplayTransport(Transport):
+    """
+    Answers requests with the responses a :class:`RecordingTransport`
+    wrote to ``directory``. Requests which were not recorded raise
+    :exc:`requests.ConnectionError`.
+
+    If ``delay`` is ``True``, each response is held back for as long as it
+    took when it was recorded.
+
+    """
+
+    def __init__(self, directory, ignore_params=VOLATILE_PARAMS, delay=False):
+        self.directory = directory
+        self.ignore_params = ignore_params
+        self.delay = delay
+
+    def get(self, url, timeout=None, headers=None, stream=False):
+        path = _recording_path(self.directory,
+                               request_key(url, self.ignore_params))
+        try:
+            with open(path + '.json') as f:
+                meta = json.load(f)
+            with open(path + '.body', 'rb') as f:
+                body = f.read()
+        except IOError:
+            raise requests.ConnectionError('No recorded response for %s' %
+                                           url)
+        if self.delay:
+            time.sleep(meta['elapsed'])
+        return build_response(url, meta['status'], meta['headers'], body,
+                              elapsed=meta['elapsed'], stream=stream)
+
+
+def _recording_path(directory, key):
+    if isinstance(key, unicode):
+        key = key.encode('utf-8')
+    return os.path.join(directory, hashlib.sha1(key).hexdigest())
+
+
+def _write_recording(directory, key, meta, body):
+    # Write to temporary files and rename them into place, so that a
+    # concurrent replay never reads a half-written recording.
+    path = _recording_path(directory, key)
+    meta = dict(meta, key=key)
+    for suffix, data in (('.body', body),
+                         ('.json', json.dumps(meta, indent=2,
+                                              sort_keys=True))):
+        fd, temp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.rename(temp_path, path + suffix)